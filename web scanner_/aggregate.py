@@ -0,0 +1,109 @@
+import hashlib
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from models import AggregatedFinding, Finding, ScanResult
+
+
+DEFAULT_SAMPLE_URLS = 5
+DEFAULT_MAX_ENTRIES = 100_000
+
+_URL_RE = re.compile(r"https?://\S+")
+# Not \b: "_" is a word character, so \b would miss the id in "sess_abc123"
+_NUMBER_RE = re.compile(r"(?<![0-9a-z])[0-9a-f]*\d[0-9a-f]*(?![0-9a-z])")
+
+
+def normalize_evidence(text: str) -> str:
+    """
+    Reduce page-specific evidence to its shape: lowercase, URLs and
+    numbers/hex ids replaced by placeholders, whitespace collapsed.
+    "Form 3" and "Form 12" normalize alike, as do session-suffixed cookie names.
+    """
+    text = _URL_RE.sub("<url>", text.lower())
+    text = _NUMBER_RE.sub("#", text)
+    return " ".join(text.split())
+
+
+def fingerprint(finding: Finding, host: str) -> bytes:
+    """
+    Identity of a finding for deduplication: check ID, host, outcome
+    and normalized evidence (subject and detail).
+    """
+    key = "\x1f".join((
+        finding.check_id,
+        host,
+        finding.status,
+        finding.severity,
+        normalize_evidence(finding.subject),
+        normalize_evidence(finding.detail or ""),
+    ))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+def identity(finding: Finding, occurrence: int = 0) -> bytes:
+    """
+    Stable identity of a finding on one page, independent of its outcome:
+    check ID and normalized subject, plus `occurrence` to tell apart
+    findings that normalize alike on the same page. Status, severity and
+    detail may change between scans without changing the identity.
+    """
+    key = "\x1f".join((finding.check_id, normalize_evidence(finding.subject), str(occurrence)))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+class FindingAggregator:
+    """
+    Incrementally collapses duplicate findings across pages and hosts.
+
+    Results are folded in one at a time, so memory depends on the number of
+    distinct fingerprints (at most `max_entries`), not on the number of
+    findings or URLs. Each entry keeps a page count and up to `sample_urls`
+    example URLs. Fingerprints beyond `max_entries` are counted in `dropped`.
+    """
+
+    def __init__(self, sample_urls: int = DEFAULT_SAMPLE_URLS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.sample_urls = sample_urls
+        self.max_entries = max_entries
+        self.index: Dict[bytes, AggregatedFinding] = {}
+        self.pages = 0
+        self.errors = 0
+        self.findings = 0
+        self.dropped = 0
+
+    def add(self, result: ScanResult) -> None:
+        self.pages += 1
+        if result.error:
+            self.errors += 1
+            return
+
+        url = result.final_url or result.scanned_url or result.url
+        host = (urlsplit(url).hostname or "").lower()
+        counted = set()  # a finding repeated on one page counts that page once
+
+        for finding in result.findings:
+            self.findings += 1
+            key = fingerprint(finding, host)
+            if key in counted:
+                continue
+            counted.add(key)
+
+            entry = self.index.get(key)
+            if entry is None:
+                if len(self.index) >= self.max_entries:
+                    self.dropped += 1
+                    continue
+                entry = self.index[key] = AggregatedFinding(finding=finding, host=host)
+
+            entry.count += 1
+            if len(entry.sample_urls) < self.sample_urls:
+                entry.sample_urls.append(url)
+
+    def entries(self, host: Optional[str] = None) -> List[AggregatedFinding]:
+        """
+        Aggregated findings in first-seen order, optionally for one host.
+        """
+        return [e for e in self.index.values() if host is None or e.host == host]
+
+    @property
+    def scanned(self) -> int:
+        return self.pages - self.errors
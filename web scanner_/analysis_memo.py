@@ -0,0 +1,97 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from defaults import DEFAULT_MAX_BYTES
+from models import Finding
+
+
+ENTRY_OVERHEAD = 200      # approximate bytes per entry: key, tuples, LRU links
+FINDING_OVERHEAD = 120    # approximate bytes per Finding besides its strings
+
+MemoEntry = Tuple[Tuple[Finding, ...], Optional[Tuple[str, ...]]]
+
+
+def _text_size(text: Optional[str]) -> int:
+    return sys.getsizeof(text) if text else 0
+
+
+def entry_size(findings: Tuple[Finding, ...], links: Optional[Tuple[str, ...]]) -> int:
+    """
+    Approximate memory held by one memo entry.
+    """
+    size = ENTRY_OVERHEAD
+    for f in findings:
+        size += FINDING_OVERHEAD + _text_size(f.subject) + _text_size(f.detail)
+    if links is not None:
+        size += sum(sys.getsizeof(link) + 8 for link in links)
+    return size
+
+
+class AnalysisMemo:
+    """
+    In-memory LRU of body-stage results (findings, and the page's links when
+    they were collected) keyed by the digest of the raw response body, so a
+    page served byte-identical under another URL (shared templates, CMS
+    error pages, mirrors) is not parsed again.
+
+    Bounded by the approximate size of the stored results, `max_bytes`,
+    rather than by entry count: one page with hundreds of forms or links
+    weighs as much as many small ones. Safe to share between threads.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[MemoEntry, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, body_hash: Optional[str], need_links: bool = False) -> Optional[Tuple[List[Finding], Optional[List[str]]]]:
+        """
+        Stored (findings, links) for a body, or None. With `need_links`,
+        entries stored without links do not count.
+        """
+        if not body_hash:
+            return None
+        with self._lock:
+            item = self._entries.get(body_hash)
+            if item is None or (need_links and item[0][1] is None):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(body_hash)
+            self.hits += 1
+        findings, links = item[0]
+        return list(findings), (list(links) if links is not None else None)
+
+    def put(self, body_hash: Optional[str], findings: List[Finding], links: Optional[List[str]] = None) -> None:
+        """
+        Store the body-stage result for a body. Results with error findings
+        are not stored: a parser failure or analyzer timeout may not repeat.
+        """
+        if not body_hash or any(f.status == "error" for f in findings):
+            return
+        entry: MemoEntry = (tuple(findings), tuple(links) if links is not None else None)
+        size = entry_size(*entry)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(body_hash, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[body_hash] = (entry, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = 100.0 * self.hits / lookups if lookups else 0.0
+        return (f"[INFO] Analysis memo: {self.hits} of {lookups} pages reused ({rate:.0f}%), "
+                f"{len(self._entries)} bodies, {self.size / 1024 / 1024:.1f} MB")
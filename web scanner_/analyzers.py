@@ -0,0 +1,326 @@
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from cookie_analyzer import analyze_cookies
+from form_analyzer import analyze_forms
+from header_analyzer import analyze_security_headers
+from html_parser import extract_forms_from_html, parse_html
+from models import Finding, ResponseData
+
+
+PLUGINS_ENV = "SCANNER_PLUGINS"   # comma-separated plugin modules, inherited by worker processes
+MAX_ANALYZER_THREADS = 8
+
+# An analyzer runs in the first stage that has everything it needs:
+# "headers" as soon as the response headers arrive, "body" once the body is
+# downloaded. Body artifacts are derived from the body alone, so that stage
+# can run in a process pool.
+ANALYSIS_STAGES = ("headers", "body")
+
+
+@dataclass(frozen=True)
+class Analyzer:
+    """
+    A registered check. `func` is called with the artifacts named in
+    `needs`, in that order, and returns findings. If it raises (or an
+    artifact it needs cannot be computed), or runs past `timeout`, it
+    reports one `error_check` finding instead.
+    """
+    name: str
+    func: Callable[..., List[Finding]]
+    needs: Tuple[str, ...]
+    stage: str
+    error_check: str
+    error_message: str
+    timeout: Optional[float] = None   # seconds; runs on the analyzer thread pool when set
+
+
+ArtifactProvider = Callable[["Artifacts"], object]
+
+ARTIFACTS: Dict[str, Tuple[str, ArtifactProvider]] = {}
+ANALYZERS: Dict[str, Analyzer] = {}
+
+
+def register_artifact(name: str, stage: str) -> Callable[[ArtifactProvider], ArtifactProvider]:
+    """
+    Decorator adding an artifact provider: a function of the page's
+    Artifacts (use .source, or .get() other artifacts of the same stage).
+    """
+    if stage not in ANALYSIS_STAGES:
+        raise ValueError(f"Unknown analysis stage: {stage}")
+
+    def decorator(provider: ArtifactProvider) -> ArtifactProvider:
+        if name in ARTIFACTS:
+            raise ValueError(f"Duplicate artifact: {name}")
+        ARTIFACTS[name] = (stage, provider)
+        return provider
+
+    return decorator
+
+
+def register_analyzer(
+    name: str,
+    needs: Iterable[str],
+    error_check: str,
+    error_message: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Callable[[Callable[..., List[Finding]]], Callable[..., List[Finding]]]:
+    """
+    Decorator adding an analyzer to the registry; names must be unique and
+    every needed artifact must belong to the same stage. Findings use
+    check IDs registered in checks.py.
+    """
+    needs = tuple(needs)
+    unknown = [need for need in needs if need not in ARTIFACTS]
+    if unknown:
+        raise ValueError(f"Unknown artifact(s) for analyzer {name}: {', '.join(unknown)}")
+    stages = {ARTIFACTS[need][0] for need in needs}
+    if len(stages) != 1:
+        raise ValueError(f"Analyzer {name} must need artifacts of exactly one stage")
+
+    def decorator(func: Callable[..., List[Finding]]) -> Callable[..., List[Finding]]:
+        if name in ANALYZERS:
+            raise ValueError(f"Duplicate analyzer: {name}")
+        ANALYZERS[name] = Analyzer(
+            name=name,
+            func=func,
+            needs=needs,
+            stage=stages.pop(),
+            error_check=error_check,
+            error_message=error_message or f"{name} analysis failed",
+            timeout=timeout,
+        )
+        return func
+
+    return decorator
+
+
+def stage_analyzers(stage: str) -> List[Analyzer]:
+    return [analyzer for analyzer in ANALYZERS.values() if analyzer.stage == stage]
+
+
+class Artifacts:
+    """
+    Inputs for one page's analyzers, each computed on first use and then
+    shared: the form records are extracted once however many analyzers
+    read them. A provider's exception is remembered and raised to every
+    analyzer that needs that artifact. Safe to share between threads: each
+    artifact has its own lock, so only analyzers that need an artifact
+    still being computed wait for it (an analyzer that timed out inside
+    the "dom" provider does not hold up the form checks).
+
+    `source` is the ResponseData for the "headers" stage and the raw body
+    for the "body" stage. With `collect_links`, the page's raw link targets
+    are gathered during the same parse as the forms.
+    """
+
+    def __init__(self, stage: str, source: Union[ResponseData, str, bytes], collect_links: bool = False):
+        self.stage = stage
+        self.source = source
+        self.collect_links = collect_links or any("links" in a.needs for a in stage_analyzers(stage))
+        self._values: Dict[str, object] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._locks: Dict[str, threading.RLock] = {}   # artifact -> lock held while computing it
+        self._lock = threading.Lock()                  # guards _locks
+
+    def get(self, name: str) -> object:
+        if name in self._values:
+            return self._values[name]
+        with self._lock:
+            lock = self._locks.get(name)
+            if lock is None:
+                lock = self._locks[name] = threading.RLock()
+
+        with lock:
+            if name in self._values:
+                return self._values[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+            stage, provider = ARTIFACTS[name]
+            if stage != self.stage:
+                raise ValueError(f"Artifact {name} is not available in the {self.stage} stage")
+            try:
+                value = provider(self)
+            except Exception as e:
+                self._errors[name] = e
+                raise
+            self._values[name] = value
+            return value
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_ANALYZER_THREADS, thread_name_prefix="analyzer")
+        return _executor
+
+
+def _call(analyzer: Analyzer, artifacts: Artifacts) -> Tuple[List[Finding], float, float]:
+    """
+    Run one analyzer in isolation; returns (findings, wall seconds, CPU seconds).
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        findings = list(analyzer.func(*(artifacts.get(need) for need in analyzer.needs)))
+    except Exception as e:
+        findings = [Finding(analyzer.error_check, "error", detail=f"{analyzer.error_message}: {str(e)}")]
+    return findings, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+
+
+def run_analyzers(
+    stage: str, artifacts: Artifacts, timings: Optional[Dict[str, Tuple[float, float]]] = None
+) -> List[Finding]:
+    """
+    Run every analyzer of `stage` over `artifacts` and return their findings
+    in registration order. Each analyzer's (wall, CPU) seconds are stored in
+    `timings` under its name, if given.
+
+    Analyzers with a timeout start first, concurrently on a shared thread
+    pool; the others run meanwhile on the calling thread, which avoids a
+    thread hand-off for quick CPU-bound checks. An analyzer still running
+    at its timeout is reported as failed and left to finish in the
+    background (threads cannot be interrupted).
+    """
+    analyzers = stage_analyzers(stage)
+
+    pending = {}
+    for analyzer in analyzers:
+        if analyzer.timeout is not None:
+            pending[analyzer.name] = (time.perf_counter(), _get_executor().submit(_call, analyzer, artifacts))
+
+    outcomes = {}
+    for analyzer in analyzers:
+        if analyzer.timeout is None:
+            outcomes[analyzer.name] = _call(analyzer, artifacts)
+
+    for analyzer in analyzers:
+        if analyzer.name not in pending:
+            continue
+        started, future = pending[analyzer.name]
+        try:
+            outcomes[analyzer.name] = future.result(timeout=max(0.0, started + analyzer.timeout - time.perf_counter()))
+        except FutureTimeout:
+            future.cancel()
+            detail = f"{analyzer.error_message}: timed out after {analyzer.timeout:g}s"
+            outcomes[analyzer.name] = ([Finding(analyzer.error_check, "error", detail=detail)], analyzer.timeout, 0.0)
+
+    findings: List[Finding] = []
+    for analyzer in analyzers:
+        found, wall, cpu = outcomes[analyzer.name]
+        findings.extend(found)
+        if timings is not None:
+            timings[analyzer.name] = (wall, cpu)
+    return findings
+
+
+def load_plugins(modules: Iterable[str]) -> None:
+    """
+    Import plugin modules, which register their checks and analyzers at
+    import time. The names are also exported in PLUGINS_ENV, so analysis
+    worker processes load the same plugins whatever their start method.
+    """
+    modules = [module for module in modules if module]
+    for module in modules:
+        importlib.import_module(module)
+
+    loaded = [m for m in os.environ.get(PLUGINS_ENV, "").split(",") if m]
+    os.environ[PLUGINS_ENV] = ",".join(loaded + [m for m in modules if m not in loaded])
+
+
+# ==============================
+# BUILT-IN ARTIFACTS
+# ==============================
+@register_artifact("headers", "headers")
+def _headers(artifacts: Artifacts):
+    return artifacts.source.headers
+
+
+@register_artifact("cookies", "headers")
+def _cookies(artifacts: Artifacts):
+    return artifacts.source.cookies
+
+
+@register_artifact("https", "headers")
+def _https(artifacts: Artifacts):
+    return artifacts.source.is_https
+
+
+@register_artifact("status", "headers")
+def _status(artifacts: Artifacts):
+    return artifacts.source.status_code
+
+
+@register_artifact("url", "headers")
+def _url(artifacts: Artifacts):
+    return artifacts.source.final_url
+
+
+@register_artifact("body", "body")
+def _body(artifacts: Artifacts):
+    return artifacts.source
+
+
+@register_artifact("page", "body")
+def _page(artifacts: Artifacts):
+    """
+    (form records, raw link targets) from one pass over the body;
+    (None, []) when there is no body.
+    """
+    body = artifacts.source
+    if not body:
+        return None, []
+    links: Optional[List[str]] = [] if artifacts.collect_links else None
+    forms = extract_forms_from_html(body, links=links)
+    return forms, links or []
+
+
+@register_artifact("forms", "body")
+def _forms(artifacts: Artifacts):
+    return artifacts.get("page")[0]
+
+
+@register_artifact("links", "body")
+def _links(artifacts: Artifacts):
+    return artifacts.get("page")[1]
+
+
+@register_artifact("dom", "body")
+def _dom(artifacts: Artifacts):
+    """
+    BeautifulSoup tree, for analyzers that need more than form records.
+    """
+    return parse_html(artifacts.source)
+
+
+# ==============================
+# BUILT-IN ANALYZERS
+# ==============================
+register_analyzer("headers", ("headers", "https"), "header.error", "Header analysis failed")(
+    analyze_security_headers
+)
+register_analyzer("cookies", ("cookies", "https"), "cookie.error", "Cookie analysis failed")(
+    analyze_cookies
+)
+
+
+@register_analyzer("forms", ("forms",), "form.error", "Form analysis could not be completed")
+def _analyze_forms(forms: Optional[List[dict]]) -> List[Finding]:
+    if forms is None:
+        return [Finding("html.missing", "missing")]
+    return analyze_forms(forms)
+
+
+# Worker processes started without fork re-import this module: load the same plugins
+load_plugins(os.environ.get(PLUGINS_ENV, "").split(","))
@@ -0,0 +1,155 @@
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+from aggregate import identity, normalize_evidence
+from models import Finding, FindingChange, ScanResult
+
+
+COMMIT_EVERY = 500  # pages between commits while recording a run
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url        TEXT PRIMARY KEY,
+    scanned_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS findings (
+    url               TEXT NOT NULL,
+    key               BLOB NOT NULL,
+    check_id          TEXT NOT NULL,
+    status            TEXT NOT NULL,
+    subject           TEXT,
+    severity_override TEXT,
+    detail            TEXT,
+    PRIMARY KEY (url, key)
+) WITHOUT ROWID;
+"""
+
+
+def keyed_findings(findings: List[Finding]) -> Dict[bytes, Finding]:
+    """
+    A page's findings by identity (see aggregate.identity); findings that
+    normalize alike are numbered in page order.
+    """
+    keyed: Dict[bytes, Finding] = {}
+    occurrences: Dict[Tuple[str, str], int] = {}
+    for finding in findings:
+        shape = (finding.check_id, normalize_evidence(finding.subject))
+        occurrence = occurrences.get(shape, 0)
+        occurrences[shape] = occurrence + 1
+        keyed[identity(finding, occurrence)] = finding
+    return keyed
+
+
+def same_outcome(old: Finding, new: Finding) -> bool:
+    """
+    True unless status, severity or (normalized) detail differ.
+    """
+    return (
+        old.status == new.status
+        and old.severity == new.severity
+        and normalize_evidence(old.detail or "") == normalize_evidence(new.detail or "")
+    )
+
+
+class Baseline:
+    """
+    Findings of an earlier run in SQLite, indexed by (URL, finding identity),
+    for incremental rescans that report only what changed.
+
+    Each result is compared against the stored findings for its URL alone,
+    so neither run is ever held in memory as a whole. Unless `frozen`, the
+    page's stored findings are then replaced by the current ones, making
+    this run the baseline for the next. Failed scans are not compared and
+    keep their stored findings; pages not scanned in this run are left as
+    they were.
+    """
+
+    def __init__(self, path: str, frozen: bool = False):
+        self.path = path
+        self.frozen = frozen
+
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._pending = 0
+
+        self.pages = 0
+        self.unscanned = 0      # failed scans, not compared
+        self.new_pages = 0      # pages not in the baseline yet
+        self.counts = {"new": 0, "resolved": 0, "changed": 0, "unchanged": 0}
+
+    def _stored(self, url: str) -> Optional[Dict[bytes, Finding]]:
+        """
+        The baseline findings for `url`, or None if the page is not in the baseline.
+        """
+        if self._db.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is None:
+            return None
+        rows = self._db.execute(
+            "SELECT key, check_id, status, subject, severity_override, detail FROM findings WHERE url = ?",
+            (url,),
+        )
+        return {row[0]: Finding(*row[1:]) for row in rows}
+
+    def diff(self, result: ScanResult) -> List[FindingChange]:
+        """
+        Compare one scan with the baseline and return its new, resolved and
+        changed findings, in that order. Records the scan unless frozen.
+        """
+        self.pages += 1
+        if result.error:
+            self.unscanned += 1
+            return []
+
+        current = keyed_findings(result.findings)
+        stored = self._stored(result.url)
+        if stored is None:
+            self.new_pages += 1
+            stored = {}
+
+        new, changed, resolved = [], [], []
+        for key, finding in current.items():
+            previous = stored.get(key)
+            if previous is None:
+                new.append(FindingChange("new", result.url, finding))
+            elif not same_outcome(previous, finding):
+                changed.append(FindingChange("changed", result.url, finding, previous))
+            else:
+                self.counts["unchanged"] += 1
+        for key, previous in stored.items():
+            if key not in current:
+                resolved.append(FindingChange("resolved", result.url, previous))
+
+        self.counts["new"] += len(new)
+        self.counts["changed"] += len(changed)
+        self.counts["resolved"] += len(resolved)
+
+        if not self.frozen:
+            self._record(result.url, current)
+        return new + resolved + changed
+
+    def _record(self, url: str, findings: Dict[bytes, Finding]) -> None:
+        self._db.execute("DELETE FROM findings WHERE url = ?", (url,))
+        self._db.executemany(
+            "INSERT INTO findings VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (url, key, f.check_id, f.status, f.subject, f.severity_override, f.detail)
+                for key, f in findings.items()
+            ],
+        )
+        self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?)", (url, time.time()))
+
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self._db.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
+
+    def __enter__(self) -> "Baseline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,361 @@
+import asyncio
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.error import URLError
+from urllib.parse import urlsplit
+
+from analysis_memo import AnalysisMemo
+from defaults import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST
+from http_client import HttpClient, classify_error
+from input_handler import parse_target
+from journal import ScanJournal
+from metrics import ThreadProfiler, record_stage, timed_call
+from models import Finding, ResponseData, ScanResult
+from pipeline import fetch_page, analyze_body
+from resolver import DnsCache, is_permanent_failure
+from retry import RetryPolicy
+from scan_cache import ScanCache
+from throttle import HostThrottle, RateLimiter
+
+
+BACKLOG_FACTOR = 4  # URLs admitted per fetch slot, so throttled hosts do not stall the list
+
+
+def _log_to_stderr() -> None:
+    """
+    Process-pool initializer: keep worker diagnostics off stdout,
+    which may be carrying a machine-readable report.
+    """
+    sys.stdout = sys.stderr
+
+
+def _host_key(url: str) -> str:
+    """
+    Best-effort host used for per-host limits; invalid URLs share one bucket.
+    """
+    target = url if url.startswith(("http://", "https://")) else "http://" + url
+    try:
+        return (urlsplit(target).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+async def scan_many(
+    urls: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    rate: Optional[float] = None,
+    host_rate: Optional[float] = None,
+    analysis_workers: Optional[int] = None,
+    client: Optional[HttpClient] = None,
+    cache: Optional[ScanCache] = None,
+    profiler: Optional[ThreadProfiler] = None,
+    retry: Optional[RetryPolicy] = None,
+    journal: Optional[ScanJournal] = None,
+    memo: Optional[AnalysisMemo] = None,
+    headers_only: bool = False,
+    backlog: Optional[int] = None,
+) -> AsyncIterator[ScanResult]:
+    """
+    Scan many URLs concurrently and yield each ScanResult as soon as it completes.
+
+    - `concurrency` bounds the number of fetches in flight overall.
+    - `per_host` bounds the number of fetches in flight against one hostname.
+      Within that bound each host gets an adaptive limit (see
+      throttle.HostThrottle): it starts at 1, grows while the host answers
+      quickly, halves on 429/503/timeouts and pauses for Retry-After.
+    - `rate` (optional) caps how many fetches are started per second globally.
+    - `host_rate` (optional) caps fetches started per second against one hostname.
+    - `analysis_workers` sizes the HTML analysis process pool
+      (defaults to the CPU count; 0 analyzes on the fetch threads instead).
+
+    The scan runs as two stages joined by a bounded queue: the fetch stage
+    (HTTP plus header/cookie analysis) runs on a thread pool, and the CPU-bound
+    HTML parsing and form analysis runs on a process pool, so network
+    concurrency and parsing throughput scale independently. The input iterable
+    is consumed lazily, up to `backlog` URLs ahead (BACKLOG_FACTOR per fetch
+    slot by default), so URLs waiting on a throttled host do not hold fetch
+    slots. All fetches share one pooled HttpClient unless `client` is given.
+    With a `cache`, unchanged pages reuse their stored findings and skip the
+    analysis stage entirely; with a `memo`, so do pages whose body is
+    byte-identical to one analyzed earlier. A `profiler` profiles the fetch stage on each worker
+    thread (and the analysis stage too when it runs on threads).
+
+    Hostnames are resolved ahead of their fetches through the client's DNS
+    cache (the own client gets one), as URLs are read from the input. A host
+    that does not exist fails its URL right away, without taking a fetch
+    slot, a rate-limit token or a retry.
+
+    Failed fetches are retried with backoff according to `retry`; the worker
+    waits out the delay. With a `journal`, URLs it records as completed are
+    skipped, and every start and outcome is checkpointed to it.
+
+    With `headers_only`, pages are fetched with the headers-only profile
+    (see pipeline.fetch_page): no body is downloaded, the analysis stage
+    and its process pool are not used, and neither is the cache.
+    """
+    loop = asyncio.get_running_loop()
+    own_client = client is None
+    if own_client:
+        client = HttpClient(max_per_host=per_host, resolver=DnsCache())
+    resolver = client.resolver
+
+    if headers_only:
+        analysis_workers = 0
+    elif analysis_workers is None:
+        analysis_workers = os.cpu_count() or 1
+    fetch_executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scan")
+    analysis_executor = (
+        ProcessPoolExecutor(max_workers=analysis_workers, initializer=_log_to_stderr)
+        if analysis_workers else None
+    )
+    analyzer_count = analysis_workers or 1
+    limiter = RateLimiter(rate) if rate else None
+
+    fetch = fetch_page
+    analyze = timed_call
+    if profiler is not None:
+        fetch = profiler.wrap(fetch_page)
+        if analysis_executor is None:
+            analyze = profiler.wrap(timed_call)
+
+    # URLs are admitted ahead of the fetch slots, so a host that is throttled
+    # or paused holds up only its own URLs, not the rest of the list
+    admission = asyncio.Semaphore(backlog or concurrency * BACKLOG_FACTOR)
+    fetch_slots = asyncio.Semaphore(concurrency)
+    to_analyze: asyncio.Queue = asyncio.Queue(maxsize=analyzer_count * 2)
+    results: asyncio.Queue = asyncio.Queue()
+    throttles: Dict[str, HostThrottle] = {}
+    host_users: Dict[str, int] = {}
+    scans: Set[asyncio.Future] = set()
+    done = object()
+
+    feed_errors: List[BaseException] = []
+
+    async def feed() -> None:
+        try:
+            for url in urls:
+                if journal is not None and journal.is_done(url):
+                    continue
+                if resolver is not None:
+                    target = parse_target(url)
+                    if target is not None:
+                        resolver.prefetch(target.host)
+
+                await admission.acquire()
+                scan = asyncio.ensure_future(scan_one(url))
+                scans.add(scan)
+                scan.add_done_callback(scans.discard)
+        except Exception as e:
+            # Stop feeding but let in-flight scans finish; re-raised at the end
+            feed_errors.append(e)
+
+        outcomes = await asyncio.gather(*scans, return_exceptions=True)
+        feed_errors.extend(o for o in outcomes if isinstance(o, Exception))
+        for _ in range(analyzer_count):
+            await to_analyze.put(done)
+
+    async def pre_resolve(url: str) -> Optional[ScanResult]:
+        """
+        Wait for the URL's host lookup; a failed result if the host does not exist.
+        """
+        target = parse_target(url) if resolver is not None else None
+        if target is None:
+            return None  # invalid URLs are reported by fetch_page()
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wrap_future(resolver.prefetch(target.host))
+        except socket.gaierror as e:
+            if not is_permanent_failure(e):
+                return None  # transient: let the fetch (and its retries) try again
+            result = ScanResult(url=url, scanned_url=target.url)
+            error = URLError(e)
+            result.error = f"[ERROR] Unable to fetch response from {result.scanned_url}: {error}"
+            result.error_kind = classify_error(error)
+            record_stage(result, "http.dns", time.perf_counter() - started)
+            return result
+        return None
+
+    async def fetch_one(url: str, throttle: HostThrottle) -> Tuple[ScanResult, Optional[ResponseData]]:
+        result = ScanResult(url=url)
+        started = await throttle.acquire()
+        try:
+            async with fetch_slots:
+                if limiter:
+                    await limiter.acquire()
+                response = await loop.run_in_executor(
+                    fetch_executor, fetch, result, client, cache, False, headers_only
+                )
+        except Exception as e:
+            result.error = f"[ERROR] Scan failed due to unexpected error: {str(e)}"
+            response = None
+        finally:
+            throttle.release(started, result)
+        return result, response
+
+    async def scan_one(url: str) -> None:
+        started = time.perf_counter()
+        try:
+            if journal is not None:
+                journal.started(url)
+
+            rejected = await pre_resolve(url)
+            if rejected is not None:
+                rejected.elapsed = time.perf_counter() - started
+                await results.put(rejected)
+                return
+
+            host = _host_key(url)
+            throttle = throttles.get(host)
+            if throttle is None:
+                throttle = throttles[host] = HostThrottle(per_host, rate=host_rate)
+            host_users[host] = host_users.get(host, 0) + 1
+
+            try:
+                result, response = await fetch_one(url, throttle)
+                while response is None and retry is not None and retry.should_retry(result):
+                    await asyncio.sleep(retry.delay(result))
+                    attempts = result.attempts + 1
+                    result, response = await fetch_one(url, throttle)
+                    result.attempts = attempts
+            finally:
+                # Drop idle host state so a 20k-host sweep does not keep it all;
+                # a host paused by Retry-After keeps its pause
+                host_users[host] -= 1
+                if not host_users[host]:
+                    del host_users[host]
+                    if throttle.idle:
+                        del throttles[host]
+
+            if response is None:
+                result.elapsed = time.perf_counter() - started
+                await results.put(result)
+            else:
+                # Blocks when the analysis stage falls behind (backpressure)
+                await to_analyze.put((result, response, started))
+        finally:
+            admission.release()
+
+    async def analyzer() -> None:
+        while True:
+            item = await to_analyze.get()
+            if item is done:
+                break
+
+            result, response, started = item
+            executor = analysis_executor or fetch_executor
+            try:
+                memoized = memo.get(response.body_hash) if memo is not None else None
+                if memoized is not None:
+                    body_findings, wall, cpu = memoized[0], 0.0, 0.0
+                else:
+                    body_findings, wall, cpu = await loop.run_in_executor(executor, analyze, analyze_body, response.body)
+                    if memo is not None:
+                        memo.put(response.body_hash, body_findings)
+            except Exception as e:
+                result.findings.append(
+                    Finding("form.error", "error", detail=f"Form analysis could not be completed: {str(e)}")
+                )
+            else:
+                record_stage(result, "html", wall, cpu)
+                header_findings = list(result.findings)
+                result.findings.extend(body_findings)
+                if cache is not None:
+                    await loop.run_in_executor(
+                        fetch_executor, cache.store, result.scanned_url, response, header_findings, body_findings
+                    )
+            response.release_body()
+            result.elapsed = time.perf_counter() - started
+            await results.put(result)
+        await results.put(done)
+
+    tasks = [asyncio.ensure_future(feed())]
+    tasks.extend(asyncio.ensure_future(analyzer()) for _ in range(analyzer_count))
+
+    try:
+        finished_analyzers = 0
+        while finished_analyzers < analyzer_count:
+            item = await results.get()
+            if item is done:
+                finished_analyzers += 1
+                continue
+            if journal is not None:
+                journal.finished(item)
+            yield item
+
+        # Surface errors raised while reading the input iterable
+        if feed_errors:
+            raise feed_errors[0]
+    finally:
+        for task in tasks + list(scans):
+            task.cancel()
+        await asyncio.gather(*tasks, *scans, return_exceptions=True)
+        fetch_executor.shutdown(wait=False, cancel_futures=True)
+        if analysis_executor is not None:
+            analysis_executor.shutdown(wait=True, cancel_futures=True)
+        if own_client:
+            client.close()
+            resolver.close()
+
+
+def run_scan_many(
+    urls: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    rate: Optional[float] = None,
+    host_rate: Optional[float] = None,
+    analysis_workers: Optional[int] = None,
+    cache: Optional[ScanCache] = None,
+    profiler: Optional[ThreadProfiler] = None,
+    retry: Optional[RetryPolicy] = None,
+    journal: Optional[ScanJournal] = None,
+    memo: Optional[AnalysisMemo] = None,
+    headers_only: bool = False,
+    client: Optional[HttpClient] = None,
+    backlog: Optional[int] = None,
+) -> Iterator[ScanResult]:
+    """
+    Synchronous batch entry point around scan_many().
+    Yields ScanResult objects in completion order.
+    """
+    return iterate_sync(scan_many(
+        urls,
+        concurrency=concurrency,
+        per_host=per_host,
+        rate=rate,
+        host_rate=host_rate,
+        analysis_workers=analysis_workers,
+        cache=cache,
+        profiler=profiler,
+        retry=retry,
+        journal=journal,
+        memo=memo,
+        headers_only=headers_only,
+        client=client,
+        backlog=backlog,
+    ))
+
+
+def iterate_sync(agen: AsyncIterator[ScanResult]) -> Iterator[ScanResult]:
+    """
+    Drive an async result generator on a private event loop, yielding its items.
+    Closing the iterator early cancels the remaining work.
+    """
+    loop = asyncio.new_event_loop()
+
+    try:
+        while True:
+            try:
+                result = loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+            yield result
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
@@ -0,0 +1,131 @@
+"""
+Benchmark the form extraction backends against each other.
+
+    python benchmarks/bench_forms.py --corpus path/to/saved/pages
+    python benchmarks/bench_forms.py              # synthetic pages only
+
+The corpus is any directory of saved pages (*.html / *.htm), e.g. captured
+with `curl -o` from real sites. Without one, large synthetic pages are
+generated. Every backend's output is checked against the BeautifulSoup path
+before timings are reported.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_parser import FORM_BACKENDS, extract_forms_from_html, lxml_etree  # noqa: E402
+
+
+def synthetic_page(forms: int, filler_blocks: int, seed: int) -> str:
+    """
+    A large page with nested layout, inline scripts and styles, and forms.
+    """
+    rng = random.Random(seed)
+    parts = ["<!DOCTYPE html><html><head><title>Synthetic</title>",
+             "<style>body{margin:0} .x>.y{color:red}</style>",
+             "<script>var s = '<form>not a form</form>'; for (var i = 0; i < 10; i++) {}</script>",
+             "</head><body>"]
+
+    for i in range(filler_blocks):
+        parts.append(
+            f"<div class='row r{i}'><div class='col'><p>Paragraph {i} with "
+            f"<a href='/p/{i}?q={rng.random():.6f}'>a link</a> &amp; <b>bold</b> text."
+            f"</p><ul>{''.join(f'<li>item {j}</li>' for j in range(5))}</ul></div></div>"
+        )
+        if forms and i % max(1, filler_blocks // forms) == 0:
+            method = rng.choice(["get", "post", "POST"])
+            parts.append(
+                f"<form method='{method}' action='/submit/{i}'>"
+                f"<input type='text' name='q{i}'><input type='password' name='pw'>"
+                f"<input type='hidden' name='csrf_token' value='{rng.getrandbits(64):x}'>"
+                f"<input name='untyped'><select name='s'><option>1</option></select>"
+                f"<button type='submit'>Go</button></form>"
+            )
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def load_corpus(path: str) -> List[Tuple[str, str]]:
+    pages = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith((".html", ".htm")):
+            with open(os.path.join(path, name), "rb") as fh:
+                raw = fh.read()
+            try:
+                text = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                text = raw.decode("latin1")
+            pages.append((name, text))
+    return pages
+
+
+def time_backend(backend: str, pages: List[Tuple[str, str]], repeat: int) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _, html in pages:
+            extract_forms_from_html(html, backend=backend)
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="directory of saved HTML pages")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per backend")
+    parser.add_argument("--pages", type=int, default=20, help="synthetic pages when no corpus is given")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        pages = load_corpus(args.corpus)
+    else:
+        pages = [
+            (f"synthetic-{i}", synthetic_page(forms=200, filler_blocks=4000, seed=i))
+            for i in range(args.pages)
+        ]
+
+    if not pages:
+        print("[ERROR] No pages to benchmark.")
+        return 1
+
+    backends = [b for b in FORM_BACKENDS if b != "lxml" or lxml_etree is not None]
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in pages)
+
+    # Silence the "no forms" notes while benchmarking
+    with contextlib.redirect_stdout(io.StringIO()):
+        mismatches: Dict[str, List[str]] = {}
+        for name, html in pages:
+            expected = extract_forms_from_html(html, backend="bs4")
+            for backend in backends:
+                if extract_forms_from_html(html, backend=backend) != expected:
+                    mismatches.setdefault(backend, []).append(name)
+
+        timings = {backend: time_backend(backend, pages, args.repeat) for backend in backends}
+
+    print(f"Pages: {len(pages)}  Total size: {total_bytes / 1e6:.1f} MB  Runs: {args.repeat}")
+    print(f"{'backend':<8} {'median s':>10} {'MB/s':>8} {'speedup':>8}  output")
+
+    baseline = statistics.median(timings["bs4"])
+    for backend in backends:
+        median = statistics.median(timings[backend])
+        differs = mismatches.get(backend)
+        output = f"differs on {len(differs)} page(s)" if differs else "identical"
+        print(
+            f"{backend:<8} {median:>10.3f} {total_bytes / 1e6 / median:>8.1f} "
+            f"{baseline / median:>7.1f}x  {output}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Benchmark input preparation for large URL lists.
+
+    python benchmarks/bench_input.py --input inventory.txt
+    python benchmarks/bench_input.py --urls 1000000   # synthetic list only
+
+Compares input_handler.prepare_targets() (one parse per URL, precompiled
+patterns, cached host checks, digest-based deduplication) with the previous
+per-URL path, which called validate_url(), normalize_url() and
+is_single_domain() on every line, each re-parsing the URL with urlparse.
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Callable, Iterable, List
+from urllib.parse import urlparse, urlunparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from input_handler import prepare_targets  # noqa: E402
+
+
+# ==============================
+# Previous implementation (baseline)
+# ==============================
+def legacy_validate_url(url: str) -> bool:
+    try:
+        temp_url = url if url.startswith(("http://", "https://")) else "http://" + url
+        parsed = urlparse(temp_url)
+        host = parsed.netloc
+        if parsed.port is not None:
+            host = host.rsplit(":", 1)[0]
+        if not host or "." not in host or host.startswith(".") or host.endswith("."):
+            return False
+        if not re.match(r"^[a-zA-Z0-9.-]+$", host):
+            return False
+        if parsed.scheme and parsed.scheme not in ("http", "https"):
+            return False
+        return True
+    except Exception:
+        return False
+
+
+def legacy_normalize_url(url: str) -> str:
+    if not url.startswith(("http://", "https://")):
+        url = "http://" + url
+    parsed = urlparse(url)
+    return urlunparse((parsed.scheme, parsed.netloc, parsed.path, "", "", ""))
+
+
+def legacy_is_single_domain(url: str) -> bool:
+    if not url.startswith(("http://", "https://")):
+        url = "http://" + url
+    host = urlparse(url).netloc
+    if not host or "." not in host:
+        return False
+    return 2 <= len(host.split(".")) <= 3
+
+
+def legacy_prepare(urls: Iterable[str]) -> int:
+    seen = set()
+    for url in urls:
+        if legacy_validate_url(url):
+            normalized = legacy_normalize_url(url)
+            legacy_is_single_domain(normalized)
+            seen.add(normalized)
+    return len(seen)
+
+
+def fast_prepare(urls: Iterable[str]) -> int:
+    count = 0
+    for _, target in prepare_targets(urls):
+        if target is not None:
+            target.single_domain
+            count += 1
+    return count
+
+
+# ==============================
+# Inputs
+# ==============================
+def synthetic_urls(count: int, seed: int) -> List[str]:
+    """
+    An inventory-like list: many URLs per host, mixed schemes and ports,
+    duplicates, IDNA hosts and some junk lines.
+    """
+    rng = random.Random(seed)
+    hosts = [f"{rng.choice(['', 'www.', 'shop.', 'api.'])}site{i}.{rng.choice(['com', 'co.uk', 'de', 'com.au'])}"
+             for i in range(max(1, count // 20))]
+    hosts += ["bücher.de", "例え.jp", "10.0.0.1", "[2001:db8::1]"]
+
+    urls = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.02:
+            urls.append(f"not a url {i}")
+            continue
+        host = rng.choice(hosts)
+        scheme = rng.choice(["http://", "https://", ""])
+        port = rng.choice(["", "", "", ":8080"])
+        urls.append(f"{scheme}{host}{port}/path/{rng.randrange(count // 4 + 1)}?q={i}#frag")
+    return urls
+
+
+def time_runs(prepare: Callable[[Iterable[str]], int], urls: List[str], repeat: int) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        prepare(urls)
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="URL list to prepare (one per line)")
+    parser.add_argument("--urls", type=int, default=200_000, help="synthetic URLs when no list is given")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per implementation")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as fh:
+            urls = [line.strip() for line in fh if line.strip()]
+    else:
+        urls = synthetic_urls(args.urls, seed=1)
+
+    legacy = statistics.median(time_runs(legacy_prepare, urls, args.repeat))
+    fast = statistics.median(time_runs(fast_prepare, urls, args.repeat))
+
+    print(f"URLs: {len(urls)}  Runs: {args.repeat}")
+    print(f"{'path':<16} {'median s':>10} {'URLs/s':>12} {'speedup':>8}")
+    for name, median in (("legacy", legacy), ("prepare_targets", fast)):
+        print(f"{name:<16} {median:>10.3f} {len(urls) / median:>12,.0f} {legacy / median:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
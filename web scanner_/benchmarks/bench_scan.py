@@ -0,0 +1,270 @@
+"""
+End-to-end scanner benchmark against a local fixture server.
+
+    python benchmarks/bench_scan.py --output results.json
+    python benchmarks/bench_scan.py --compare results.json   # flag regressions
+
+benchmarks/fixture_server.py is started as a subprocess (so it does not share
+the scanner's GIL) and serves each scenario: security header sets, many
+Set-Cookie headers, large pages with hundreds of forms, slow drip-fed
+responses and redirect chains. For every scenario the suite measures
+
+- scan/<scenario>        run_scan() end to end: URLs/sec, latency p50/p95/p99,
+                         peak traced memory
+- headers|cookies|forms/<scenario>
+                         each analyzer alone on the pre-fetched response
+- batch/mixed            run_scan_many() over all scenarios at once
+- batch/headers-only     the same with the headers-only profile (HEAD requests)
+
+Results are saved as JSON keyed by benchmark name. With --compare, throughput
+and p95 latency are checked against an earlier run and the exit status is 1
+when any benchmark got slower by more than --threshold.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import run_scan_many  # noqa: E402
+from cookie_analyzer import analyze_cookies  # noqa: E402
+from header_analyzer import analyze_security_headers  # noqa: E402
+from http_client import HttpClient  # noqa: E402
+from pipeline import analyze_body, run_scan  # noqa: E402
+
+FIXTURE_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixture_server.py")
+
+# name -> (fixture path, URLs per round). Each URL gets a distinct /n-<i> suffix.
+SCENARIOS = {
+    "headers-none": ("/page/kb-4/forms-1/headers-none", 200),
+    "headers-secure": ("/page/kb-4/forms-1/headers-secure", 200),
+    "cookies-50": ("/page/kb-4/forms-1/cookies-50", 200),
+    "large-forms": ("/page/kb-512/forms-300/headers-secure", 20),
+    "slow-drip": ("/page/kb-64/forms-5/drip-200", 5),
+    "redirects-5": ("/redirect/hops-5/page/kb-8/forms-2", 100),
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an unsorted sample.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies: List[float], duration: float, errors: int = 0) -> Dict[str, float]:
+    return {
+        "ops": len(latencies),
+        "errors": errors,
+        "ops_per_sec": len(latencies) / duration if duration else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p95_ms": percentile(latencies, 95) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+    }
+
+
+def peak_memory(func: Callable[[], None]) -> float:
+    """
+    Peak traced Python allocations (KiB) while running `func` once.
+    Run separately from the timed rounds, since tracing slows everything down.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def time_calls(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call_started = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            errors += 1  # measured anyway: the pipeline reports these as findings
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+@contextlib.contextmanager
+def fixture_server():
+    """
+    Start fixture_server.py on a free port and yield its base URL.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, FIXTURE_SERVER, "--port", "0"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        line = proc.stdout.readline()
+        if "http://" not in line:
+            raise RuntimeError(f"fixture server did not start: {line!r}")
+        yield line.rsplit(" ", 1)[1].strip().rstrip("/")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def bench_scan(urls: List[str], client: HttpClient) -> Dict[str, float]:
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for url in urls:
+        call_started = time.perf_counter()
+        if run_scan(url, client).startswith("[ERROR]"):
+            errors += 1
+        latencies.append(time.perf_counter() - call_started)
+    stats = summarize(latencies, time.perf_counter() - started, errors)
+    stats["peak_kb"] = peak_memory(lambda: [run_scan(url, client) for url in urls[:5]])
+    return stats
+
+
+def bench_analyzers(url: str, client: HttpClient, repeat: int) -> Dict[str, Dict[str, float]]:
+    response = client.request(url)
+    is_https = response.final_url.startswith("https://")
+    body = response.body
+
+    return {
+        "headers": time_calls(lambda: analyze_security_headers(response.headers, is_https), repeat),
+        "cookies": time_calls(lambda: analyze_cookies(response.cookies, is_https), repeat),
+        "forms": time_calls(lambda: analyze_body(body), max(1, repeat // 100)),
+    }
+
+
+def bench_batch(urls: List[str], concurrency: int, headers_only: bool = False) -> Dict[str, float]:
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for result in run_scan_many(urls, concurrency=concurrency, per_host=concurrency, headers_only=headers_only):
+        latencies.append(result.elapsed)
+        errors += bool(result.error)
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def run_suite(base_url: str, rounds: int, repeat: int, concurrency: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    all_urls: List[str] = []
+
+    with HttpClient() as client:
+        for name, (path, count) in SCENARIOS.items():
+            urls = [f"{base_url}{path}/n-{i}" for i in range(count)]
+            all_urls.extend(urls)
+            print(f"[INFO] {name}: {count} URLs x {rounds} round(s)", file=sys.stderr)
+
+            run_scan(urls[0], client)  # warm up the connection pool and caches
+            runs = [bench_scan(urls, client) for _ in range(rounds)]
+            results[f"scan/{name}"] = min(runs, key=lambda r: r["p50_ms"])
+
+            if "drip" not in path:
+                for analyzer, stats in bench_analyzers(urls[0], client, repeat).items():
+                    results[f"{analyzer}/{name}"] = stats
+
+    print(f"[INFO] batch: {len(all_urls)} URLs, concurrency {concurrency}", file=sys.stderr)
+    results["batch/mixed"] = bench_batch(all_urls, concurrency)
+    results["batch/headers-only"] = bench_batch(all_urls, concurrency, headers_only=True)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(FIXTURE_SERVER),
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count() or 1,
+    }
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'benchmark':<28}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>10}{'errors':>8}")
+    for name, s in results.items():
+        peak = f"{s['peak_kb']:.0f}" if "peak_kb" in s else "-"
+        print(
+            f"{name:<28}{s['ops_per_sec']:>12.1f}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}"
+            f"{s['p99_ms']:>10.3f}{peak:>10}{s['errors']:>8}"
+        )
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> int:
+    """
+    Print throughput/p95 deltas against `baseline`; return the number of regressions.
+    """
+    regressions = 0
+    print(f"\n{'benchmark':<28}{'ops/s':>10}{'p95':>10}")
+    for name, s in results.items():
+        base = baseline.get(name)
+        if not base or not base["ops_per_sec"] or not base["p95_ms"]:
+            continue
+
+        throughput = s["ops_per_sec"] / base["ops_per_sec"] - 1
+        latency = s["p95_ms"] / base["p95_ms"] - 1
+        regressed = throughput < -threshold or latency > threshold
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<28}{throughput:>+10.1%}{latency:>+10.1%}{flag}")
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="timed rounds per scan scenario (best is kept)")
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per analyzer benchmark")
+    parser.add_argument("--concurrency", type=int, default=20, help="batch benchmark concurrency")
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown counted as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    baseline: Optional[Dict] = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+
+    # Scan diagnostics ("[INFO] No HTML <form> elements found", ...) are not results
+    with fixture_server() as base_url, contextlib.redirect_stdout(io.StringIO()):
+        results = run_suite(base_url, args.rounds, args.repeat, args.concurrency)
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"environment": environment(), "results": results}, fh, indent=2)
+        print(f"\n[INFO] Results saved to {args.output}")
+
+    if baseline is not None and compare(results, baseline, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Command-line startup benchmark: wall time of short main.py runs, each in a
+fresh interpreter, so module imports and process set-up are what is measured.
+
+    python benchmarks/bench_startup.py --output startup.json
+    python benchmarks/bench_startup.py --compare startup.json   # flag regressions
+
+Cases:
+
+- python            `python -c pass`, the interpreter's own floor
+- help              `main.py --help`, argument parsing only
+- scan              `main.py URL` against benchmarks/fixture_server.py
+- scan-cached       the same URL again with a warm --cache
+
+Every case also records how many modules the run imported and whether
+BeautifulSoup was among them (taken from one extra `-X importtime` run,
+which is not timed). With --compare, the exit status is 1 when any case's
+median got slower by more than --threshold.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_scan import environment, fixture_server  # noqa: E402
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def imported_modules(command: List[str]) -> List[str]:
+    """
+    Names of the modules `command` (a Python command line) imports.
+    """
+    run = subprocess.run(
+        [command[0], "-X", "importtime"] + command[1:],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    return [
+        line.rsplit("|", 1)[1].strip()
+        for line in run.stderr.splitlines()
+        if line.startswith("import time:") and not line.rstrip().endswith("| imported package")
+    ]
+
+
+def time_command(command: List[str], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        samples.append(time.perf_counter() - started)
+
+    modules = imported_modules(command)
+    return {
+        "runs": repeat,
+        "p50_ms": statistics.median(samples) * 1e3,
+        "min_ms": min(samples) * 1e3,
+        "max_ms": max(samples) * 1e3,
+        "modules": len(modules),
+        "bs4": "bs4" in modules,
+    }
+
+
+def run_suite(base_url: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    url = f"{base_url}/page/kb-4/forms-1/headers-secure/n-0"
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "cache.db")
+        cases = {
+            "python": [sys.executable, "-c", "pass"],
+            "help": [sys.executable, MAIN, "--help"],
+            "scan": [sys.executable, MAIN, url],
+            "scan-cached": [sys.executable, MAIN, url, "--cache", cache],
+        }
+        subprocess.run(cases["scan-cached"], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)  # fill the cache
+
+        results = {}
+        for name, command in cases.items():
+            print(f"[INFO] {name}: {repeat} runs", file=sys.stderr)
+            results[name] = time_command(command, repeat)
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'case':<16}{'p50 ms':>10}{'min ms':>10}{'max ms':>10}{'modules':>10}{'bs4':>6}")
+    for name, s in results.items():
+        print(
+            f"{name:<16}{s['p50_ms']:>10.1f}{s['min_ms']:>10.1f}{s['max_ms']:>10.1f}"
+            f"{s['modules']:>10}{'yes' if s['bs4'] else 'no':>6}"
+        )
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> int:
+    """
+    Print median deltas against `baseline`; return the number of regressions.
+    """
+    regressions = 0
+    print(f"\n{'case':<16}{'p50':>10}")
+    for name, s in results.items():
+        base = baseline.get(name)
+        if not base or not base["p50_ms"]:
+            continue
+
+        delta = s["p50_ms"] / base["p50_ms"] - 1
+        regressed = delta > threshold
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<16}{delta:>+10.1%}{flag}")
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=15, help="runs per case (the median is kept)")
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown counted as a regression (default 0.15)")
+    args = parser.parse_args(argv)
+
+    baseline: Optional[Dict] = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+
+    with fixture_server() as base_url:
+        results = run_suite(base_url, args.repeat)
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"environment": environment(), "results": results}, fh, indent=2)
+        print(f"\n[INFO] Results saved to {args.output}")
+
+    if baseline is not None and compare(results, baseline, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Local stand-in web server with configurable responses, for benchmarks and demos.
+
+    python benchmarks/fixture_server.py --port 5000
+
+Responses are described by the URL path, as `key-value` segments, because
+the scanner drops query strings when it normalizes URLs:
+
+    /page/kb-512/forms-300/cookies-50/headers-secure/drip-200/n-7
+    /redirect/hops-3/page/kb-16
+
+- kb       body size in KiB (default 4); filler markup around the forms
+- forms    number of <form> elements (default 1)
+- cookies  number of Set-Cookie headers (default 0)
+- headers  security header set: none, partial, secure (default partial)
+- drip     spread the body over this many milliseconds (slow response)
+- limit    answer 429 with Retry-After: 1 while more than this many
+           limit-* requests are in flight (a rate-limiting server or WAF)
+- head     answer HEAD requests with this status (e.g. 405) instead of
+           the GET response's headers
+- n        ignored; makes URLs distinct
+- /redirect/hops-N/<rest> answers 302 N times before serving /<rest>
+
+Bodies are generated once per shape and kept in memory. Bodies are sent
+with Content-Length over HTTP/1.1 keep-alive, like most production servers.
+"""
+import argparse
+import functools
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+
+HEADER_SETS: Dict[str, List[Tuple[str, str]]] = {
+    "none": [],
+    "partial": [
+        ("X-Frame-Options", "DENY"),
+        ("Referrer-Policy", "no-referrer"),
+    ],
+    "secure": [
+        ("Content-Security-Policy", "default-src 'self'"),
+        ("X-Frame-Options", "DENY"),
+        ("X-Content-Type-Options", "nosniff"),
+        ("Referrer-Policy", "strict-origin-when-cross-origin"),
+        ("Strict-Transport-Security", "max-age=31536000; includeSubDomains"),
+    ],
+}
+
+COOKIE_FLAGS = ("", "; HttpOnly", "; Secure; HttpOnly", "; Secure; HttpOnly; SameSite=Lax")
+
+DRIP_CHUNKS = 20
+
+
+def parse_path(path: str) -> Dict[str, str]:
+    """
+    Turn '/page/kb-16/forms-3' into {'kb': '16', 'forms': '3'}.
+    """
+    params = {}
+    for segment in path.split("?", 1)[0].strip("/").split("/"):
+        key, sep, value = segment.partition("-")
+        if sep:
+            params[key] = value
+    return params
+
+
+@functools.lru_cache(maxsize=256)
+def render_page(kb: int, forms: int) -> bytes:
+    """
+    An HTML page of roughly `kb` KiB containing `forms` forms of mixed quality
+    (GET/POST, with and without password fields and CSRF tokens).
+    """
+    target = kb * 1024
+    parts = ["<!DOCTYPE html><html><head><meta charset='utf-8'><title>Fixture</title>",
+             "<style>body{margin:0} .row{display:flex}</style></head><body>"]
+
+    for i in range(forms):
+        method = "post" if i % 3 else "get"
+        password = "<input type='password' name='pw'>" if i % 2 else ""
+        token = f"<input type='hidden' name='csrf_token' value='{i:016x}'>" if i % 4 else ""
+        parts.append(
+            f"<form method='{method}' action='/submit/{i}'>"
+            f"<input type='text' name='user{i}'>{password}{token}"
+            f"<button type='submit'>Send</button></form>"
+        )
+
+    size = sum(len(p) for p in parts)
+    block = 0
+    while size < target:
+        filler = (
+            f"<div class='row'><p>Block {block}: <a href='/page/n-{block}'>link</a> "
+            f"&amp; <b>bold</b> text.</p><ul><li>a</li><li>b</li><li>c</li></ul></div>"
+        )
+        parts.append(filler)
+        size += len(filler)
+        block += 1
+
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FixtureServer/1.0"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    limited_in_flight = 0
+    limited_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        params = parse_path(path)
+
+        if "limit" not in params:
+            self.respond(path, params)
+            return
+
+        cls = type(self)
+        with cls.limited_lock:
+            cls.limited_in_flight += 1
+            over = cls.limited_in_flight > int(params["limit"])
+        try:
+            if over:
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self.respond(path, params)
+        finally:
+            with cls.limited_lock:
+                cls.limited_in_flight -= 1
+
+    def do_HEAD(self):
+        refused = parse_path(self.path.split("?", 1)[0]).get("head")
+        if refused:
+            self.send_response(int(refused))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.do_GET()  # respond() leaves out the body
+
+    def respond(self, path: str, params: Dict[str, str]):
+
+        if path.startswith("/redirect/"):
+            hops = int(params.get("hops", "1"))
+            rest = path.strip("/").split("/", 2)[2:] or ["page"]
+            location = f"/redirect/hops-{hops - 1}/{rest[0]}" if hops > 1 else "/" + rest[0]
+            self.send_response(302)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if not (path == "/" or path.startswith("/page")):
+            self.send_error(404)
+            return
+
+        body = render_page(int(params.get("kb", "4")), int(params.get("forms", "1")))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in HEADER_SETS.get(params.get("headers", "partial"), []):
+            self.send_header(name, value)
+        for i in range(int(params.get("cookies", "0"))):
+            flags = COOKIE_FLAGS[i % len(COOKIE_FLAGS)]
+            self.send_header("Set-Cookie", f"c{i}=v{i}; Path=/{flags}")
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+
+        drip = float(params.get("drip", "0")) / 1000
+        if not drip:
+            self.wfile.write(body)
+            return
+
+        step = max(1, len(body) // DRIP_CHUNKS)
+        for offset in range(0, len(body), step):
+            self.wfile.write(body[offset:offset + step])
+            self.wfile.flush()
+            time.sleep(drip / DRIP_CHUNKS)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000, help="0 picks a free port")
+    args = parser.parse_args(argv)
+
+    httpd = ThreadingHTTPServer((args.host, args.port), FixtureHandler)
+    httpd.daemon_threads = True
+    host, port = httpd.server_address[:2]
+    # First line is machine-readable: benchmarks read the port from it
+    print(f"[INFO] Serving fixtures on http://{host}:{port}/", flush=True)
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class CheckDefinition:
+    """
+    Static text for one kind of finding, stored once and shared by every
+    Finding that references it. `title` may contain a "{subject}" placeholder
+    (cookie name, form number) filled in per finding.
+    """
+    check_id: str
+    title: str
+    severity: str        # default severity, "Low" / "Medium" / "High"
+    description: str
+    remediation: str
+
+
+CHECKS: Dict[str, CheckDefinition] = {}
+
+
+def register_check(check: CheckDefinition) -> CheckDefinition:
+    """
+    Add a check definition to the registry. IDs must be unique.
+    """
+    if check.check_id in CHECKS:
+        raise ValueError(f"Duplicate check id: {check.check_id}")
+    CHECKS[check.check_id] = check
+    return check
+
+
+def get_check(check_id: str) -> CheckDefinition:
+    return CHECKS[check_id]
+
+
+# ==============================
+# HEADER CHECKS
+# ==============================
+register_check(CheckDefinition(
+    check_id="header.csp",
+    title="Content-Security-Policy",
+    severity="Medium",
+    description="Controls which resources the browser is allowed to load.",
+    remediation="Define a Content-Security-Policy header to restrict allowed resources.",
+))
+register_check(CheckDefinition(
+    check_id="header.x-frame-options",
+    title="X-Frame-Options",
+    severity="Low",
+    description="Prevents the page from being embedded in frames or iframes.",
+    remediation="Add the X-Frame-Options header to control iframe embedding.",
+))
+register_check(CheckDefinition(
+    check_id="header.x-content-type-options",
+    title="X-Content-Type-Options",
+    severity="Low",
+    description="Prevents browsers from MIME-sniffing a response away from the declared content type.",
+    remediation="Set X-Content-Type-Options to 'nosniff'.",
+))
+register_check(CheckDefinition(
+    check_id="header.referrer-policy",
+    title="Referrer-Policy",
+    severity="Low",
+    description="Controls how much referrer information is included with requests.",
+    remediation="Define a Referrer-Policy to limit information leakage.",
+))
+register_check(CheckDefinition(
+    check_id="header.hsts",
+    title="Strict-Transport-Security",
+    severity="Medium",
+    description="Forces browsers to interact with the site only over HTTPS.",
+    remediation="Enable Strict-Transport-Security to enforce HTTPS connections.",
+))
+register_check(CheckDefinition(
+    check_id="header.error",
+    title="Header Analysis",
+    severity="Low",
+    description="Header analysis failed.",
+    remediation="Inspect response headers manually.",
+))
+
+# ==============================
+# COOKIE CHECKS
+# ==============================
+register_check(CheckDefinition(
+    check_id="cookie.none",
+    title="Cookies",
+    severity="Low",
+    description="No cookies were set by the server.",
+    remediation="No action required if the application does not rely on cookies.",
+))
+register_check(CheckDefinition(
+    check_id="cookie.secure",
+    title="Cookie '{subject}' - Secure Flag",
+    severity="Medium",
+    description="Ensures the cookie is only sent over HTTPS connections.",
+    remediation="Set the Secure flag to prevent the cookie from being sent over HTTP.",
+))
+register_check(CheckDefinition(
+    check_id="cookie.httponly",
+    title="Cookie '{subject}' - HttpOnly Flag",
+    severity="Medium",
+    description="Prevents JavaScript from accessing the cookie.",
+    remediation="Enable the HttpOnly flag to protect against client-side script access.",
+))
+register_check(CheckDefinition(
+    check_id="cookie.samesite",
+    title="Cookie '{subject}' - SameSite Attribute",
+    severity="Low",
+    description="Controls whether cookies are sent with cross-site requests.",
+    remediation="Set SameSite to 'Lax' or 'Strict' to reduce cross-site request risks.",
+))
+register_check(CheckDefinition(
+    check_id="cookie.error",
+    title="Cookie Analysis",
+    severity="Low",
+    description="Cookie analysis failed.",
+    remediation="Inspect cookies manually.",
+))
+
+# ==============================
+# HTML / FORM CHECKS
+# ==============================
+register_check(CheckDefinition(
+    check_id="html.missing",
+    title="HTML Content",
+    severity="Low",
+    description="No HTML body was returned by the server.",
+    remediation="Ensure the endpoint serves HTML content.",
+))
+register_check(CheckDefinition(
+    check_id="html.truncated",
+    title="HTML Content",
+    severity="Low",
+    description=(
+        "The response body exceeded the download size or time budget; "
+        "forms were analyzed on the part received."
+    ),
+    remediation="Inspect the page manually if it is expected to be this large or slow.",
+))
+register_check(CheckDefinition(
+    check_id="form.none",
+    title="Forms",
+    severity="Low",
+    description=(
+        "No HTML forms were detected in the page source. "
+        "This may be due to JavaScript-rendered forms."
+    ),
+    remediation=(
+        "If the application uses forms, ensure they are protected "
+        "against CSRF attacks."
+    ),
+))
+register_check(CheckDefinition(
+    check_id="form.method",
+    title="Form {subject} - HTTP Method",
+    severity="Medium",
+    description="GET forms expose submitted data in URLs, logs, and browser history.",
+    remediation="Use POST for forms that submit sensitive data.",
+))
+register_check(CheckDefinition(
+    check_id="form.password",
+    title="Form {subject} - Password Field",
+    severity="Low",
+    description="The form contains a password input field.",
+    remediation="Ensure the form is protected with HTTPS and CSRF tokens.",
+))
+register_check(CheckDefinition(
+    check_id="form.csrf",
+    title="Form {subject} - CSRF Protection",
+    severity="Medium",
+    description="CSRF tokens help prevent unauthorized cross-site requests.",
+    remediation="Include a unique, unpredictable CSRF token in the form.",
+))
+register_check(CheckDefinition(
+    check_id="form.error",
+    title="Form Analysis",
+    severity="Low",
+    description="Form analysis could not be completed.",
+    remediation="Manually inspect forms if applicable.",
+))
@@ -0,0 +1,58 @@
+from typing import List, Optional
+from models import ResponseCookie
+
+
+def parse_set_cookie(header: str) -> Optional[ResponseCookie]:
+    """
+    Parse one Set-Cookie header value in a single pass (RFC 6265 section 5.2).
+    Returns None when the header has no cookie name.
+
+    Attribute names are case-insensitive and unknown attributes are ignored.
+    Unlike http.cookies.SimpleCookie, a malformed attribute does not discard
+    the whole header, and Expires dates containing commas are kept intact.
+    """
+    pair, _, attributes = header.partition(";")
+    name, sep, value = pair.partition("=")
+    name = name.strip()
+    if not sep or not name:
+        return None
+
+    cookie = ResponseCookie(name=name, value=value.strip())
+    if not attributes:
+        return cookie
+
+    for attribute in attributes.split(";"):
+        key, _, val = attribute.partition("=")
+        key = key.strip().lower()
+
+        if key == "secure":
+            cookie.secure = True
+        elif key == "httponly":
+            cookie.httponly = True
+        elif key == "samesite":
+            cookie.samesite = val.strip()
+        elif key == "domain":
+            cookie.domain = val.strip().lstrip(".").lower() or None
+        elif key == "path":
+            cookie.path = val.strip() or None
+        elif key == "max-age":
+            try:
+                cookie.max_age = int(val.strip())
+            except ValueError:
+                pass  # invalid Max-Age is ignored, per RFC 6265
+        elif key == "expires":
+            cookie.expires = val.strip() or None
+
+    return cookie
+
+
+def parse_set_cookies(headers: List[str]) -> List[ResponseCookie]:
+    """
+    Parse every Set-Cookie header of a response, skipping malformed ones.
+    """
+    cookies = []
+    for header in headers:
+        cookie = parse_set_cookie(header)
+        if cookie is not None:
+            cookies.append(cookie)
+    return cookies
@@ -0,0 +1,301 @@
+import asyncio
+import hashlib
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from analysis_memo import AnalysisMemo
+from batch import DEFAULT_PER_HOST, _log_to_stderr, iterate_sync
+from defaults import DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES
+from http_client import HttpClient
+from metrics import ThreadProfiler, record_stage, timed_call
+from models import ScanResult
+from pipeline import analyze_page, fetch_page
+from resolver import DnsCache
+from throttle import HostThrottle
+
+
+# Links to these are not HTML pages; skip them without a request
+SKIP_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".bmp",
+    ".css", ".js", ".mjs", ".map", ".json", ".xml", ".txt",
+    ".pdf", ".zip", ".gz", ".tgz", ".rar", ".7z", ".dmg", ".exe", ".msi",
+    ".mp3", ".mp4", ".webm", ".avi", ".mov", ".woff", ".woff2", ".ttf", ".eot",
+)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+Origin = Tuple[str, str, int]
+
+
+def canonical_url(url: str) -> Optional[str]:
+    """
+    Crawl key for a URL: lowercase scheme and host, no default port,
+    no fragment, "/" for an empty path; the query string is kept.
+    Returns None for anything that is not an http(s) URL.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    netloc = parts.hostname.lower()
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def url_origin(url: str) -> Optional[Origin]:
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        return scheme, (parts.hostname or "").lower(), parts.port or DEFAULT_PORTS.get(scheme, 0)
+    except ValueError:
+        return None
+
+
+class UrlIndex:
+    """
+    Exact seen-set of crawl keys, stored as 64-bit digests rather than
+    strings so large sites stay cheap to track.
+    """
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, url: str) -> bool:
+        """
+        Record `url`; True if it had not been seen before.
+        """
+        digest = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+        if digest in self._seen:
+            return False
+        self._seen.add(digest)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic seen-set for very large crawls. False positives
+    (at about `error_rate` once `capacity` URLs are added) skip a page that
+    was never fetched; there are no false negatives.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, url: str) -> bool:
+        """
+        Record `url`; True if it was (probably) not seen before.
+        """
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+
+        new = False
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.size
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                new = True
+
+        self.count += new
+        return new
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def _crawlable(url: str, origins: List[Origin]) -> bool:
+    return url_origin(url) in origins and not urlsplit(url).path.lower().endswith(SKIP_EXTENSIONS)
+
+
+async def crawl(
+    start_url: str,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    max_time: Optional[float] = None,
+    concurrency: int = DEFAULT_PER_HOST,
+    host_rate: Optional[float] = None,
+    analysis_workers: Optional[int] = None,
+    client: Optional[HttpClient] = None,
+    bloom: bool = False,
+    profiler: Optional[ThreadProfiler] = None,
+    memo: Optional[AnalysisMemo] = None,
+) -> AsyncIterator[ScanResult]:
+    """
+    Crawl one origin breadth-first from `start_url`, scanning every page,
+    and yield each page's ScanResult as soon as it completes.
+
+    - `max_depth` limits how many links away from the start page to go.
+    - `max_pages` caps the number of pages requested.
+    - `max_time` (seconds) stops scheduling new pages once exceeded.
+    - `concurrency` pages are fetched at once at most (all against the same
+      origin), under an adaptive limit that backs off on 429/503/timeouts
+      and honours Retry-After; `host_rate` caps page requests per second.
+    - `bloom` tracks seen URLs in a BloomFilter instead of an exact UrlIndex.
+    - `profiler` profiles the fetch stage on each worker thread.
+    - `memo` reuses findings and links for pages whose body was already analyzed.
+
+    Links are only followed within the start URL's origin (or the origin
+    it redirects to). Query strings are kept, fragments dropped. HTML
+    analysis runs on a process pool as in batch.scan_many().
+    """
+    loop = asyncio.get_running_loop()
+    own_client = client is None
+    if own_client:
+        client = HttpClient(max_per_host=concurrency, resolver=DnsCache())
+
+    if analysis_workers is None:
+        analysis_workers = os.cpu_count() or 1
+    fetch_executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crawl")
+    analysis_executor = (
+        ProcessPoolExecutor(max_workers=analysis_workers, initializer=_log_to_stderr)
+        if analysis_workers else fetch_executor
+    )
+
+    start = canonical_url(start_url if "://" in start_url else "http://" + start_url)
+    deadline = time.monotonic() + max_time if max_time else None
+    seen = BloomFilter(capacity=max(max_pages * 20, 10_000)) if bloom else UrlIndex()
+    origins: List[Origin] = []
+    scheduled = 0
+    fetch = profiler.wrap(fetch_page) if profiler is not None else fetch_page
+    throttle = HostThrottle(concurrency, rate=host_rate)
+
+    frontier: asyncio.Queue = asyncio.Queue()
+    results: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def schedule(url: str, depth: int) -> None:
+        nonlocal scheduled
+        if scheduled < max_pages and seen.add(url):
+            scheduled += 1
+            frontier.put_nowait((url, depth))
+
+    async def scan_page(url: str, depth: int) -> ScanResult:
+        started = time.perf_counter()
+        result = ScanResult(url=url)
+
+        try:
+            throttled = await throttle.acquire()
+            try:
+                response = await loop.run_in_executor(fetch_executor, fetch, result, client, None, True)
+            finally:
+                throttle.release(throttled, result)
+            if response is None:
+                return result
+
+            memoized = memo.get(response.body_hash, need_links=True) if memo is not None else None
+            if memoized is not None:
+                (findings, links), wall, cpu = memoized, 0.0, 0.0
+            else:
+                (findings, links), wall, cpu = await loop.run_in_executor(
+                    analysis_executor, timed_call, analyze_page, response.body
+                )
+                if memo is not None:
+                    memo.put(response.body_hash, findings, links)
+            record_stage(result, "html", wall, cpu)
+            result.findings.extend(findings)
+            response.release_body()
+
+            final_url = canonical_url(response.final_url)
+            if final_url:
+                # A page reached through a redirect is not requested again by its own URL
+                seen.add(final_url)
+            if depth == 0 and final_url:
+                # Follow the start page's redirect, e.g. http -> https or example.com -> www
+                origins.append(url_origin(final_url))
+            if depth >= max_depth or final_url is None or url_origin(final_url) not in origins:
+                return result
+
+            for link in links:
+                target = canonical_url(urljoin(final_url, link.strip()))
+                if target and _crawlable(target, origins):
+                    schedule(target, depth + 1)
+        except Exception as e:
+            result.error = f"[ERROR] Scan failed due to unexpected error: {str(e)}"
+        finally:
+            result.elapsed = time.perf_counter() - started
+
+        return result
+
+    async def worker() -> None:
+        while True:
+            url, depth = await frontier.get()
+            try:
+                if deadline is None or time.monotonic() < deadline:
+                    await results.put(await scan_page(url, depth))
+            finally:
+                frontier.task_done()
+
+    async def coordinate() -> None:
+        await frontier.join()
+        await results.put(done)
+
+    if start is None:
+        raise ValueError(f"Invalid start URL: {start_url}")
+    origins.append(url_origin(start))
+    schedule(start, 0)
+
+    tasks = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    tasks.append(asyncio.ensure_future(coordinate()))
+
+    try:
+        while True:
+            item = await results.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        fetch_executor.shutdown(wait=False, cancel_futures=True)
+        if analysis_executor is not fetch_executor:
+            analysis_executor.shutdown(wait=True, cancel_futures=True)
+        if own_client:
+            client.close()
+            client.resolver.close()
+
+
+def run_crawl(
+    start_url: str,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    max_time: Optional[float] = None,
+    concurrency: int = DEFAULT_PER_HOST,
+    host_rate: Optional[float] = None,
+    analysis_workers: Optional[int] = None,
+    bloom: bool = False,
+    profiler: Optional[ThreadProfiler] = None,
+    memo: Optional[AnalysisMemo] = None,
+) -> Iterator[ScanResult]:
+    """
+    Synchronous entry point around crawl(). Yields one ScanResult per page.
+    """
+    return iterate_sync(crawl(
+        start_url,
+        max_depth=max_depth,
+        max_pages=max_pages,
+        max_time=max_time,
+        concurrency=concurrency,
+        host_rate=host_rate,
+        analysis_workers=analysis_workers,
+        bloom=bloom,
+        profiler=profiler,
+        memo=memo,
+    ))
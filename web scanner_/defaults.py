@@ -0,0 +1,32 @@
+"""
+Default limits shared by the command line and the scan modules. Kept free
+of imports so main.py can build its argument parser (and answer --help)
+without loading the scanner; each module re-exports the defaults it uses.
+"""
+
+# batch.py
+DEFAULT_CONCURRENCY = 50
+DEFAULT_PER_HOST = 2
+
+# crawler.py
+DEFAULT_MAX_DEPTH = 3
+DEFAULT_MAX_PAGES = 500
+
+# scan_cache.py
+DEFAULT_TTL = 7 * 24 * 3600
+
+# analysis_memo.py
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# retry.py
+DEFAULT_MAX_RETRIES = 2
+
+# work_queue.py
+DEFAULT_LEASE = 120.0      # seconds a claimed task is reserved for its worker
+
+# service.py
+DEFAULT_PORT = 8780
+DEFAULT_MAX_QUEUE = 10_000   # URLs waiting across all jobs before submissions are refused
+
+# reporter.py: REPORTERS keys
+REPORT_FORMATS = ("csv", "jsonl", "sarif", "text")
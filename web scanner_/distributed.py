@@ -0,0 +1,167 @@
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+from analysis_memo import AnalysisMemo
+from batch import run_scan_many, DEFAULT_CONCURRENCY, DEFAULT_PER_HOST
+from http_client import HttpClient
+from models import ScanResult
+from resolver import DnsCache
+from retry import RetryPolicy
+from scan_cache import ScanCache
+from work_queue import WorkQueue, DEFAULT_LEASE
+
+
+DEFAULT_POLL = 1.0  # seconds between queue polls when there is nothing to do
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class _LeaseKeeper(threading.Thread):
+    """
+    Renews the leases of the tasks a worker is scanning, every third of the
+    lease, so slow scans are not handed to another worker.
+    """
+
+    def __init__(self, queue: WorkQueue, worker_id: str, lease: float):
+        super().__init__(name="lease-keeper", daemon=True)
+        self.queue = queue
+        self.worker_id = worker_id
+        self.lease = lease
+        self.in_flight: Dict[str, int] = {}  # url -> task id
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.lease / 3):
+            try:
+                self.queue.renew(self.worker_id, list(self.in_flight.values()), self.lease)
+            except Exception as e:
+                # A missed renewal only risks a duplicate scan; keep trying
+                print(f"[ERROR] Could not renew leases: {e}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def run_worker(
+    queue: WorkQueue,
+    worker_id: Optional[str] = None,
+    lease: float = DEFAULT_LEASE,
+    poll: float = DEFAULT_POLL,
+    linger: float = 0.0,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    rate: Optional[float] = None,
+    host_rate: Optional[float] = None,
+    analysis_workers: Optional[int] = None,
+    cache: Optional[ScanCache] = None,
+    retry: Optional[RetryPolicy] = None,
+    memo: Optional[AnalysisMemo] = None,
+    headers_only: bool = False,
+) -> int:
+    """
+    Claim tasks from `queue`, scan them with the batch pipeline and push each
+    result back, until every task in the queue is done and nothing new was
+    queued for `linger` seconds. Returns the number of results this worker
+    stored.
+
+    Tasks are claimed in batches of half the concurrency as the scheduler
+    asks for more URLs, and the scheduler admits no more URLs than it has
+    fetch slots, so a worker holds at most one batch more leases than it has
+    scans in flight. One pooled client (and its DNS cache) serves the worker
+    for its whole lifetime, across polls. While other workers still hold leases the worker keeps polling, so it
+    picks up their tasks if those leases expire. With `headers_only`, every
+    task is scanned with the headers-only profile.
+    """
+    worker_id = worker_id or default_worker_id()
+    keeper = _LeaseKeeper(queue, worker_id, lease)
+    keeper.start()
+    client = HttpClient(max_per_host=per_host, resolver=DnsCache())
+    stored = 0
+    idle_since = time.monotonic()
+
+    def claimed_urls() -> Iterator[str]:
+        while True:
+            tasks = queue.claim(worker_id, max(1, concurrency // 2), lease)
+            if not tasks:
+                return
+            for task in tasks:
+                keeper.in_flight[task.url] = task.task_id
+                yield task.url
+
+    try:
+        while True:
+            scans = run_scan_many(
+                claimed_urls(),
+                concurrency=concurrency,
+                per_host=per_host,
+                rate=rate,
+                host_rate=host_rate,
+                analysis_workers=analysis_workers,
+                cache=cache,
+                retry=retry,
+                memo=memo,
+                headers_only=headers_only,
+                client=client,
+                backlog=concurrency,
+            )
+            for result in scans:
+                task_id = keeper.in_flight.pop(result.url)
+                if queue.complete(task_id, worker_id, result):
+                    stored += 1
+                idle_since = time.monotonic()
+
+            if queue.drained() and time.monotonic() - idle_since >= linger:
+                break
+            time.sleep(poll)
+    finally:
+        keeper.stop()
+        client.close()
+        client.resolver.close()
+
+    print(f"[INFO] Worker {worker_id} stored {stored} results")
+    return stored
+
+
+def enqueue_urls(queue: WorkQueue, urls: Iterable[str]) -> int:
+    """
+    Shard a URL list into queue tasks (one per distinct URL) and log the
+    queue state to stderr, keeping stdout for the report.
+    """
+    added = queue.enqueue(urls)
+    counts = queue.counts()
+    print(
+        f"[INFO] Queued {added} new URLs; {counts['queued']} queued, "
+        f"{counts['leased']} leased, {counts['done']} done",
+        file=sys.stderr,
+    )
+    return added
+
+
+def collect_results(queue: WorkQueue, poll: float = DEFAULT_POLL) -> Iterator[ScanResult]:
+    """
+    Yield every result in the queue in completion order as workers push
+    them back, until the queue is drained.
+
+    The queue keeps all results, so collecting again from the same queue
+    reports finished work again and only waits for the rest.
+    """
+    cursor = 0
+    while True:
+        # Check before reading, so results pushed in between are not missed
+        drained = queue.drained()
+        for cursor, result in queue.results(cursor):
+            yield result
+        if drained:
+            break
+
+        # Lost leases are also reclaimed by workers; this keeps counts honest
+        # and gives up on abandoned tasks even when no worker is left
+        queue.requeue_expired()
+        time.sleep(poll)
@@ -1,40 +1,27 @@
-from typing import List
-from bs4 import Tag
+from typing import List, Dict
 from models import Finding
 
 
 CSRF_KEYWORDS = ("csrf", "token", "auth", "nonce")
 
 
-def analyze_forms(forms: List[Tag]) -> List[Finding]:
+def analyze_forms(forms: List[Dict]) -> List[Finding]:
     """
     Analyze HTML forms for basic security hygiene.
+    Expects the form records produced by html_parser.extract_forms().
     Returns a list of Finding objects.
     """
 
     findings: List[Finding] = []
 
     if not forms:
-        findings.append(
-            Finding(
-                title="Forms",
-                status="absent",
-                severity="Low",
-                description=(
-                    "No HTML forms were detected in the page source. "
-                    "This may be due to JavaScript-rendered forms."
-                ),
-                remediation=(
-                    "If the application uses forms, ensure they are protected "
-                    "against CSRF attacks."
-                ),
-            )
-        )
+        findings.append(Finding("form.none", "absent"))
         return findings
 
     for index, form in enumerate(forms, start=1):
-        method = form.get("method", "GET").upper()
-        inputs = form.find_all("input")
+        method = (form.get("method") or "GET").upper()
+        action = form.get("action") or "this page"
+        inputs = form.get("inputs", [])
 
         has_password = False
         has_csrf_token = False
@@ -52,50 +39,26 @@ def analyze_forms(forms: List[Tag]) -> List[Finding]:
                         has_csrf_token = True
                         break
 
+        # The index alone normalizes away in aggregate.py; the target tells forms apart
+        subject = f"{index} ({method} {action})"
+
         # 1. Method check
         findings.append(
             Finding(
-                title=f"Form {index} - HTTP Method",
-                status="POST" if method == "POST" else "GET",
-                severity="Medium" if method != "POST" else "Low",
-                description=(
-                    "GET forms expose submitted data in URLs, logs, and browser history."
-                ),
-                remediation=(
-                    "Use POST for forms that submit sensitive data."
-                ),
+                "form.method",
+                "POST" if method == "POST" else "GET",
+                subject=subject,
+                severity_override="Medium" if method != "POST" else "Low",
             )
         )
 
         # 2. Password field safety
         if has_password:
-            findings.append(
-                Finding(
-                    title=f"Form {index} - Password Field",
-                    status="present",
-                    severity="Low",
-                    description=(
-                        "The form contains a password input field."
-                    ),
-                    remediation=(
-                        "Ensure the form is protected with HTTPS and CSRF tokens."
-                    ),
-                )
-            )
+            findings.append(Finding("form.password", "present", subject=subject))
 
         # 3. CSRF token presence
         findings.append(
-            Finding(
-                title=f"Form {index} - CSRF Protection",
-                status="present" if has_csrf_token else "missing",
-                severity="Medium",
-                description=(
-                    "CSRF tokens help prevent unauthorized cross-site requests."
-                ),
-                remediation=(
-                    "Include a unique, unpredictable CSRF token in the form."
-                ),
-            )
+            Finding("form.csrf", "present" if has_csrf_token else "missing", subject=subject)
         )
 
-    return findings
\ No newline at end of file
+    return findings
@@ -1,95 +1,201 @@
-from typing import List, Dict
-from models import Finding
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Pattern, Tuple, Union
+from checks import CHECKS, CheckDefinition, register_check
+from models import Finding, Headers
 
 
-def analyze_security_headers(headers: Dict[str, str], is_https: bool) -> List[Finding]:
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "header_rules.json")
+MEMO_SIZE = 4096  # distinct header configurations remembered per rule set
+
+HeaderInput = Union[Headers, Mapping[str, str]]
+
+
+@dataclass(frozen=True)
+class _Validator:
+    pattern: Pattern
+    status: str
+    detail: str
+    severity: Optional[str] = None
+    minimum: Optional[int] = None  # compare the first capture group as a number
+
+
+def _below_minimum(number: Optional[str], minimum: int) -> bool:
     """
-    Analyze HTTP response headers for presence of basic security headers.
-    Returns a list of Finding objects.
+    True unless the captured `number` is a whole number of at least `minimum`.
     """
+    return not number or not number.isdecimal() or int(number) < minimum
 
-    findings: List[Finding] = []
-
-    # Normalize headers for case-insensitive lookup
-    normalized_headers = {k.lower(): v for k, v in headers.items()}
-
-    def header_present(header_name: str) -> bool:
-        return header_name.lower() in normalized_headers
-
-    # 1. Content-Security-Policy
-    findings.append(
-        Finding(
-            title="Content-Security-Policy",
-            status="present" if header_present("Content-Security-Policy") else "missing",
-            severity="Medium",
-            description=(
-                "Controls which resources the browser is allowed to load."
-            ),
-            remediation=(
-                "Define a Content-Security-Policy header to restrict allowed resources."
-            ),
-        )
-    )
 
-    # 2. X-Frame-Options
-    findings.append(
-        Finding(
-            title="X-Frame-Options",
-            status="present" if header_present("X-Frame-Options") else "missing",
-            severity="Low",
-            description=(
-                "Prevents the page from being embedded in frames or iframes."
-            ),
-            remediation=(
-                "Add the X-Frame-Options header to control iframe embedding."
-            ),
-        )
-    )
+@dataclass(frozen=True)
+class HeaderRule:
+    """
+    One compiled rule: the header it inspects and how its value is judged.
+    Yields "missing" when the header is absent, the status of the first
+    failed validator (with all failure details) when the value is bad,
+    and "present" otherwise.
+    """
+    check_id: str
+    header: str
+    https_only: bool
+    require: Tuple[_Validator, ...]  # value must match
+    forbid: Tuple[_Validator, ...]   # value must not match
 
-    # 3. X-Content-Type-Options
-    findings.append(
-        Finding(
-            title="X-Content-Type-Options",
-            status="present" if header_present("X-Content-Type-Options") else "missing",
-            severity="Low",
-            description=(
-                "Prevents browsers from MIME-sniffing a response away from the declared content type."
-            ),
-            remediation=(
-                "Set X-Content-Type-Options to 'nosniff'."
-            ),
-        )
+
+def _compile_validator(spec: Dict) -> _Validator:
+    pattern = re.compile(spec["pattern"], re.IGNORECASE)
+    minimum = spec.get("min")
+    if minimum is not None and pattern.groups < 1:
+        raise ValueError(f"Header rule validator with \"min\" needs a capture group: {spec['pattern']}")
+    return _Validator(
+        pattern=pattern,
+        status=spec.get("status", "weak"),
+        detail=spec.get("detail", ""),
+        severity=spec.get("severity"),
+        minimum=minimum,
     )
 
-    # 4. Referrer-Policy
-    findings.append(
-        Finding(
-            title="Referrer-Policy",
-            status="present" if header_present("Referrer-Policy") else "missing",
-            severity="Low",
-            description=(
-                "Controls how much referrer information is included with requests."
-            ),
-            remediation=(
-                "Define a Referrer-Policy to limit information leakage."
-            ),
-        )
+
+def _compile_rule(spec: Dict) -> HeaderRule:
+    check_id = spec["check_id"]
+
+    # Rules may define their own check, so new checks need no code changes
+    if check_id not in CHECKS:
+        check = spec.get("check")
+        if check is None:
+            raise ValueError(f"Header rule references unknown check: {check_id}")
+        register_check(CheckDefinition(check_id=check_id, **check))
+
+    return HeaderRule(
+        check_id=check_id,
+        header=spec["header"],
+        https_only=bool(spec.get("https_only", False)),
+        require=tuple(_compile_validator(v) for v in spec.get("require", ())),
+        forbid=tuple(_compile_validator(v) for v in spec.get("forbid", ())),
     )
 
-    # 5. Strict-Transport-Security (HTTPS only)
-    if is_https:
-        findings.append(
-            Finding(
-                title="Strict-Transport-Security",
-                status="present" if header_present("Strict-Transport-Security") else "missing",
-                severity="Medium",
-                description=(
-                    "Forces browsers to interact with the site only over HTTPS."
-                ),
-                remediation=(
-                    "Enable Strict-Transport-Security to enforce HTTPS connections."
-                ),
+
+class HeaderRuleSet:
+    """
+    Header rules compiled once into a lookup table of precompiled regexes.
+
+    Responses served by the same configuration carry the same security
+    headers, so results are memoized on the values of the headers the rules
+    inspect: a repeated configuration costs one tuple lookup.
+    """
+
+    def __init__(self, rules: Iterable[HeaderRule]):
+        self.rules: List[HeaderRule] = list(rules)
+        self._table: List[Tuple[HeaderRule, str]] = [(r, r.header.lower()) for r in self.rules]
+        self.header_names: Tuple[str, ...] = tuple(dict.fromkeys(name for _, name in self._table))
+        self._memo: Dict[Tuple, Tuple[Finding, ...]] = {}
+        self._lock = threading.Lock()
+
+    def evaluate(self, headers: HeaderInput, is_https: bool) -> List[Finding]:
+        """
+        Findings for one response, in rule order.
+        """
+        if not isinstance(headers, Headers):
+            headers = Headers(headers.items())
+
+        values = {}
+        for name in self.header_names:
+            found = headers.get_all(name)
+            values[name] = ", ".join(found) if found else None
+
+        key = (is_https,) + tuple(values.values())
+        findings = self._memo.get(key)
+        if findings is None:
+            findings = tuple(
+                self._evaluate_rule(rule, values[name])
+                for rule, name in self._table
+                if is_https or not rule.https_only
             )
+            with self._lock:
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.clear()
+                self._memo[key] = findings
+
+        return list(findings)
+
+    def evaluate_many(self, responses: Iterable[Tuple[HeaderInput, bool]]) -> List[List[Finding]]:
+        """
+        Evaluate (headers, is_https) pairs in bulk; repeated configurations
+        are served from the memo.
+        """
+        return [self.evaluate(headers, is_https) for headers, is_https in responses]
+
+    @staticmethod
+    def _evaluate_rule(rule: HeaderRule, value: Optional[str]) -> Finding:
+        if value is None:
+            return Finding(rule.check_id, "missing")
+
+        failures: List[_Validator] = []
+
+        for validator in rule.require:
+            match = validator.pattern.search(value)
+            if match is None:
+                failures.append(validator)
+            elif validator.minimum is not None and _below_minimum(match.group(1), validator.minimum):
+                failures.append(validator)
+
+        # Each forbidden pattern is searched on its own: overlapping ones
+        # ("unsafe" and "unsafe-url") must all be reported
+        failures.extend(v for v in rule.forbid if v.pattern.search(value))
+
+        if not failures:
+            return Finding(rule.check_id, "present")
+
+        first = failures[0]
+        return Finding(
+            rule.check_id,
+            first.status,
+            severity_override=first.severity,
+            detail=" ".join(v.detail for v in failures if v.detail) or None,
         )
 
-    return findings
\ No newline at end of file
+
+def load_rules(path: str = DEFAULT_RULES_PATH) -> HeaderRuleSet:
+    """
+    Load and compile a header rule file (see header_rules.json for the format).
+    """
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return HeaderRuleSet(_compile_rule(spec) for spec in data["rules"])
+
+
+_default_rules: Optional[HeaderRuleSet] = None
+_default_lock = threading.Lock()
+
+
+def get_default_rules() -> HeaderRuleSet:
+    """
+    Rule set used by analyze_security_headers(), loaded on first use.
+    """
+    global _default_rules
+    if _default_rules is None:
+        with _default_lock:
+            if _default_rules is None:
+                _default_rules = load_rules()
+    return _default_rules
+
+
+def set_default_rules(rules: HeaderRuleSet) -> None:
+    """
+    Replace the rule set used by analyze_security_headers(), e.g. with a
+    site-specific rule file.
+    """
+    global _default_rules
+    _default_rules = rules
+
+
+def analyze_security_headers(headers: HeaderInput, is_https: bool) -> List[Finding]:
+    """
+    Analyze HTTP response headers against the security header rules:
+    presence, and value validation (HSTS max-age, CSP directives, ...).
+    Returns a list of Finding objects.
+    """
+    return get_default_rules().evaluate(headers, is_https)
@@ -1,15 +1,31 @@
-from bs4 import BeautifulSoup
-from typing import List, Dict
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
-def parse_html(html: str) -> BeautifulSoup:
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # optional, faster backend
+    lxml_etree = None
+
+
+FORM_BACKENDS = ("lxml", "stream", "bs4")
+LINK_TAGS = ("a", "area")
+
+
+def parse_html(html: str) -> "BeautifulSoup":
     """
     Parse raw HTML into a DOM tree.
+    BeautifulSoup is imported on first use: the default form backends
+    do not need it, and it is the slowest module to import.
     """
+    from bs4 import BeautifulSoup
+
     return BeautifulSoup(html, "html.parser")
 
 
-def extract_forms(dom: BeautifulSoup) -> List[Dict]:
+def extract_forms(dom: "BeautifulSoup") -> List[Dict]:
     """
     Extract forms and their inputs from the DOM.
     Returns a list of forms with method, action, and inputs.
@@ -21,11 +37,7 @@ def extract_forms(dom: BeautifulSoup) -> List[Dict]:
     forms = dom.find_all("form")
 
     if not forms:
-        # Informational note, not an error
-        print(
-            "[INFO] No HTML <form> elements found. "
-            "Note: Modern JavaScript-driven sites may render forms dynamically."
-        )
+        _log_no_forms()
         return forms_data
 
     for form in forms:
@@ -48,4 +60,177 @@ def extract_forms(dom: BeautifulSoup) -> List[Dict]:
             "inputs": inputs_data
         })
 
-    return forms_data
\ No newline at end of file
+    return forms_data
+
+
+def extract_links(dom: "BeautifulSoup") -> List[str]:
+    """
+    Return the raw href of every <a> and <area> element, in document order.
+    """
+    return [tag["href"] for tag in dom.find_all(LINK_TAGS, href=True)]
+
+
+def _log_no_forms() -> None:
+    # Informational note, not an error
+    print(
+        "[INFO] No HTML <form> elements found. "
+        "Note: Modern JavaScript-driven sites may render forms dynamically."
+    )
+
+
+class _FormCollector:
+    """
+    Builds the same form records as extract_forms() from start/end tag
+    events, without keeping a document tree.
+
+    Inputs are attributed to every open form, which mirrors
+    form.find_all("input") on nested forms. When `links` is a list,
+    link targets are appended to it in the same pass.
+    """
+
+    def __init__(self, links: Optional[List[str]] = None):
+        self.forms: List[Dict] = []
+        self.links = links
+        self._open: List[Dict] = []
+        self.tags = ("form", "input") + (LINK_TAGS if links is not None else ())
+
+    def start(self, tag: str, attrs: Dict[str, Optional[str]]) -> None:
+        if tag == "form":
+            form = {
+                "method": _attr(attrs, "method", "get").lower(),
+                "action": _attr(attrs, "action", ""),
+                "inputs": []
+            }
+            self.forms.append(form)
+            self._open.append(form)
+
+        elif tag == "input" and self._open:
+            input_type = _attr(attrs, "type", "text").lower()
+            record = {
+                "name": attrs.get("name"),
+                "type": input_type,
+                "hidden": input_type == "hidden"
+            }
+            for form in self._open:
+                form["inputs"].append(record)
+
+        elif tag in LINK_TAGS and self.links is not None:
+            href = attrs.get("href")
+            if href is not None:
+                self.links.append(href)
+
+    def end(self, tag: str) -> None:
+        if tag == "form" and self._open:
+            self._open.pop()
+
+
+def _attr(attrs: Dict[str, Optional[str]], name: str, default: str) -> str:
+    """
+    Attribute lookup with BeautifulSoup semantics: a valueless attribute is "".
+    """
+    if name not in attrs:
+        return default
+    return attrs[name] or ""
+
+
+class _StreamFormParser(HTMLParser):
+    """
+    Stdlib tokenizer feeding _FormCollector. Uses the same tokenizer as
+    BeautifulSoup's "html.parser" builder, so results match extract_forms().
+    """
+
+    def __init__(self, links: Optional[List[str]] = None):
+        super().__init__(convert_charrefs=True)
+        self.collector = _FormCollector(links)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in self.collector.tags:
+            self.collector.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "form":
+            self.collector.end(tag)
+
+
+class _LxmlFormTarget(_FormCollector):
+    """
+    lxml parser target: receives SAX-style events from libxml2, no tree is built.
+    """
+
+    def start(self, tag: str, attrib) -> None:
+        if tag in self.tags:
+            super().start(tag, dict(attrib))
+
+    def data(self, data: str) -> None:
+        pass
+
+    def close(self) -> List[Dict]:
+        return self.forms
+
+
+def _extract_forms_stream(html: str, links: Optional[List[str]] = None) -> List[Dict]:
+    parser = _StreamFormParser(links)
+    parser.feed(html)
+    parser.close()
+    return parser.collector.forms
+
+
+def _extract_forms_lxml(html: str, links: Optional[List[str]] = None) -> List[Dict]:
+    # Feed bytes so in-document encoding declarations are not rejected
+    parser = lxml_etree.HTMLParser(target=_LxmlFormTarget(links), encoding="utf-8")
+    return lxml_etree.fromstring(html.encode("utf-8"), parser) or []
+
+
+def _extract_forms_bs4(html: str, links: Optional[List[str]] = None) -> List[Dict]:
+    dom = parse_html(html)
+    if links is not None:
+        links.extend(extract_links(dom))
+    return extract_forms(dom)
+
+
+def default_form_backend() -> str:
+    """
+    Fastest available backend: lxml when installed, else the stdlib stream parser.
+    """
+    return "lxml" if lxml_etree is not None else "stream"
+
+
+def extract_forms_from_html(
+    html: str, backend: Optional[str] = None, links: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Extract form records straight from raw HTML without building a DOM.
+    When `links` is a list, the raw href of every <a>/<area> is appended
+    to it during the same pass (used by the crawler).
+
+    `backend` is one of FORM_BACKENDS ("lxml", "stream", "bs4");
+    default_form_backend() is used when omitted. "lxml" follows libxml2's
+    error recovery and can differ from BeautifulSoup on malformed markup;
+    "stream" produces the same records as extract_forms(parse_html(html)).
+    If the selected backend fails, the BeautifulSoup path is used instead.
+    """
+    backend = backend or default_form_backend()
+    if backend not in FORM_BACKENDS:
+        raise ValueError(f"Unknown form extraction backend: {backend}")
+
+    if backend == "lxml" and lxml_etree is None:
+        backend = "stream"
+
+    if backend == "bs4":
+        return _extract_forms_bs4(html, links)
+
+    collected = [] if links is not None else None
+    try:
+        if backend == "lxml":
+            forms = _extract_forms_lxml(html, collected)
+        else:
+            forms = _extract_forms_stream(html, collected)
+    except Exception:
+        return _extract_forms_bs4(html, links)
+
+    if links is not None:
+        links.extend(collected)
+
+    if not forms:
+        _log_no_forms()
+    return forms
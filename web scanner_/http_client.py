@@ -1,61 +1,595 @@
-from urllib.request import Request, urlopen
+import email.utils
+import hashlib
+import http.client
+import socket
+import ssl
+import threading
+import time
+from collections import deque
 from urllib.error import URLError, HTTPError
-from http.client import HTTPResponse
-from http.cookies import SimpleCookie
-from typing import List, Dict, Union
-from models import ResponseData
+from urllib.parse import urljoin, urlsplit
+from typing import Callable, Deque, List, Dict, Optional, Set, Tuple, Union
+from cookie_parser import parse_set_cookies
+from models import Headers, RedirectHop, ResponseData
+from resolver import DnsCache
 
-def send_request(url: str) -> Union[ResponseData, None]:
+
+USER_AGENT = "SmartScanner/1.0"
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+HEAD_UNSUPPORTED = (405, 501)  # answers to HEAD that mean "ask with GET"
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+CHUNK_SIZE = 64 * 1024
+
+PoolKey = Tuple[str, str, int]  # (scheme, host, port)
+
+
+class _TimedConnectMixin:
     """
-    Send an HTTP/HTTPS request to the given URL.
-    Returns a ResponseData object on success, None on failure.
+    Replaces socket.create_connection() with separately timed DNS
+    resolution and TCP connect. Timings are added to `self.timings`
+    (a dict supplied per request) when set. Lookups go through
+    `self.resolver` when the client has a DNS cache.
     """
-    try:
-        req = Request(url, headers={"User-Agent": "SmartScanner/1.0"})
-        with urlopen(req, timeout=10) as resp:  # type: HTTPResponse
-            body = resp.read()  # bytes
-            # Try decoding as utf-8, fallback to latin1
+
+    timings: Optional[Dict[str, float]] = None
+    resolver: Optional[DnsCache] = None
+
+    def _add_timing(self, name: str, value: float) -> None:
+        if self.timings is not None:
+            self.timings[name] = self.timings.get(name, 0.0) + value
+
+    def _tcp_connect(self) -> None:
+        started = time.perf_counter()
+        if self.resolver is not None:
+            addresses = self.resolver.lookup(self.host, self.port)
+        else:
+            addresses = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)
+        resolved = time.perf_counter()
+        self._add_timing("http.dns", resolved - started)
+
+        error: Optional[OSError] = None
+        for family, socktype, proto, _, address in addresses:
+            sock = socket.socket(family, socktype, proto)
             try:
-                body_str = body.decode("utf-8")
-            except UnicodeDecodeError:
-                body_str = body.decode("latin1")
-
-            # Collect headers
-            headers = dict(resp.getheaders())
-
-            # Collect cookies
-            cookies_list: List[Dict[str, Union[str, bool]]] = []
-            if "Set-Cookie" in headers:
-                cookie_header = headers["Set-Cookie"]
-                simple_cookie = SimpleCookie()
-                simple_cookie.load(cookie_header)
-                for key, morsel in simple_cookie.items():
-                    cookies_list.append({
-                        "name": key,
-                        "value": morsel.value,
-                        "secure": morsel["secure"] == "True",
-                        "httponly": morsel["httponly"] == "True",
-                        "samesite": morsel["samesite"] or None
-                    })
-
-            # Determine if HTTPS
-            is_https = url.startswith("https://")
-
-            response_data = ResponseData(
-                input_url=url,
-                final_url=resp.geturl(),
-                status_code=resp.getcode(),
-                headers=headers,
-                cookies=cookies_list,
-                body=body_str,
-                is_https=is_https
+                sock.settimeout(self.timeout)
+                sock.connect(address)
+            except OSError as e:
+                sock.close()
+                error = e
+                continue
+            break
+        else:
+            raise error or OSError(f"no addresses found for {self.host}")
+
+        self._add_timing("http.connect", time.perf_counter() - resolved)
+
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+        self.sock = sock
+
+
+class _TimedHTTPConnection(_TimedConnectMixin, http.client.HTTPConnection):
+    def connect(self):
+        self._tcp_connect()
+
+
+class _ResumableHTTPSConnection(_TimedConnectMixin, http.client.HTTPSConnection):
+    """
+    HTTPS connection that offers a previously negotiated TLS session,
+    letting the server skip the full handshake.
+    """
+
+    def __init__(self, host, port, *, context, timeout, session=None):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self.tls_session = session
+
+    def connect(self):
+        self._tcp_connect()
+        started = time.perf_counter()
+        self.sock = self._context.wrap_socket(
+            self.sock, server_hostname=self.host, session=self.tls_session
+        )
+        self._add_timing("http.tls", time.perf_counter() - started)
+
+
+class HttpClient:
+    """
+    Reusable HTTP/1.1 client with a keep-alive connection pool per host.
+
+    - Up to `max_per_host` idle connections are kept for each (scheme, host, port).
+    - Idle connections older than `idle_timeout` seconds are evicted.
+    - TLS sessions are remembered per host and resumed on new connections.
+    - Bodies are streamed and capped at `max_body_bytes` / `max_body_time`.
+    - Host lookups go through `resolver` (a DnsCache) when given, instead of
+      a fresh getaddrinfo() for every new connection.
+    - Hosts that refuse HEAD are remembered, so headers-only requests to
+      them go straight to GET.
+
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = 4,
+        idle_timeout: float = 30.0,
+        timeout: float = 10,
+        max_redirects: int = 10,
+        user_agent: str = USER_AGENT,
+        max_body_bytes: int = 5 * 1024 * 1024,
+        max_body_time: float = 20.0,
+        resolver: Optional[DnsCache] = None,
+    ):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.user_agent = user_agent
+        self.max_body_bytes = max_body_bytes
+        self.max_body_time = max_body_time
+        self.resolver = resolver
+
+        self._context = ssl.create_default_context()
+        self._pools: Dict[PoolKey, Deque[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._tls_sessions: Dict[PoolKey, ssl.SSLSession] = {}
+        self._no_head: Set[PoolKey] = set()
+        self._lock = threading.Lock()
+
+    # ------------------------------
+    # Connection pool
+    # ------------------------------
+    def _acquire(self, key: PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Return (connection, reused). Stale idle connections are closed on the way.
+        """
+        now = time.monotonic()
+        stale = []
+        conn = None
+
+        with self._lock:
+            pool = self._pools.get(key)
+            while pool:
+                candidate, last_used = pool.pop()
+                if now - last_used > self.idle_timeout:
+                    stale.append(candidate)
+                    continue
+                conn = candidate
+                break
+            session = self._tls_sessions.get(key)
+
+        for old in stale:
+            old.close()
+
+        if conn is not None:
+            return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            conn = _ResumableHTTPSConnection(
+                host, port, context=self._context, timeout=self.timeout, session=session
             )
+        else:
+            conn = _TimedHTTPConnection(host, port, timeout=self.timeout)
+        conn.resolver = self.resolver
+        return conn, False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        """
+        Return a connection to its pool, or close it if it cannot be reused.
+        """
+        if conn.sock is None:
+            conn.close()
+            return
+
+        session = getattr(conn.sock, "session", None)
+
+        with self._lock:
+            if session is not None:
+                self._tls_sessions[key] = session
+            pool = self._pools.setdefault(key, deque())
+            if len(pool) < self.max_per_host:
+                pool.append((conn, time.monotonic()))
+                return
+
+        conn.close()
+
+    def close(self) -> None:
+        """
+        Close every pooled connection.
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+
+        for pool in pools:
+            for conn, _ in pool:
+                conn.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------
+    # Requests
+    # ------------------------------
+    def _open(
+        self,
+        url: str,
+        extra_headers: Optional[Dict[str, str]] = None,
+        timings: Optional[Dict[str, float]] = None,
+        method: str = "GET",
+    ) -> Tuple[PoolKey, http.client.HTTPConnection, http.client.HTTPResponse]:
+        """
+        Send a GET or HEAD (no redirect handling) over a pooled connection and
+        return once the response headers have arrived. The body is left
+        unread. DNS/connect/TLS (for new connections) and time to first byte
+        are added to `timings`.
+        """
+        key, target = _split_url(url)
+
+        headers = {"User-Agent": self.user_agent, "Connection": "keep-alive"}
+        if extra_headers:
+            headers.update(extra_headers)
+
+        # A reused connection may have been closed by the server while idle;
+        # retry once on a fresh connection in that case.
+        for _ in range(2):
+            conn, reused = self._acquire(key)
+            conn.timings = timings
+            try:
+                conn.request(method, target, headers=headers)
+                sent = time.perf_counter()
+                resp = conn.getresponse()
+                if timings is not None:
+                    timings["http.ttfb"] = timings.get("http.ttfb", 0.0) + time.perf_counter() - sent
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+            return key, conn, resp
+
+        raise URLError("connection closed by server")
+
+    def _read_body(
+        self, key: PoolKey, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse
+    ) -> Tuple[bytes, bool]:
+        """
+        Stream the body in chunks within the byte and time budgets.
+        Returns (body, truncated). A truncated body leaves the connection
+        in an unknown state, so it is closed instead of pooled.
+        """
+        chunks: List[bytes] = []
+        size = 0
+        truncated = False
+        deadline = time.monotonic() + self.max_body_time
+
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    truncated = True
+                    break
+
+                # Bound each read by the remaining budget so slow-drip
+                # responses cannot hold the worker past the deadline
+                if conn.sock is not None:
+                    conn.sock.settimeout(min(self.timeout, remaining))
+
+                chunk = resp.read1(CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                if size + len(chunk) > self.max_body_bytes:
+                    chunks.append(chunk[:self.max_body_bytes - size])
+                    truncated = True
+                    break
+
+                chunks.append(chunk)
+                size += len(chunk)
+
+            # read1() does not close a fully consumed Content-Length response;
+            # a final read() does, which makes the connection reusable
+            if not truncated and not resp.isclosed():
+                resp.read()
+        except (OSError, http.client.HTTPException):
+            # Headers are already usable; keep whatever part of the body arrived
+            truncated = True
+
+        if truncated:
+            conn.close()
+        else:
+            if conn.sock is not None:
+                conn.sock.settimeout(self.timeout)
+            self._release(key, conn)
+
+        return b"".join(chunks), truncated
+
+    def _discard_body(
+        self, key: PoolKey, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse
+    ) -> None:
+        """
+        Skip a body we do not need. Small bodies are drained so the
+        connection can be pooled; anything larger is cheaper to drop.
+        """
+        length = resp.length
+        if length is not None and length <= CHUNK_SIZE:
+            try:
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                return
+            self._release(key, conn)
+        else:
+            conn.close()
+
+    def _open_headers_only(
+        self,
+        url: str,
+        extra_headers: Optional[Dict[str, str]],
+        timings: Dict[str, float],
+    ) -> Tuple[PoolKey, http.client.HTTPConnection, http.client.HTTPResponse, str]:
+        """
+        _open() with HEAD, or with GET for hosts that refuse HEAD (405/501),
+        which are then remembered. Also returns the method that was used.
+        """
+        key, _ = _split_url(url)
+        with self._lock:
+            head = key not in self._no_head
 
-            return response_data
+        if head:
+            key, conn, resp = self._open(url, extra_headers, timings, "HEAD")
+            if resp.status not in HEAD_UNSUPPORTED:
+                return key, conn, resp, "HEAD"
+            self._discard_body(key, conn, resp)
+            with self._lock:
+                self._no_head.add(key)
 
+        key, conn, resp = self._open(url, extra_headers, timings, "GET")
+        return key, conn, resp, "GET"
+
+    def request(
+        self,
+        url: str,
+        on_headers: Optional[Callable[[ResponseData], None]] = None,
+        read_body: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        headers_only: bool = False,
+    ) -> ResponseData:
+        """
+        GET the URL, following redirects, and return ResponseData.
+        Raises HTTPError for 4xx/5xx responses and URLError for network errors.
+        Every redirect is recorded, with its headers, in `redirects`.
+
+        - `on_headers` is called with the (body-less) ResponseData as soon as
+          the final response headers arrive, before any body is downloaded.
+        - The body is only downloaded for HTML (or undeclared) content types,
+          and when `read_body` is true. It is capped by max_body_bytes and
+          max_body_time; `truncated` is set when a cap was hit.
+        - `headers` are extra request headers, e.g. If-None-Match for
+          revalidation. A 304 response is returned as-is, without calling
+          `on_headers`, since it carries nothing new to analyze.
+        - With `headers_only`, every hop is requested with HEAD instead, and
+          no body is read. Hosts that answer HEAD with 405 or 501 are asked
+          again with a GET, whose connection is closed as soon as the final
+          response's headers have arrived.
+        - `timings` on the response breaks the request down into
+          http.dns / http.connect / http.tls / http.ttfb / http.download,
+          summed over redirect hops.
+        """
+        current = url
+        timings: Dict[str, float] = {}
+        redirects: List[RedirectHop] = []
+
+        try:
+            for _ in range(self.max_redirects + 1):
+                if headers_only:
+                    key, conn, resp, method = self._open_headers_only(current, headers, timings)
+                else:
+                    key, conn, resp = self._open(current, headers, timings)
+                    method = "GET"
+                status = resp.status
+
+                location = resp.getheader("Location")
+                if status in REDIRECT_CODES and location:
+                    self._discard_body(key, conn, resp)
+                    target = urljoin(current, location)
+                    redirects.append(RedirectHop(current, status, target, Headers(resp.msg.items())))
+                    current = target
+                    continue
+
+                if status == 304:
+                    self._discard_body(key, conn, resp)
+                    response = _build_response(url, current, status, resp.msg)
+                    response.timings = timings
+                    response.redirects = redirects
+                    return response
+
+                if status >= 400:
+                    self._discard_body(key, conn, resp)
+                    raise HTTPError(current, status, resp.reason, resp.msg, None)
+
+                response = _build_response(url, current, status, resp.msg)
+                response.timings = timings
+                response.redirects = redirects
+                if on_headers is not None:
+                    on_headers(response)
+
+                if method == "GET" and headers_only:
+                    conn.close()  # HEAD fallback: the body is not wanted, whatever its size
+                elif read_body and not headers_only and _is_html(resp.msg):
+                    started = time.perf_counter()
+                    body, response.truncated = self._read_body(key, conn, resp)
+                    timings["http.download"] = time.perf_counter() - started
+                    response.bytes_downloaded = len(body)
+                    response.body_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+                    response.body = _decode_body(body, resp.msg.get_content_charset())
+                else:
+                    self._discard_body(key, conn, resp)
+
+                return response
+        except (HTTPError, URLError):
+            raise
+        except (OSError, http.client.HTTPException) as e:
+            raise URLError(e)
+
+        raise HTTPError(current, status, "too many redirects", resp.msg, None)
+
+
+def _split_url(url: str) -> Tuple[PoolKey, str]:
+    """
+    Connection pool key and request target (path and query) for `url`.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        raise URLError(f"unsupported scheme: {parts.scheme}")
+    if not parts.hostname:
+        raise URLError("no host given")
+
+    port = parts.port or (443 if scheme == "https" else 80)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    return (scheme, parts.hostname.lower(), port), target
+
+
+def _is_html(msg: http.client.HTTPMessage) -> bool:
+    """
+    True when the response declares an HTML content type, or declares none.
+    """
+    if msg.get("Content-Type") is None:
+        return True
+    return msg.get_content_type() in HTML_CONTENT_TYPES
+
+
+def _decode_body(body: bytes, charset: Optional[str]) -> str:
+    """
+    Decode the body once, using the declared charset when it is known.
+    """
+    if charset:
+        try:
+            return body.decode(charset, errors="replace")
+        except LookupError:
+            pass  # unknown charset label, fall through
+
+    # Try decoding as utf-8, fallback to latin1
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return body.decode("latin1")
+
+
+def _build_response(
+    input_url: str, final_url: str, status: int, msg: http.client.HTTPMessage
+) -> ResponseData:
+    # Collect headers, keeping repeated ones (several Set-Cookie headers are common)
+    headers = Headers(msg.items())
+
+    # Collect cookies: one per Set-Cookie header
+    cookies = parse_set_cookies(headers.get_all("Set-Cookie"))
+
+    # Determine if HTTPS
+    is_https = input_url.startswith("https://")
+
+    return ResponseData(
+        input_url=input_url,
+        final_url=final_url,
+        status_code=status,
+        headers=headers,
+        cookies=cookies,
+        body="",
+        is_https=is_https
+    )
+
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """
+    Return the process-wide shared HttpClient, creating it on first use.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient(resolver=DnsCache())
+        return _default_client
+
+
+# Error kinds reported by classify_error(), used by retry policies
+ERROR_KINDS = ("dns", "connect", "timeout", "tls", "protocol", "http", "other")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or an HTTP
+    date), or None when absent or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Map a request failure to one of ERROR_KINDS.
+    """
+    if isinstance(error, HTTPError):
+        return "http"
+
+    reason = error.reason if isinstance(error, URLError) else error
+    if isinstance(reason, socket.gaierror):
+        return "dns"
+    if isinstance(reason, (socket.timeout, TimeoutError)):
+        return "timeout"
+    if isinstance(reason, (ssl.SSLError, ssl.CertificateError)):
+        return "tls"
+    if isinstance(reason, ConnectionError):
+        return "connect"
+    if isinstance(reason, http.client.HTTPException):
+        return "protocol"
+    if isinstance(reason, OSError):
+        return "connect"
+    return "other"
+
+
+def send_request(
+    url: str,
+    client: Optional[HttpClient] = None,
+    on_headers: Optional[Callable[[ResponseData], None]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Union[ResponseData, None]:
+    """
+    Send an HTTP/HTTPS request to the given URL.
+    Returns a ResponseData object on success, None on failure.
+    `on_headers` runs as soon as the response headers are available;
+    `headers` are extra request headers (e.g. conditional validators).
+    """
+    client = client or get_default_client()
+
+    try:
+        return client.request(url, on_headers=on_headers, headers=headers)
     except (HTTPError, URLError) as e:
         print(f"[ERROR] Failed to fetch {url}: {e}")
         return None
     except Exception as e:
         print(f"[ERROR] Unexpected error for {url}: {e}")
-        return None
\ No newline at end of file
+        return None
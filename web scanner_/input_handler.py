@@ -1,69 +1,169 @@
-from urllib.parse import urlparse, urlunparse
+import hashlib
+import ipaddress
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Tuple
+from models import SLOTS
+from public_suffix import get_default_list
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# scheme://netloc path ?query #fragment, in one match; the scheme is optional
+_URL_RE = re.compile(r"(?:([A-Za-z][A-Za-z0-9+.-]*)://)?([^/?#]*)([^?#]*)(?:\?([^#]*))?", re.DOTALL)
+_IPV6_NETLOC_RE = re.compile(r"\[([0-9A-Fa-f:.]+)\](?::(\d*))?")
+# Dot-separated LDH labels of 1-63 characters, at least two, and a non-numeric TLD
+_HOSTNAME_RE = re.compile(
+    r"(?=.{1,253}$)(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+(?![0-9]+$)[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?"
+)
+
+
+@dataclass(frozen=True, **SLOTS)
+class Target:
+    """
+    A validated scan target. `url` is the normalized form: lowercase scheme
+    and host, IDNA hosts in punycode, no default port, "/" for an empty path,
+    no fragment (and no query unless it was kept).
+    """
+    url: str
+    scheme: str
+    host: str                # ASCII hostname, or the bare IP address
+    port: Optional[int]      # explicit non-default port
+    is_ip: bool
+
+    @property
+    def single_domain(self) -> bool:
+        """
+        True for a registrable domain or one subdomain level below it
+        ("example.co.uk", "blog.example.com"), judged by the public suffix
+        list. IP addresses count as single targets.
+        """
+        return self.is_ip or 0 <= get_default_list().subdomain_depth(self.host) <= 1
+
+
+@lru_cache(maxsize=65536)
+def _ascii_host(host: str) -> Optional[str]:
+    """
+    Lowercase ASCII form of a hostname (IDNA-encoded when needed),
+    or None if it is not a valid hostname. Cached: inventories repeat hosts.
+    """
+    host = host.lower()
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+    return host if _HOSTNAME_RE.fullmatch(host) else None
+
+
+def parse_target(url: str, keep_query: bool = False) -> Optional[Target]:
+    """
+    Validate and normalize a URL in a single parse. URLs without a scheme
+    are taken as http://. Returns None unless the URL is http(s) with a
+    valid hostname (at least two labels) or IP literal, an optional port
+    in 1-65535, and no user info.
+    """
+    match = _URL_RE.match(url)
+    scheme, netloc, path, query = match.groups()
+
+    scheme = scheme.lower() if scheme else "http"
+    if scheme not in DEFAULT_PORTS or not netloc or "@" in netloc:
+        return None
+
+    port_text = None
+    if netloc.startswith("["):
+        literal = _IPV6_NETLOC_RE.fullmatch(netloc)
+        if literal is None:
+            return None
+        host, port_text = literal.groups()
+        try:
+            host = ipaddress.IPv6Address(host).compressed
+        except ValueError:
+            return None
+        is_ip = True
+    else:
+        host, sep, port_text = netloc.rpartition(":")
+        if not sep:
+            host, port_text = netloc, None
+        if host[-1:].isdigit():
+            try:
+                host = str(ipaddress.IPv4Address(host))
+                is_ip = True
+            except ValueError:
+                is_ip = False
+        else:
+            is_ip = False
+        if not is_ip:
+            host = _ascii_host(host)
+            if host is None:
+                return None
+
+    port = None
+    if port_text:
+        if not port_text.isdigit() or not 0 < int(port_text) < 65536:
+            return None
+        port = int(port_text)
+        if port == DEFAULT_PORTS[scheme]:
+            port = None
+    elif port_text is not None:
+        return None  # "host:" with an empty port
+
+    authority = f"[{host}]" if ":" in host else host
+    if port is not None:
+        authority = f"{authority}:{port}"
+
+    normalized = f"{scheme}://{authority}{path or '/'}"
+    if keep_query and query:
+        normalized = f"{normalized}?{query}"
+    return Target(url=normalized, scheme=scheme, host=host, port=port, is_ip=is_ip)
+
+
+def prepare_targets(
+    urls: Iterable[str], keep_query: bool = False, dedupe: bool = True
+) -> Iterator[Tuple[str, Optional[Target]]]:
+    """
+    Stream (raw URL, Target) pairs for a URL list in one pass; the Target is
+    None for an invalid URL. With `dedupe`, URLs that normalize to a target
+    already seen are dropped. Seen targets are kept as 64-bit digests, so
+    multi-million-line lists stay cheap to deduplicate.
+    """
+    seen = set()
+    for raw in urls:
+        target = parse_target(raw, keep_query)
+        if target is not None and dedupe:
+            digest = hashlib.blake2b(target.url.encode("utf-8"), digest_size=8).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+        yield raw, target
+
 
 def validate_url(url: str) -> bool:
     """
     Validate the given URL.
     Returns True if valid (http/https and valid hostname), False otherwise.
     """
-    try:
-        # Ensure scheme temporarily for parsing if missing
-        temp_url = url if url.startswith(("http://", "https://")) else "http://" + url
-        parsed = urlparse(temp_url)
-        host = parsed.netloc
-        
-        # 1. Hostname must exist and contain at least one dot
-        # 2. Cannot start or end with a dot (e.g., ".com" or "google.")
-        if not host or "." not in host or host.startswith(".") or host.endswith("."):
-            return False
-        
-        # 3. Ensure hostname contains only valid characters (alphanumeric, dots, hyphens)
-        if not re.match(r"^[a-zA-Z0-9.-]+$", host):
-            return False
-
-        # 4. Scheme must be http or https if explicitly provided
-        if parsed.scheme and parsed.scheme not in ("http", "https"):
-            return False
-
-        return True
-    except Exception:
-        return False
-
-
-def normalize_url(url: str) -> str:
+    return parse_target(url) is not None
+
+
+def normalize_url(url: str, keep_query: bool = False) -> str:
     """
     Normalize URL by ensuring it has a scheme (defaults to http) and preserves path.
-    Removes query parameters and fragments.
+    Removes fragments, and query parameters unless `keep_query` is set.
+    The URL must be valid (see validate_url).
     """
-    if not url.startswith(("http://", "https://")):
-        url = "http://" + url
-
-    parsed = urlparse(url)
-
-    # Rebuild URL: (scheme, netloc, path, params, query, fragment)
-    normalized = urlunparse(
-        (parsed.scheme, parsed.netloc, parsed.path, "", "", "")
-    )
-    return normalized
+    target = parse_target(url, keep_query)
+    if target is None:
+        raise ValueError(f"Invalid URL: {url}")
+    return target.url
 
 
 def is_single_domain(url: str) -> bool:
     """
-    Check if the URL is a single domain or base regional domain (2-3 parts).
+    Check if the URL is a single domain: a registrable domain or one
+    subdomain below it, judged by the public suffix list.
     Returns True if considered single domain, False otherwise.
     """
-    # Ensure scheme for correct parsing of the hostname
-    if not url.startswith(("http://", "https://")):
-        url = "http://" + url
-        
-    parsed = urlparse(url)
-    host = parsed.netloc
-
-    if not host or "." not in host:
-        return False
-
-    # Split host by dots: ['blog', 'google', 'com'] or ['google', 'co', 'uk']
-    parts = host.split(".")
-    
-    # Accept 2 parts (example.com) or 3 parts (google.co.uk / blog.example.com)
-    return 2 <= len(parts) <= 3
+    target = parse_target(url)
+    return target is not None and target.single_domain
@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Union
+from models import Headers, RedirectHop, ScanResult
+from scan_cache import finding_rows, findings_from_rows
+
+
+def redirect_rows(redirects: List[RedirectHop]) -> List[list]:
+    """
+    Redirect hops as JSON-serializable rows, headers as [name, value] pairs.
+    """
+    return [[hop.url, hop.status_code, hop.location, hop.headers.items()] for hop in redirects]
+
+
+def redirects_from_rows(rows: List[list]) -> List[RedirectHop]:
+    return [
+        RedirectHop(url, status_code, location, Headers((name, value) for name, value in headers))
+        for url, status_code, location, headers in rows
+    ]
+
+
+def result_record(result: ScanResult) -> Dict:
+    """
+    JSON-serializable form of a ScanResult (timings are not kept).
+    """
+    return {
+        "url": result.url,
+        "scanned_url": result.scanned_url,
+        "final_url": result.final_url,
+        "http_status": result.status_code,
+        "error": result.error,
+        "error_kind": result.error_kind,
+        "attempts": result.attempts,
+        "elapsed": result.elapsed,
+        "from_cache": result.from_cache,
+        "bytes_downloaded": result.bytes_downloaded,
+        "headers_only": result.headers_only,
+        "redirects": redirect_rows(result.redirects),
+        "findings": finding_rows(result.findings),
+    }
+
+
+def result_from_record(record: Dict) -> ScanResult:
+    return ScanResult(
+        url=record["url"],
+        scanned_url=record.get("scanned_url"),
+        final_url=record.get("final_url"),
+        status_code=record.get("http_status"),
+        findings=findings_from_rows(record.get("findings", [])),
+        error=record.get("error"),
+        error_kind=record.get("error_kind"),
+        attempts=record.get("attempts", 1),
+        elapsed=record.get("elapsed", 0.0),
+        from_cache=record.get("from_cache", False),
+        bytes_downloaded=record.get("bytes_downloaded", 0),
+        headers_only=record.get("headers_only", False),
+        redirects=redirects_from_rows(record.get("redirects", [])),
+    )
+
+
+STARTED = "started"
+DONE = "done"
+FAILED = "failed"
+
+
+class ScanJournal:
+    """
+    Append-only checkpoint log of a batch run, one JSON record per line.
+
+    Each URL gets a "started" record when its fetch begins and a "done"
+    (with its findings) or "failed" record when it finishes. Reopening the
+    journal restores the last state of every URL, so a restarted run skips
+    completed URLs and retries failed or in-flight ones. A record cut short
+    by a crash is ignored.
+
+    In memory only the state per URL is kept (done URLs as the file offset
+    of their record), so completed findings are read back lazily.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._state: Dict[str, Union[str, int]] = {}  # url -> status, or offset of its done record
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            self._load()
+        self._file = open(path, "ab")
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as fh:
+            offset = 0
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None  # partial write from an interrupted run
+
+                if record is not None:
+                    url, status = record["url"], record["status"]
+                    self._state[url] = offset if status == DONE else status
+                offset += len(line)
+
+        if offset and not line.endswith(b"\n"):
+            # Terminate a partial last line so the next record starts cleanly
+            with open(self.path, "ab") as fh:
+                fh.write(b"\n")
+
+    def _append(self, record: Dict) -> int:
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+        return offset
+
+    def is_done(self, url: str) -> bool:
+        return isinstance(self._state.get(url), int)
+
+    def pending(self, urls: Iterable[str]) -> Iterator[str]:
+        """
+        Filter out URLs already completed in this journal.
+        """
+        for url in urls:
+            if not self.is_done(url):
+                yield url
+
+    def started(self, url: str) -> None:
+        self._append({"url": url, "status": STARTED, "ts": time.time()})
+        self._state[url] = STARTED
+
+    def finished(self, result: ScanResult) -> None:
+        record = result_record(result)
+        record.update(status=FAILED if result.error else DONE, ts=time.time())
+        offset = self._append(record)
+        self._state[result.url] = FAILED if result.error else offset
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of URLs per state.
+        """
+        counts = {DONE: 0, FAILED: 0, STARTED: 0}
+        for state in self._state.values():
+            counts[DONE if isinstance(state, int) else state] += 1
+        return counts
+
+    def completed(self) -> Iterator[ScanResult]:
+        """
+        Rebuild the ScanResult of every completed URL, in journal order.
+        """
+        offsets = sorted(state for state in self._state.values() if isinstance(state, int))
+        with open(self.path, "rb") as fh:
+            for offset in offsets:
+                fh.seek(offset)
+                yield result_from_record(json.loads(fh.readline()))
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "ScanJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,25 +1,487 @@
-from pipeline import run_scan
+import argparse
+import contextlib
+import itertools
+import os
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+
+# Only the defaults are imported up front: each mode imports the modules it
+# runs, so --help, header-only and cached scans do not pay for the rest
+# (see benchmarks/bench_startup.py).
+from defaults import (
+    DEFAULT_CONCURRENCY, DEFAULT_LEASE, DEFAULT_MAX_BYTES, DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES,
+    DEFAULT_MAX_QUEUE, DEFAULT_MAX_RETRIES, DEFAULT_PER_HOST, DEFAULT_PORT, DEFAULT_TTL, REPORT_FORMATS,
+)
+
+if TYPE_CHECKING:
+    from analysis_memo import AnalysisMemo
+    from metrics import ThreadProfiler
+    from models import ScanResult
+    from scan_cache import ScanCache
+
+EXIT_CODES = """\
+exit status:
+  0  every URL was scanned
+  1  at least one scan failed (the report says which)
+  2  invalid arguments
+"""
+
+
+def read_url_list(stream: Iterable[str]) -> Iterator[str]:
+    """
+    Yield URLs from a text stream (or list of lines), one per line.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    for line in stream:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            yield url
+
+
+def read_targets(lines: Iterable[str]) -> Iterator[str]:
+    """
+    URLs to scan from a URL list or the command-line URLs, normalized and
+    deduplicated. Invalid lines are passed through unchanged so they are
+    reported as invalid.
+    """
+    from input_handler import prepare_targets
+
+    for raw, target in prepare_targets(read_url_list(lines)):
+        yield target.url if target is not None else raw
+
+
+def make_memo(args: argparse.Namespace) -> Optional["AnalysisMemo"]:
+    from analysis_memo import AnalysisMemo
+
+    return AnalysisMemo(int(args.memo_mb * 1024 * 1024)) if args.memo_mb > 0 else None
+
+
+def write_report(
+    args: argparse.Namespace,
+    scans: Iterable["ScanResult"],
+    profiler: Optional["ThreadProfiler"] = None,
+    title: Optional[str] = None,
+    memo: Optional["AnalysisMemo"] = None,
+) -> int:
+    """
+    Stream `scans` to the selected reporter, then write metrics and profile
+    output if requested. With --aggregate, duplicate findings are collapsed
+    into one report headed `title`; with --baseline, only changes since the
+    baseline are reported. Returns the process exit code.
+    """
+    from baseline import Baseline
+    from metrics import MetricsCollector, record_stage
+    from reporter import AggregateReporter, DiffReporter, get_reporter
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    baseline = Baseline(args.baseline, frozen=args.freeze_baseline) if args.baseline else None
+    if baseline is not None:
+        reporter = DiffReporter(output, baseline, title or args.input, args.format)
+    elif args.aggregate:
+        reporter = AggregateReporter(output, title or args.input, args.format)
+    else:
+        reporter = get_reporter(args.format, output)
+    metrics = MetricsCollector() if args.metrics else None
+    failures = 0
+
+    try:
+        # Keep stdout for the report; diagnostics printed by the scan go to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            reporter.start()
+            for result in scans:
+                if result.error:
+                    failures += 1
+                started = time.perf_counter()
+                reporter.report(result)
+                if metrics is not None:
+                    record_stage(result, "report", time.perf_counter() - started)
+                    metrics.observe(result)
+            reporter.finish()
+
+        if metrics is not None:
+            metrics.write_json(args.metrics)
+            print(metrics.format_summary(), file=sys.stderr)
+            if memo is not None:
+                print(memo.summary(), file=sys.stderr)
+        if profiler is not None and profiler.dump(args.profile) is not None:
+            print(f"[INFO] Profile written to {args.profile}", file=sys.stderr)
+    finally:
+        if baseline is not None:
+            baseline.close()
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failures else 0
+
+
+def run_batch(args: argparse.Namespace, cache: Optional["ScanCache"] = None) -> int:
+    """
+    Scan the URLs given on the command line, or else the --input list.
+    """
+    from batch import run_scan_many
+    from journal import ScanJournal
+    from metrics import ThreadProfiler
+    from retry import RetryPolicy
+
+    if args.urls:
+        stream = None
+        targets = read_targets(args.urls)
+    else:
+        stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        targets = read_targets(stream)
+    profiler = ThreadProfiler() if args.profile else None
+    journal = ScanJournal(args.journal) if args.journal else None
+    memo = make_memo(args)
+
+    try:
+        scans: Iterable["ScanResult"] = run_scan_many(
+            targets,
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            rate=args.rate,
+            host_rate=args.host_rate,
+            analysis_workers=args.analysis_workers,
+            cache=cache,
+            profiler=profiler,
+            retry=RetryPolicy(max_retries=args.retries) if args.retries else None,
+            journal=journal,
+            memo=memo,
+            headers_only=args.headers_only,
+        )
+
+        if journal is not None:
+            counts = journal.counts()
+            if any(counts.values()):
+                print(
+                    f"[INFO] Resuming from {args.journal}: {counts['done']} done, "
+                    f"{counts['failed']} failed and {counts['started']} interrupted will be retried",
+                    file=sys.stderr,
+                )
+            # Completed URLs are reported from the journal, so the report covers the whole list
+            scans = itertools.chain(journal.completed(), scans)
+
+        title = args.input or " ".join(args.urls)
+        return write_report(args, scans, profiler, title=title, memo=memo)
+    finally:
+        if stream is not None and stream is not sys.stdin:
+            stream.close()
+        if journal is not None:
+            journal.close()
+
+
+def spawn_workers(args: argparse.Namespace) -> List[subprocess.Popen]:
+    """
+    Start --workers local worker processes on the --queue, with the same scan options.
+    Their diagnostics go to stderr.
+    """
+    command = [
+        sys.executable, os.path.abspath(__file__), "--queue", args.queue, "--worker",
+        "--concurrency", str(args.concurrency),
+        "--per-host", str(args.per_host),
+        "--retries", str(args.retries),
+        "--lease", str(args.lease),
+    ]
+    if args.headers_only:
+        command.append("--headers-only")
+    if args.rate:
+        command += ["--rate", str(args.rate)]
+    if args.host_rate:
+        command += ["--host-rate", str(args.host_rate)]
+    if args.analysis_workers is not None:
+        command += ["--analysis-workers", str(args.analysis_workers)]
+    if args.header_rules:
+        command += ["--header-rules", args.header_rules]
+    if args.public_suffix_list:
+        command += ["--public-suffix-list", args.public_suffix_list]
+    for module in args.plugin:
+        command += ["--plugin", module]
+    if args.cache:
+        command += ["--cache", args.cache, "--cache-ttl", str(args.cache_ttl)]
+    command += ["--memo-mb", str(args.memo_mb)]
+
+    return [subprocess.Popen(command, stdout=sys.stderr) for _ in range(args.workers)]
+
+
+def run_queue(args: argparse.Namespace, cache: Optional["ScanCache"] = None) -> int:
+    """
+    Distributed mode. With --worker, scan tasks from the queue until it is
+    drained; otherwise act as coordinator: queue the --input list (if any),
+    optionally start local workers, and report results as they come back.
+    URLs given on the command line are queued like an --input list.
+    """
+    from distributed import collect_results, enqueue_urls, run_worker
+    from retry import RetryPolicy
+    from work_queue import open_queue
+
+    queue = open_queue(args.queue)
+    workers = []
+
+    try:
+        if args.worker:
+            run_worker(
+                queue,
+                lease=args.lease,
+                linger=args.linger,
+                concurrency=args.concurrency,
+                per_host=args.per_host,
+                rate=args.rate,
+                host_rate=args.host_rate,
+                analysis_workers=args.analysis_workers,
+                cache=cache,
+                retry=RetryPolicy(max_retries=args.retries) if args.retries else None,
+                memo=make_memo(args),
+                headers_only=args.headers_only,
+            )
+            return 0
+
+        if args.input:
+            stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+            try:
+                enqueue_urls(queue, read_targets(stream))
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+        if args.urls:
+            enqueue_urls(queue, read_targets(args.urls))
+
+        workers = spawn_workers(args)
+        return write_report(args, collect_results(queue), title=args.input or args.queue)
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+            worker.wait()
+        queue.close()
+
+
+def run_service(args: argparse.Namespace, cache: Optional["ScanCache"] = None) -> int:
+    from retry import RetryPolicy
+    from service import ScanService, serve
+
+    service = ScanService(
+        workers=args.concurrency,
+        per_host=args.per_host,
+        analysis_workers=args.analysis_workers,
+        max_queue=args.max_queue,
+        cache=cache,
+        retry=RetryPolicy(max_retries=args.retries) if args.retries else None,
+        memo_bytes=int(args.memo_mb * 1024 * 1024),
+    )
+    with service:
+        serve(service, args.bind, args.serve)
+    return 0
+
+
+def run_site_crawl(args: argparse.Namespace) -> int:
+    from crawler import run_crawl
+    from metrics import ThreadProfiler
+
+    profiler = ThreadProfiler() if args.profile else None
+    memo = make_memo(args)
+    scans = run_crawl(
+        args.crawl,
+        max_depth=args.max_depth,
+        max_pages=args.max_pages,
+        max_time=args.max_time,
+        concurrency=args.per_host,
+        host_rate=args.host_rate,
+        analysis_workers=args.analysis_workers,
+        bloom=args.bloom,
+        profiler=profiler,
+        memo=memo,
+    )
+    return write_report(args, scans, profiler, title=args.crawl, memo=memo)
+
+
+def interactive(cache: Optional["ScanCache"] = None, headers_only: bool = False):
+    from pipeline import run_scan
 
-def main():
     print("=== Smart Web App Weakness Finder (Demo) ===\n")
 
     while True:
-        url = input("Enter URL to scan (or type 'exit' to quit): ").strip()
+        try:
+            url = input("Enter URL to scan (or type 'exit' to quit): ").strip()
+        except EOFError:  # Ctrl-D
+            print()
+            url = "exit"
         if url.lower() == "exit":
             print("\n[INFO] Exiting scanner. Goodbye!")
             break
 
         if not url:
-            url = "http://127.0.0.1:5000"  # fallback demo app
+            url = "http://127.0.0.1:5000"  # demo app: python benchmarks/fixture_server.py
 
         print(f"\n[INFO] Scanning: {url}\nPlease wait...\n")
         print("-" * 40)  # visual separation
 
-        report = run_scan(url)
+        report = run_scan(url, cache=cache, headers_only=headers_only)
         print(report)
-        print("-" * 40)  # end separation
+        print("-" * 40 + "\n")  # end separation
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Smart Web App Weakness Finder. Scans the URLs given as arguments, or the --input "
+                    "list; with neither, reads URLs from stdin, or prompts for them on a terminal.",
+        epilog=EXIT_CODES,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("urls", nargs="*", metavar="URL",
+                        help="URLs to scan and report like an --input list (batch mode)")
+    parser.add_argument(
+        "-i", "--input",
+        help="scan URLs from a file (one per line, '-' for stdin) instead of prompting",
+    )
+    parser.add_argument("--crawl", metavar="URL",
+                        help="crawl one site from URL and report its findings once, deduplicated")
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH,
+                        help="links to follow away from the start page (crawl mode)")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help="maximum pages to scan (crawl mode)")
+    parser.add_argument("--max-time", type=float, default=None,
+                        help="stop scheduling pages after this many seconds (crawl mode)")
+    parser.add_argument("--bloom", action="store_true",
+                        help="track visited URLs in a Bloom filter, for very large sites (crawl mode)")
+    parser.add_argument("--serve", type=int, nargs="?", const=DEFAULT_PORT, metavar="PORT",
+                        help=f"run as a scan service with an HTTP/JSON API on PORT (default {DEFAULT_PORT})")
+    parser.add_argument("--bind", default="127.0.0.1",
+                        help="address the scan service listens on")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="URLs the scan service queues before refusing new jobs with 503")
+    parser.add_argument("--headers-only", action="store_true",
+                        help="check only response headers and cookies: request pages with HEAD "
+                             "(GET if refused), record each redirect and skip the HTML analysis")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="maximum scans in flight (batch and service mode)")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help="maximum scans in flight per hostname; the adaptive per-host limit "
+                             "grows up to this (batch and crawl mode)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="maximum scans started per second (batch mode)")
+    parser.add_argument("--host-rate", type=float, default=None,
+                        help="maximum scans started per second against one hostname (batch and crawl mode)")
+    parser.add_argument("--analysis-workers", type=int, default=None,
+                        help="HTML analysis processes, default CPU count; 0 disables the pool (batch and crawl mode)")
+    parser.add_argument("-f", "--format", choices=REPORT_FORMATS, default="text",
+                        help="report format (batch and crawl mode)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="write the report to a file instead of stdout (batch and crawl mode)")
+    parser.add_argument("--aggregate", action="store_true", default=None,
+                        help="collapse duplicate findings across pages into one report "
+                             "(text or jsonl; the default for text in crawl mode)")
+    parser.add_argument("--no-aggregate", dest="aggregate", action="store_false",
+                        help="report every page separately in crawl mode")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="report only new, resolved and changed findings since the run stored in PATH, "
+                             "then store this run there (text or jsonl; batch, queue and crawl mode)")
+    parser.add_argument("--freeze-baseline", action="store_true",
+                        help="compare against --baseline without updating it")
+    parser.add_argument("--header-rules", metavar="PATH",
+                        help="header rule file to use instead of the built-in header_rules.json")
+    parser.add_argument("--plugin", metavar="MODULE", action="append", default=[],
+                        help="import an analyzer plugin module (repeatable; see analyzers.py)")
+    parser.add_argument("--public-suffix-list", metavar="PATH",
+                        help="public_suffix_list.dat to use instead of the built-in trimmed list")
+    parser.add_argument("--journal", metavar="PATH",
+                        help="checkpoint progress to PATH; rerunning with the same journal resumes (batch mode)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help="retries for timeouts, connection, DNS and 429/5xx errors, with backoff; "
+                             "0 disables (batch mode)")
+    parser.add_argument("--queue", metavar="PATH",
+                        help="distributed mode: SQLite work queue shared by a coordinator and workers; "
+                             "queues --input (if given) and reports results as workers return them")
+    parser.add_argument("--worker", action="store_true",
+                        help="run as a worker on --queue until it is drained")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="local worker processes the coordinator starts on --queue")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                        help="seconds a worker holds a claimed URL without renewing it (distributed mode)")
+    parser.add_argument("--linger", type=float, default=0.0,
+                        help="seconds a worker keeps polling an empty queue before exiting")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="SQLite scan cache; unchanged pages reuse earlier findings")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL,
+                        help="seconds before a cached scan is ignored (default: 7 days)")
+    parser.add_argument("--memo-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024,
+                        help="memory for reusing the HTML analysis of byte-identical pages, in MB; 0 disables")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-stage timing percentiles as JSON and print a summary (batch and crawl mode)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="cProfile the scan threads into a pstats file (batch and crawl mode); "
+                             "on Python 3.12+ only one scan thread is profiled")
+    args = parser.parse_args(argv)
+
+    modes = [bool(args.urls), bool(args.input), bool(args.crawl), args.serve is not None]
+    if sum(modes) > 1:
+        parser.error("give only one of: URL arguments, --input, --crawl, --serve")
+    if args.freeze_baseline and not args.baseline:
+        parser.error("--freeze-baseline requires --baseline")
+    if args.baseline:
+        from reporter import DiffReporter
+
+        if args.aggregate:
+            parser.error("--baseline and --aggregate cannot be combined")
+        if args.format not in DiffReporter.FORMATS:
+            parser.error(f"--baseline supports formats: {', '.join(DiffReporter.FORMATS)}")
+        args.aggregate = False
+
+    if args.aggregate is None:
+        args.aggregate = bool(args.crawl) and args.format == "text"
+    if args.aggregate:
+        from reporter import AggregateReporter
+
+        if args.format not in AggregateReporter.FORMATS:
+            parser.error(f"--aggregate supports formats: {', '.join(AggregateReporter.FORMATS)}")
+
+    if args.headers_only and args.crawl:
+        parser.error("--headers-only cannot be combined with --crawl, which follows links in the HTML")
+    if args.headers_only and args.serve is not None:
+        parser.error('--headers-only is chosen per job in service mode ("headers_only": true)')
+
+    if (args.worker or args.workers) and not args.queue:
+        parser.error("--worker and --workers require --queue")
+
+    if args.header_rules:
+        from header_analyzer import load_rules, set_default_rules
+
+        set_default_rules(load_rules(args.header_rules))
+    if args.public_suffix_list:
+        from public_suffix import load_list, set_default_list
+
+        set_default_list(load_list(args.public_suffix_list))
+    if args.plugin:
+        from analyzers import load_plugins
+
+        load_plugins(args.plugin)
+
+    # Without URLs or a mode, piped input is a URL list: prompting only makes sense on a terminal
+    if not any(modes) and not args.queue and not sys.stdin.isatty():
+        args.input = "-"
+
+    cache = None
+    if args.cache:
+        from scan_cache import ScanCache
+
+        cache = ScanCache(args.cache, ttl=args.cache_ttl)
+
+    try:
+        if args.serve is not None:
+            return run_service(args, cache)
+        if args.queue:
+            return run_queue(args, cache)
+        if args.crawl:
+            return run_site_crawl(args)
+        if args.urls or args.input:
+            return run_batch(args, cache)
+
+        interactive(cache, args.headers_only)
+        return 0
+    finally:
+        if cache is not None:
+            cache.close()
 
-        input("\nPress Enter to continue...")  # ensures user sees the report
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
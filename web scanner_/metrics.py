@@ -0,0 +1,269 @@
+import cProfile
+import json
+import math
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from models import ScanResult
+
+
+# Stages recorded on ScanResult.timings, in pipeline order. The http.* entries
+# come from HttpClient and are summed over redirect hops.
+STAGES = (
+    "validate",
+    "request",
+    "http.dns",
+    "http.connect",
+    "http.tls",
+    "http.ttfb",
+    "http.download",
+    "headers",
+    "cookies",
+    "html",
+    "report",
+)
+
+StageHook = Callable[[str, ScanResult, float, float], None]
+_stage_hooks: List[StageHook] = []
+
+
+def add_stage_hook(hook: StageHook) -> None:
+    """
+    Register a tracing hook called as hook(stage, result, wall, cpu)
+    each time a pipeline stage finishes.
+    """
+    _stage_hooks.append(hook)
+
+
+def remove_stage_hook(hook: StageHook) -> None:
+    _stage_hooks.remove(hook)
+
+
+def record_stage(result: ScanResult, stage: str, wall: float, cpu: float = 0.0) -> None:
+    """
+    Add a stage measurement to the result and notify tracing hooks.
+    """
+    result.timings[stage] = result.timings.get(stage, 0.0) + wall
+    if cpu:
+        result.cpu_times[stage] = result.cpu_times.get(stage, 0.0) + cpu
+
+    for hook in _stage_hooks:
+        hook(stage, result, wall, cpu)
+
+
+@contextmanager
+def timed(result: ScanResult, stage: str) -> Iterator[None]:
+    """
+    Measure wall and CPU time (of the calling thread) spent in the block.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        record_stage(
+            result,
+            stage,
+            time.perf_counter() - wall_start,
+            time.thread_time() - cpu_start,
+        )
+
+
+def timed_call(func: Callable, *args) -> Tuple[object, float, float]:
+    """
+    Return (func(*args), wall seconds, CPU seconds), measured where it runs,
+    e.g. inside a process-pool worker.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    value = func(*args)
+    return value, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+
+
+class Histogram:
+    """
+    Log-bucketed histogram with bounded memory. Percentiles are accurate to
+    about the bucket growth factor (5%), which is plenty for latency triage.
+    """
+
+    GROWTH = 1.05
+    MIN_VALUE = 1e-6
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        index = 0
+        if value > self.MIN_VALUE:
+            index = int(math.log(value / self.MIN_VALUE, self.GROWTH)) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                upper = self.MIN_VALUE * self.GROWTH ** index
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class MetricsCollector:
+    """
+    Aggregates per-stage timings, byte counts and outcomes over a batch run.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.wall: Dict[str, Histogram] = {}
+        self.cpu: Dict[str, Histogram] = {}
+        self.elapsed = Histogram()
+        self.bytes = Histogram()
+        self.outcomes: Dict[str, int] = {}
+
+    def observe(self, result: ScanResult) -> None:
+        for stage, value in result.timings.items():
+            self.wall.setdefault(stage, Histogram()).add(value)
+        for stage, value in result.cpu_times.items():
+            self.cpu.setdefault(stage, Histogram()).add(value)
+
+        self.elapsed.add(result.elapsed)
+        self.bytes.add(result.bytes_downloaded)
+
+        outcome = "error" if result.error else ("cached" if result.from_cache else "ok")
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def _ordered(self, histograms: Dict[str, Histogram]) -> List[str]:
+        known = [s for s in STAGES if s in histograms]
+        return known + sorted(s for s in histograms if s not in STAGES)
+
+    def export(self) -> Dict:
+        """
+        Plain-dict snapshot suitable for JSON export.
+        """
+        duration = time.perf_counter() - self.started
+        return {
+            "urls": self.elapsed.count,
+            "duration": duration,
+            "urls_per_second": self.elapsed.count / duration if duration else 0.0,
+            "outcomes": dict(self.outcomes),
+            "elapsed": self.elapsed.summary(),
+            "bytes_downloaded": {**self.bytes.summary(), "total": int(self.bytes.total)},
+            "stages": {s: self.wall[s].summary() for s in self._ordered(self.wall)},
+            "stages_cpu": {s: self.cpu[s].summary() for s in self._ordered(self.cpu)},
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.export(), fh, indent=2)
+
+    def format_summary(self) -> str:
+        """
+        Human-readable stage table for the end of a batch run.
+        """
+        data = self.export()
+        lines = [
+            "=" * 60,
+            "SCAN METRICS",
+            "=" * 60,
+            f"URLs: {data['urls']}  Duration: {data['duration']:.2f}s  "
+            f"Throughput: {data['urls_per_second']:.1f} URL/s",
+            "Outcomes: " + ", ".join(f"{k}={v}" for k, v in sorted(data["outcomes"].items())),
+            f"Downloaded: {data['bytes_downloaded']['total'] / 1e6:.2f} MB",
+            "",
+            f"{'stage':<14}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+        ]
+
+        rows = list(data["stages"].items()) + [("total", data["elapsed"])]
+        for stage, s in rows:
+            lines.append(
+                f"{stage:<14}{s['count']:>8}{s['p50'] * 1e3:>10.2f}{s['p95'] * 1e3:>10.2f}"
+                f"{s['p99'] * 1e3:>10.2f}{s['max'] * 1e3:>10.2f}"
+            )
+
+        return "\n".join(lines)
+
+
+# From Python 3.12 cProfile runs on sys.monitoring, which allows a single
+# active profiler per interpreter; a second one raises ValueError
+SINGLE_PROFILER = sys.version_info >= (3, 12)
+
+
+class ThreadProfiler:
+    """
+    Opt-in cProfile support for multi-threaded runs: each worker thread
+    profiles into its own cProfile.Profile, merged when dumped.
+
+    On Python 3.12+ (SINGLE_PROFILER) only the first thread to run a
+    wrapped call is profiled; the other threads run unprofiled.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _profile(self) -> Optional[cProfile.Profile]:
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            with self._lock:
+                if SINGLE_PROFILER and self._profiles:
+                    profile = False  # another thread holds the one profiler
+                else:
+                    profile = cProfile.Profile()
+                    self._profiles.append(profile)
+            self._local.profile = profile
+        return profile or None
+
+    def wrap(self, func: Callable) -> Callable:
+        """
+        Return `func` instrumented to run under the calling thread's profiler.
+        """
+        def profiled(*args, **kwargs):
+            profile = self._profile()
+            if profile is None:
+                return func(*args, **kwargs)
+            return profile.runcall(func, *args, **kwargs)
+        return profiled
+
+    def dump(self, path: str) -> Optional[pstats.Stats]:
+        """
+        Merge all thread profiles and write them in pstats format.
+        """
+        with self._lock:
+            profiles = [p for p in self._profiles if p.getstats()]
+        if not profiles:
+            return None
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        return stats
@@ -1,22 +1,181 @@
-from dataclasses import dataclass
-from typing import Dict, List, Union
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from checks import CheckDefinition, get_check
 
 
-@dataclass
+# __slots__ drop the per-instance __dict__ (Python 3.10+)
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+class Headers:
+    """
+    Response headers as received: case-insensitive lookup, and every value
+    of a repeated header is kept (Set-Cookie in particular).
+    """
+    __slots__ = ("_items", "_index")
+
+    def __init__(self, items: Iterable[Tuple[str, str]] = ()):
+        self._items: List[Tuple[str, str]] = list(items)
+        self._index: Dict[str, List[str]] = {}
+        for name, value in self._items:
+            self._index.setdefault(name.lower(), []).append(value)
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        First value of header `name`, or `default`.
+        """
+        values = self._index.get(name.lower())
+        return values[0] if values else default
+
+    def get_all(self, name: str) -> List[str]:
+        """
+        Every value of header `name`, in the order received.
+        """
+        return list(self._index.get(name.lower(), ()))
+
+    def items(self) -> List[Tuple[str, str]]:
+        return list(self._items)
+
+    def __getitem__(self, name: str) -> str:
+        values = self._index.get(name.lower())
+        if not values:
+            raise KeyError(name)
+        return values[0]
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name.lower() in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"Headers({self._items!r})"
+
+
+@dataclass(**SLOTS)
+class ResponseCookie:
+    """
+    One Set-Cookie header, parsed (see cookie_parser.py).
+    """
+    name: str
+    value: str
+    secure: bool = False
+    httponly: bool = False
+    samesite: Optional[str] = None    # "Strict", "Lax", "None", ... as sent
+    domain: Optional[str] = None
+    path: Optional[str] = None
+    max_age: Optional[int] = None
+    expires: Optional[str] = None
+
+
+@dataclass(**SLOTS)
+class RedirectHop:
+    """
+    One redirect response on the way to the final URL, with its headers.
+    """
+    url: str                          # URL that answered with the redirect
+    status_code: int
+    location: str                     # absolute URL it redirected to
+    headers: Headers
+
+
+@dataclass(**SLOTS)
 class ResponseData:
     input_url: str
     final_url: str
     status_code: int
-    headers: Dict[str, str]
-    cookies: List[Dict[str, Union[str, bool]]]
+    headers: Headers
+    cookies: List[ResponseCookie]
     body: Union[str, bytes]
     is_https: bool
+    truncated: bool = False  # body cut short by the size/time budget
+    body_hash: Optional[str] = None  # digest of the raw body bytes, when downloaded
+    bytes_downloaded: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)  # http.* phase -> seconds
+    redirects: List[RedirectHop] = field(default_factory=list)  # hops before final_url, in order
+
+    def release_body(self) -> None:
+        """
+        Drop the body once analysis no longer needs it.
+        """
+        self.body = ""
 
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class Finding:
-    title: str
-    status: str          # "present" or "missing"
-    severity: str        # "Low" or "Medium"
-    description: str
-    remediation: str
\ No newline at end of file
+    """
+    One result of a check. Static text lives in the shared CheckDefinition
+    registry (see checks.py); a finding only stores what varies per scan.
+    """
+    check_id: str
+    status: str                      # "present", "missing", "error", ...
+    subject: str = ""                # fills "{subject}" in the check title
+    severity_override: Optional[str] = None
+    detail: Optional[str] = None     # per-finding description, e.g. an error message
+
+    @property
+    def check(self) -> CheckDefinition:
+        return get_check(self.check_id)
+
+    @property
+    def title(self) -> str:
+        title = self.check.title
+        return title.format(subject=self.subject) if self.subject else title
+
+    @property
+    def severity(self) -> str:
+        return self.severity_override or self.check.severity
+
+    @property
+    def description(self) -> str:
+        return self.detail or self.check.description
+
+    @property
+    def remediation(self) -> str:
+        return self.check.remediation
+
+
+@dataclass(**SLOTS)
+class ScanResult:
+    url: str                          # URL as supplied by the caller
+    scanned_url: Optional[str] = None  # normalized URL that was requested
+    final_url: Optional[str] = None    # destination after redirects
+    status_code: Optional[int] = None
+    findings: List[Finding] = field(default_factory=list)
+    error: Optional[str] = None       # set when the scan could not complete
+    error_kind: Optional[str] = None  # http_client.ERROR_KINDS entry, or "invalid"
+    attempts: int = 1                 # fetch attempts, including retries
+    retry_after: Optional[float] = None  # seconds the server asked to wait (Retry-After)
+    elapsed: float = 0.0              # wall-clock seconds for the whole scan
+    from_cache: bool = False          # findings (partly) reused from the scan cache
+    bytes_downloaded: int = 0
+    headers_only: bool = False        # scanned with the headers-only profile (no HTML stage)
+    redirects: List[RedirectHop] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)    # stage -> wall seconds
+    cpu_times: Dict[str, float] = field(default_factory=dict)  # stage -> CPU seconds
+
+
+@dataclass(**SLOTS)
+class FindingChange:
+    """
+    One difference between a scan and the stored baseline (see baseline.py).
+    """
+    kind: str                         # "new", "resolved" or "changed"
+    url: str
+    finding: Finding                  # current finding; the baseline one when resolved
+    previous: Optional[Finding] = None  # baseline finding, when changed
+
+
+@dataclass(**SLOTS)
+class AggregatedFinding:
+    """
+    One deduplicated finding and how widespread it is (see aggregate.py).
+    """
+    finding: Finding                  # first occurrence, used for display
+    host: str
+    count: int = 0                    # pages the finding occurred on
+    sample_urls: List[str] = field(default_factory=list)
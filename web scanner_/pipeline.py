@@ -1,127 +1,226 @@
-from typing import List
-from models import Finding
-from input_handler import validate_url, normalize_url, is_single_domain
-from http_client import send_request
-from html_parser import parse_html, extract_forms
-from header_analyzer import analyze_security_headers
-from cookie_analyzer import analyze_cookies
-from form_analyzer import analyze_forms
-from reporter import generate_text_report
-
-
-def run_scan(url: str) -> str:
+import time
+from typing import List, Optional, Tuple, Union
+from models import Finding, ResponseData, ScanResult
+from input_handler import parse_target
+from urllib.error import HTTPError, URLError
+from http_client import HttpClient, classify_error, get_default_client, parse_retry_after
+from analyzers import Artifacts, run_analyzers, stage_analyzers
+from reporter import format_result
+from scan_cache import ScanCache
+from analysis_memo import AnalysisMemo
+from metrics import record_stage, timed
+
+
+def scan_url(
+    url: str,
+    client: Optional[HttpClient] = None,
+    cache: Optional[ScanCache] = None,
+    memo: Optional[AnalysisMemo] = None,
+    headers_only: bool = False,
+) -> ScanResult:
     """
-    Orchestrates the full scan pipeline and returns a human-readable report.
+    Orchestrates the full scan pipeline and returns a structured ScanResult.
     Ensures HTTPS flag reflects the final URL after redirects.
+
+    `client` lets callers share a connection pool across scans;
+    the process-wide default client is used otherwise.
+    `cache` enables revalidation against, and reuse of, earlier scans.
+    `memo` reuses the HTML analysis of a body already seen under another URL.
+    `headers_only` selects the headers-only profile (see fetch_page).
+    """
+    started = time.perf_counter()
+    result = ScanResult(url=url)
+
+    try:
+        response = fetch_page(result, client, cache, headers_only=headers_only)
+        if response is not None:
+            header_findings = list(result.findings)
+            with timed(result, "html"):
+                memoized = memo.get(response.body_hash) if memo is not None else None
+                if memoized is not None:
+                    body_findings = memoized[0]
+                else:
+                    body_findings = analyze_body(response.body)
+                    if memo is not None:
+                        memo.put(response.body_hash, body_findings)
+            result.findings.extend(body_findings)
+            response.release_body()
+            if cache is not None:
+                cache.store(result.scanned_url, response, header_findings, body_findings)
+    finally:
+        result.elapsed = time.perf_counter() - started
+
+    return result
+
+
+def fetch_page(
+    result: ScanResult,
+    client: Optional[HttpClient] = None,
+    cache: Optional[ScanCache] = None,
+    keep_query: bool = False,
+    headers_only: bool = False,
+) -> Optional[ResponseData]:
     """
+    Network stage: validate and fetch the URL, then run the header-only analyzers.
+    Findings are added to `result`. Returns the response for the HTML stage,
+    or None when there is nothing left to do: either the scan failed
+    (result.error is set) or the cache already supplied the body findings.
+    The query string is dropped during normalization unless `keep_query` is set.
+
+    With `headers_only`, the page is requested with HEAD (see
+    HttpClient.request), the HTML stage is skipped and None is always
+    returned. The cache is not used: its entries hold full scans.
+    """
+    url = result.url
+    result.headers_only = headers_only
+    if headers_only:
+        cache = None
 
     # ==============================
     # 1. INPUT VALIDATION
     # ==============================
-    if not validate_url(url):
-        return f"[ERROR] Invalid URL provided: {url}"
+    with timed(result, "validate"):
+        target = parse_target(url, keep_query)
+        if target is None:
+            result.error = f"[ERROR] Invalid URL provided: {url}"
+            result.error_kind = "invalid"
+            return None
 
-    normalized_url = normalize_url(url)
+        normalized_url = target.url
+        result.scanned_url = normalized_url
 
     # Single-domain check is informational, not fatal
-    if not is_single_domain(normalized_url):
+    if not target.single_domain:
         print(f"[INFO] Target appears to be a multi-level domain: {normalized_url}")
 
     # ==============================
     # 2. HTTP REQUEST
     # ==============================
+    all_findings: List[Finding] = result.findings
+    cached = cache.get(normalized_url) if cache is not None else None
+    validators = cached.validators() if cached is not None else None
+
+    # Header and cookie analysis only need the headers, so they run as soon
+    # as the headers arrive, before the body is downloaded.
+    def on_headers(response: ResponseData) -> None:
+        _analyze_headers(response, result)
+
+    request_started = time.perf_counter()
     try:
-        response = send_request(normalized_url)
+        response = (client or get_default_client()).request(
+            normalized_url, on_headers=on_headers, headers=validators, headers_only=headers_only
+        )
+    except (HTTPError, URLError) as e:
+        result.error = f"[ERROR] Unable to fetch response from {normalized_url}: {e}"
+        result.error_kind = classify_error(e)
+        if isinstance(e, HTTPError):
+            result.status_code = e.code
+            if e.headers is not None:
+                result.retry_after = parse_retry_after(e.headers.get("Retry-After"))
+        return None
     except Exception as e:
-        return f"[ERROR] Request failed due to unexpected error: {str(e)}"
+        result.error = f"[ERROR] Request failed due to unexpected error: {str(e)}"
+        result.error_kind = "other"
+        return None
+    finally:
+        # Header analysis runs inside the request; count it under its own stages
+        analysis = sum(result.timings.get(a.name, 0.0) for a in stage_analyzers("headers"))
+        record_stage(result, "request", max(0.0, time.perf_counter() - request_started - analysis))
 
-    if response is None:
-        return f"[ERROR] Unable to fetch response from {normalized_url}"
+    for stage, seconds in response.timings.items():
+        record_stage(result, stage, seconds)
+    result.bytes_downloaded = response.bytes_downloaded
+    result.redirects = response.redirects
 
     # ==============================
-    # 2a. ENSURE HTTPS FLAG MATCHES FINAL URL
+    # 2a. CACHE REUSE
     # ==============================
-    response.is_https = response.final_url.startswith("https://")
-    canonical_url = response.final_url  # use final URL for all analysis
+    if response.status_code == 304 and cached is not None:
+        # Not modified: the previous scan still applies in full
+        result.final_url = cached.final_url
+        result.status_code = cached.status_code
+        result.findings.extend(cached.header_findings)
+        result.findings.extend(cached.body_findings)
+        result.from_cache = True
+        return None
+
+    result.final_url = response.final_url  # use final URL for all analysis
+    result.status_code = response.status_code
+
+    if headers_only:
+        return None
+
+    if response.truncated:
+        all_findings.append(Finding("html.truncated", "truncated"))
+
+    if cached is not None and response.body_hash and response.body_hash == cached.body_hash:
+        # Same body as last time: skip parsing, keep the fresh header findings
+        header_findings = list(all_findings)
+        all_findings.extend(cached.body_findings)
+        result.from_cache = True
+        cache.store(normalized_url, response, header_findings, cached.body_findings)
+        return None
+
+    return response
+
+
+def analyze_body(body: Union[str, bytes], links: Optional[List[str]] = None) -> List[Finding]:
+    """
+    CPU stage: run the body analyzers (see analyzers.py), which share one
+    parse of the HTML. Pure function of the body, so batch runs can execute
+    it in a process pool.
+    When `links` is a list, the page's raw link targets are appended to it.
+    """
 
     # ==============================
     # 3. ANALYSIS PHASE (RESILIENT)
     # ==============================
-    all_findings: List[Finding] = []
+    artifacts = Artifacts("body", body, collect_links=links is not None)
+    all_findings = run_analyzers("body", artifacts)
 
-    # ---- Header Analysis (always runs)
-    try:
-        header_findings = analyze_security_headers(
-            response.headers,
-            response.is_https
-        )
-        all_findings.extend(header_findings)
-    except Exception as e:
-        all_findings.append(
-            Finding(
-                title="Header Analysis",
-                status="error",
-                severity="Low",
-                description=f"Header analysis failed: {str(e)}",
-                remediation="Inspect response headers manually."
-            )
-        )
+    if links is not None:
+        try:
+            links.extend(artifacts.get("links"))
+        except Exception:
+            pass  # the parse failure is already reported by the analyzers that needed it
 
-    # ---- Cookie Analysis (always runs)
-    try:
-        cookie_findings = analyze_cookies(
-            response.cookies,
-            response.is_https
-        )
-        all_findings.extend(cookie_findings)
-    except Exception as e:
-        all_findings.append(
-            Finding(
-                title="Cookie Analysis",
-                status="error",
-                severity="Low",
-                description=f"Cookie analysis failed: {str(e)}",
-                remediation="Inspect cookies manually."
-            )
-        )
+    return all_findings
 
-    # ---- HTML Parsing + Form Analysis (conditional)
-    try:
-        if response.body:
-            dom = parse_html(response.body)
-            forms = extract_forms(dom)
-            form_findings = analyze_forms(forms)
-            all_findings.extend(form_findings)
-        else:
-            all_findings.append(
-                Finding(
-                    title="HTML Content",
-                    status="missing",
-                    severity="Low",
-                    description="No HTML body was returned by the server.",
-                    remediation="Ensure the endpoint serves HTML content."
-                )
-            )
-    except Exception as e:
-        all_findings.append(
-            Finding(
-                title="Form Analysis",
-                status="error",
-                severity="Low",
-                description=f"Form analysis could not be completed: {str(e)}",
-                remediation="Manually inspect forms if applicable."
-            )
-        )
+
+def analyze_page(body: Union[str, bytes]) -> Tuple[List[Finding], List[str]]:
+    """
+    analyze_body() that also returns the page's raw link targets (for crawling).
+    """
+    links: List[str] = []
+    findings = analyze_body(body, links)
+    return findings, links
+
+
+def _analyze_headers(response: ResponseData, result: ScanResult) -> None:
+    """
+    Run the header-stage analyzers (security headers, cookies and any
+    plugins that only need the response headers), adding their findings
+    and per-analyzer stage timings to `result`.
+    """
 
     # ==============================
-    # 4. REPORT GENERATION
+    # ENSURE HTTPS FLAG MATCHES FINAL URL
     # ==============================
-    report = generate_text_report(all_findings)
+    response.is_https = response.final_url.startswith("https://")
+
+    timings = {}
+    result.findings.extend(run_analyzers("headers", Artifacts("headers", response), timings))
+    for stage, (wall, cpu) in timings.items():
+        record_stage(result, stage, wall, cpu)
 
-    # Optional contextual footer (non-intrusive)
-    report += (
-        f"\n\nScanned URL      : {normalized_url}"
-        f"\nFinal Destination: {canonical_url}"
-    )
 
-    return report
\ No newline at end of file
+def run_scan(
+    url: str,
+    client: Optional[HttpClient] = None,
+    cache: Optional[ScanCache] = None,
+    headers_only: bool = False,
+) -> str:
+    """
+    Scan a single URL and return a human-readable report.
+    """
+    return format_result(scan_url(url, client, cache, headers_only=headers_only))
@@ -0,0 +1,110 @@
+import os
+import threading
+from functools import lru_cache
+from typing import Iterable, Optional, Set
+
+
+DEFAULT_LIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public_suffix_list.dat")
+
+
+class PublicSuffixList:
+    """
+    Public suffix rules (https://publicsuffix.org/list/): normal rules,
+    wildcards ("*.ck") and exceptions ("!www.ck"), with the implicit "*"
+    rule for unlisted top-level domains.
+
+    Hosts are expected lowercase and in ASCII (punycode) form. Lookups
+    are cached per host, since large URL lists repeat their hosts.
+    """
+
+    def __init__(self, rules: Iterable[str]):
+        self._rules: Set[str] = set()
+        self._wildcards: Set[str] = set()   # parents of "*." rules
+        self._exceptions: Set[str] = set()
+
+        for rule in rules:
+            rule = rule.strip().lower()
+            if not rule or rule.startswith("//"):
+                continue
+            rule = rule.split()[0]
+            if rule.startswith("!"):
+                self._exceptions.add(rule[1:])
+            elif rule.startswith("*."):
+                self._wildcards.add(rule[2:])
+            else:
+                self._rules.add(rule)
+
+        self.suffix_length = lru_cache(maxsize=65536)(self._suffix_length)
+
+    def _suffix_length(self, host: str) -> int:
+        """
+        Number of trailing labels of `host` that form its public suffix.
+        """
+        labels = host.split(".")
+        count = len(labels)
+
+        # Longest matching rule wins, so walk from the full host downwards.
+        # At each position a wildcard ("*.kawasaki.jp") is one label longer
+        # than a plain rule for the same name ("kawasaki.jp"), so it goes first.
+        for i in range(count):
+            candidate = ".".join(labels[i:])
+            if candidate in self._exceptions:
+                return count - i - 1
+            if i > 0 and candidate in self._wildcards:
+                return count - i + 1
+            if candidate in self._rules:
+                return count - i
+        return 1
+
+    def public_suffix(self, host: str) -> str:
+        return ".".join(host.split(".")[-self.suffix_length(host):])
+
+    def registrable_domain(self, host: str) -> Optional[str]:
+        """
+        The public suffix plus one label ("example.co.uk" for
+        "www.example.co.uk"), or None when the host is itself a public suffix.
+        """
+        labels = host.split(".")
+        length = self.suffix_length(host)
+        if length >= len(labels):
+            return None
+        return ".".join(labels[-length - 1:])
+
+    def subdomain_depth(self, host: str) -> int:
+        """
+        Labels in front of the registrable domain: 0 for "example.co.uk",
+        1 for "blog.example.co.uk"; -1 when the host is a public suffix.
+        """
+        return len(host.split(".")) - self.suffix_length(host) - 1
+
+
+def load_list(path: str = DEFAULT_LIST_PATH) -> PublicSuffixList:
+    """
+    Load a list in the upstream public_suffix_list.dat format.
+    """
+    with open(path, encoding="utf-8") as fh:
+        return PublicSuffixList(fh)
+
+
+_default_list: Optional[PublicSuffixList] = None
+_default_lock = threading.Lock()
+
+
+def get_default_list() -> PublicSuffixList:
+    """
+    List used by input_handler, loaded on first use.
+    """
+    global _default_list
+    if _default_list is None:
+        with _default_lock:
+            if _default_list is None:
+                _default_list = load_list()
+    return _default_list
+
+
+def set_default_list(suffixes: PublicSuffixList) -> None:
+    """
+    Replace the list used by input_handler, e.g. with the full upstream list.
+    """
+    global _default_list
+    _default_list = suffixes
@@ -1,5 +1,11 @@
-from typing import List
-from models import Finding
+import csv
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, List, TextIO
+from checks import CHECKS
+from aggregate import FindingAggregator
+from baseline import Baseline
+from models import Finding, FindingChange, ScanResult
 
 
 SEVERITY_ORDER = {
@@ -39,4 +45,430 @@ def generate_text_report(findings: List[Finding]) -> str:
         lines.append(f"Remediation : {finding.remediation}")
         lines.append("-" * 60)
 
-    return "\n".join(lines)
\ No newline at end of file
+    return "\n".join(lines)
+
+
+def format_result(result: ScanResult) -> str:
+    """
+    Render a ScanResult as the human-readable CLI report.
+    """
+    if result.error:
+        return result.error
+
+    # Optional contextual footer (non-intrusive)
+    lines = [
+        generate_text_report(result.findings),
+        "",
+        f"Scanned URL      : {result.scanned_url}",
+    ]
+    for hop in result.redirects:
+        lines.append(f"Redirected       : {hop.status_code} {hop.url} -> {hop.location}")
+    lines.append(f"Final Destination: {result.final_url}")
+    if result.headers_only:
+        lines.append("Profile          : headers only (HTML not analyzed)")
+    return "\n".join(lines)
+
+
+def format_aggregate_report(aggregator: FindingAggregator, title: str) -> str:
+    """
+    Render deduplicated findings: each one once, with the number of pages
+    it was seen on and sample URLs.
+    """
+    entries = sorted(
+        aggregator.entries(),
+        key=lambda e: (SEVERITY_ORDER.get(e.finding.severity, 0), e.count),
+        reverse=True,
+    )
+
+    lines = []
+    lines.append("=" * 60)
+    lines.append(f"AGGREGATED REPORT: {title}")
+    lines.append("=" * 60)
+    lines.append(f"Pages Scanned : {aggregator.pages} ({aggregator.errors} failed)")
+    lines.append(f"Findings      : {aggregator.findings} ({len(entries)} distinct)")
+    if aggregator.dropped:
+        lines.append(f"Not aggregated: {aggregator.dropped} (distinct finding limit reached)")
+    lines.append("")
+
+    for entry in entries:
+        finding = entry.finding
+        lines.append(f"[{finding.severity.upper()}] {finding.title}")
+        lines.append(f"Host        : {entry.host}")
+        lines.append(f"Status      : {finding.status}")
+        lines.append(f"Pages       : {entry.count} of {aggregator.scanned}")
+        lines.append("Why it matters:")
+        lines.append(f"  {finding.description}")
+        lines.append(f"Remediation : {finding.remediation}")
+        lines.append("Examples    :")
+        lines.extend(f"  {url}" for url in entry.sample_urls)
+        lines.append("-" * 60)
+
+    return "\n".join(lines)
+
+
+# ==============================
+# STREAMING REPORTERS
+# ==============================
+class StreamReporter(ABC):
+    """
+    Writes results to `stream` incrementally, one ScanResult at a time,
+    so a batch run never holds the whole report in memory.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def start(self) -> None:
+        pass
+
+    @abstractmethod
+    def report(self, result: ScanResult) -> None:
+        """
+        Write one result.
+        """
+
+    def finish(self) -> None:
+        self.stream.flush()
+
+
+def _scan_status(result: ScanResult) -> str:
+    if result.error:
+        return "error"
+    return "cached" if result.from_cache else "ok"
+
+
+def _rounded(timings: Dict[str, float]) -> Dict[str, float]:
+    return {stage: round(seconds, 6) for stage, seconds in timings.items()}
+
+
+class TextReporter(StreamReporter):
+    """
+    The human-readable report, one block per URL.
+    """
+
+    def report(self, result: ScanResult) -> None:
+        cached = ", cached" if result.from_cache else ""
+        size = f", {result.bytes_downloaded / 1024:.1f} KB" if result.bytes_downloaded else ""
+        self.stream.write(f"[INFO] {result.url} ({result.elapsed:.2f}s{size}{cached})\n")
+        self.stream.write("-" * 40 + "\n")
+        self.stream.write(format_result(result) + "\n")
+        self.stream.write("-" * 40 + "\n")
+        self.stream.flush()
+
+
+def json_record(result: ScanResult) -> Dict:
+    """
+    The JSON object reported for one URL, with its findings nested.
+    """
+    return {
+        "url": result.url,
+        "scanned_url": result.scanned_url,
+        "final_url": result.final_url,
+        "http_status": result.status_code,
+        "scan_status": _scan_status(result),
+        "error": result.error,
+        "error_kind": result.error_kind,
+        "attempts": result.attempts,
+        "elapsed": round(result.elapsed, 6),
+        "bytes_downloaded": result.bytes_downloaded,
+        "headers_only": result.headers_only,
+        "redirects": [
+            {
+                "url": hop.url,
+                "http_status": hop.status_code,
+                "location": hop.location,
+                "headers": hop.headers.items(),
+            }
+            for hop in result.redirects
+        ],
+        "timings": _rounded(result.timings),
+        "cpu_times": _rounded(result.cpu_times),
+        "findings": [
+            {
+                "check_id": f.check_id,
+                "title": f.title,
+                "severity": f.severity,
+                "status": f.status,
+                "detail": f.detail,
+            }
+            for f in result.findings
+        ],
+    }
+
+
+class JsonLinesReporter(StreamReporter):
+    """
+    One JSON object per URL and line, with its findings nested.
+    """
+
+    def report(self, result: ScanResult) -> None:
+        self.stream.write(json.dumps(json_record(result)) + "\n")
+        self.stream.flush()
+
+
+class CsvReporter(StreamReporter):
+    """
+    One row per finding; a failed URL gets a single row carrying its error.
+    """
+
+    COLUMNS = (
+        "url", "final_url", "http_status", "scan_status", "elapsed", "bytes_downloaded",
+        "check_id", "title", "severity", "status", "detail",
+    )
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.writer = csv.writer(stream)
+
+    def start(self) -> None:
+        self.writer.writerow(self.COLUMNS)
+
+    def report(self, result: ScanResult) -> None:
+        prefix = [
+            result.url,
+            result.final_url or "",
+            result.status_code or "",
+            _scan_status(result),
+            f"{result.elapsed:.6f}",
+            result.bytes_downloaded,
+        ]
+
+        if result.error or not result.findings:
+            self.writer.writerow(prefix + ["", "", "", "", result.error or ""])
+        else:
+            for f in result.findings:
+                self.writer.writerow(prefix + [f.check_id, f.title, f.severity, f.status, f.detail or ""])
+        self.stream.flush()
+
+
+SARIF_LEVELS = {"High": "error", "Medium": "warning", "Low": "note"}
+PASSING_STATUSES = ("present", "POST")
+INFORMATIONAL_STATUSES = ("absent",)
+
+
+class SarifReporter(StreamReporter):
+    """
+    SARIF 2.1.0 log. The document is written piecewise: rules up front,
+    then each result as it arrives, then scan errors as tool notifications.
+    """
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.first = True
+        self.notifications: List[Dict] = []
+
+    def start(self) -> None:
+        rules = [
+            {
+                "id": check.check_id,
+                "name": check.title.replace("{subject}", "*"),
+                "shortDescription": {"text": check.description},
+                "help": {"text": check.remediation},
+                "defaultConfiguration": {"level": SARIF_LEVELS.get(check.severity, "note")},
+            }
+            for check in CHECKS.values()
+        ]
+        header = json.dumps({
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "version": "2.1.0",
+        })
+        driver = json.dumps({"name": "SmartScanner", "version": "1.0", "rules": rules})
+        self.stream.write(header[:-1] + ', "runs": [{"tool": {"driver": ' + driver + '}, "results": [\n')
+
+    def report(self, result: ScanResult) -> None:
+        if result.error:
+            self.notifications.append({
+                "level": "error",
+                "message": {"text": result.error},
+                "properties": {"url": result.url, "elapsed": round(result.elapsed, 6)},
+            })
+            return
+
+        location = [{"physicalLocation": {"artifactLocation": {"uri": result.final_url or result.url}}}]
+        properties = {
+            "url": result.url,
+            "httpStatus": result.status_code,
+            "scanStatus": _scan_status(result),
+            "elapsed": round(result.elapsed, 6),
+            "bytesDownloaded": result.bytes_downloaded,
+            "timings": _rounded(result.timings),
+        }
+
+        for f in result.findings:
+            if f.status in PASSING_STATUSES:
+                kind, level = "pass", "none"
+            elif f.status in INFORMATIONAL_STATUSES:
+                kind, level = "informational", "none"
+            else:
+                kind, level = "fail", SARIF_LEVELS.get(f.severity, "note")
+
+            entry = {
+                "ruleId": f.check_id,
+                "kind": kind,
+                "level": level,
+                "message": {"text": f"{f.title}: {f.status}. {f.description}"},
+                "locations": location,
+                "properties": properties,
+            }
+            self.stream.write(("" if self.first else ",\n") + json.dumps(entry))
+            self.first = False
+
+        self.stream.flush()
+
+    def finish(self) -> None:
+        invocation = {
+            "executionSuccessful": not self.notifications,
+            "toolExecutionNotifications": self.notifications,
+        }
+        self.stream.write('\n], "invocations": [' + json.dumps(invocation) + "]}]}\n")
+        self.stream.flush()
+
+
+class AggregateReporter(StreamReporter):
+    """
+    Folds every result into a FindingAggregator and writes the deduplicated
+    findings at the end: as one text report, or one JSON line per entry.
+    """
+
+    FORMATS = ("text", "jsonl")
+
+    def __init__(self, stream: TextIO, title: str, fmt: str = "text"):
+        super().__init__(stream)
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Aggregated reports support {', '.join(self.FORMATS)}, not {fmt}")
+        self.title = title
+        self.fmt = fmt
+        self.aggregator = FindingAggregator()
+
+    def report(self, result: ScanResult) -> None:
+        self.aggregator.add(result)
+
+    def finish(self) -> None:
+        if self.fmt == "text":
+            self.stream.write(format_aggregate_report(self.aggregator, self.title) + "\n")
+        else:
+            for entry in self.aggregator.entries():
+                f = entry.finding
+                self.stream.write(json.dumps({
+                    "check_id": f.check_id,
+                    "host": entry.host,
+                    "title": f.title,
+                    "severity": f.severity,
+                    "status": f.status,
+                    "detail": f.detail,
+                    "pages": entry.count,
+                    "sample_urls": entry.sample_urls,
+                }) + "\n")
+        self.stream.flush()
+
+
+def format_change(change: FindingChange) -> str:
+    """
+    Render one baseline difference as a short text block.
+    """
+    finding = change.finding
+    lines = [f"[{change.kind.upper()}] [{finding.severity.upper()}] {finding.title}"]
+    lines.append(f"URL         : {change.url}")
+    if change.previous is not None:
+        previous = change.previous
+        lines.append(f"Status      : {previous.status} -> {finding.status}")
+        if previous.severity != finding.severity:
+            lines.append(f"Severity    : {previous.severity} -> {finding.severity}")
+        if (previous.detail or "") != (finding.detail or ""):
+            lines.append(f"Detail      : {finding.detail or '-'} (was: {previous.detail or '-'})")
+    else:
+        lines.append(f"Status      : {finding.status}")
+        if finding.detail:
+            lines.append(f"Detail      : {finding.detail}")
+    if change.kind != "resolved":
+        lines.append(f"Remediation : {finding.remediation}")
+    lines.append("-" * 60)
+    return "\n".join(lines)
+
+
+def format_diff_summary(baseline: Baseline, title: str) -> str:
+    counts = baseline.counts
+    lines = []
+    lines.append("=" * 60)
+    lines.append(f"CHANGES SINCE BASELINE: {title}")
+    lines.append("=" * 60)
+    lines.append(f"Pages Compared: {baseline.pages - baseline.unscanned} "
+                 f"({baseline.new_pages} not in baseline, {baseline.unscanned} failed and skipped)")
+    lines.append(f"New           : {counts['new']}")
+    lines.append(f"Resolved      : {counts['resolved']}")
+    lines.append(f"Changed       : {counts['changed']}")
+    lines.append(f"Unchanged     : {counts['unchanged']}")
+    if baseline.frozen:
+        lines.append("Baseline      : frozen, not updated")
+    return "\n".join(lines)
+
+
+class DiffReporter(StreamReporter):
+    """
+    Compares every result with a Baseline and writes only the differences:
+    new, resolved and changed findings, as they arrive, then a summary
+    (text) or one JSON line per difference (jsonl).
+    """
+
+    FORMATS = ("text", "jsonl")
+
+    def __init__(self, stream: TextIO, baseline: Baseline, title: str, fmt: str = "text"):
+        super().__init__(stream)
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Diff reports support {', '.join(self.FORMATS)}, not {fmt}")
+        self.baseline = baseline
+        self.title = title
+        self.fmt = fmt
+
+    def report(self, result: ScanResult) -> None:
+        changes = self.baseline.diff(result)
+        for change in changes:
+            if self.fmt == "text":
+                self.stream.write(format_change(change) + "\n")
+            else:
+                self.stream.write(json.dumps(_change_record(change)) + "\n")
+        if changes:
+            self.stream.flush()
+
+    def finish(self) -> None:
+        if self.fmt == "text":
+            self.stream.write(format_diff_summary(self.baseline, self.title) + "\n")
+        self.stream.flush()
+
+
+def _change_record(change: FindingChange) -> Dict:
+    f = change.finding
+    record = {
+        "change": change.kind,
+        "url": change.url,
+        "check_id": f.check_id,
+        "title": f.title,
+        "severity": f.severity,
+        "status": f.status,
+        "detail": f.detail,
+    }
+    if change.previous is not None:
+        record["previous"] = {
+            "severity": change.previous.severity,
+            "status": change.previous.status,
+            "detail": change.previous.detail,
+        }
+    return record
+
+
+REPORTERS = {
+    "text": TextReporter,
+    "jsonl": JsonLinesReporter,
+    "csv": CsvReporter,
+    "sarif": SarifReporter,
+}
+
+
+def get_reporter(fmt: str, stream: TextIO) -> StreamReporter:
+    """
+    Return the streaming reporter for `fmt` (one of REPORTERS) writing to `stream`.
+    """
+    try:
+        return REPORTERS[fmt](stream)
+    except KeyError:
+        raise ValueError(f"Unknown report format: {fmt}")
@@ -0,0 +1,184 @@
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_TTL = 300.0          # getaddrinfo() does not expose record TTLs
+DEFAULT_NEGATIVE_TTL = 60.0
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_WORKERS = 32
+
+# (family, socktype, proto, sockaddr) with the port in sockaddr left as 0
+Address = Tuple[int, int, int, tuple]
+Resolve = Callable[[str], List[Address]]
+
+# Answers that will not change on a retry; anything else (EAI_AGAIN,
+# resolver timeouts) is a transient failure and is not cached
+_PERMANENT_ERRORS = {socket.EAI_NONAME}
+if hasattr(socket, "EAI_NODATA"):
+    _PERMANENT_ERRORS.add(socket.EAI_NODATA)
+
+
+def is_permanent_failure(error: socket.gaierror) -> bool:
+    """
+    True when the lookup failed because the host does not exist.
+    """
+    return error.errno in _PERMANENT_ERRORS
+
+
+def system_resolve(host: str) -> List[Address]:
+    """
+    Resolve `host` with the system resolver (getaddrinfo).
+    """
+    return [
+        (family, socktype, proto, sockaddr)
+        for family, socktype, proto, _, sockaddr in socket.getaddrinfo(host, 0, 0, socket.SOCK_STREAM)
+    ]
+
+
+def with_port(address: Address, port: int) -> Tuple[int, int, int, str, tuple]:
+    """
+    getaddrinfo()-style entry for connecting to `address` on `port`.
+    """
+    family, socktype, proto, sockaddr = address
+    return family, socktype, proto, "", (sockaddr[0], port) + tuple(sockaddr[2:])
+
+
+class DnsCache:
+    """
+    Thread-safe cache of hostname lookups, shared by every connection of
+    an HttpClient.
+
+    - Answers are kept for `ttl` seconds, keyed by hostname alone, so all
+      ports and schemes of a host share one lookup.
+    - Permanent failures (no such host) are cached for `negative_ttl`
+      seconds; transient resolver errors are not cached.
+    - Concurrent lookups of the same host wait for a single resolution.
+    - prefetch() resolves in the background on a small thread pool, so a
+      batch can resolve hosts ahead of the fetches that need them.
+
+    `resolve` replaces the system resolver, e.g. with a stub in tests.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        workers: int = DEFAULT_WORKERS,
+        resolve: Resolve = system_resolve,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.workers = workers
+        self.resolve = resolve
+
+        # host -> (expires, addresses or the cached error)
+        self._entries: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, host: str) -> Optional[object]:
+        entry = self._entries.get(host)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[host]
+            return None
+        self._entries.move_to_end(host)
+        return entry[1]
+
+    def _resolve_into(self, host: str, future: Future) -> None:
+        try:
+            answer: object = self.resolve(host)
+            ttl = self.ttl
+        except socket.gaierror as e:
+            answer = e
+            ttl = self.negative_ttl if is_permanent_failure(e) else 0.0
+        except Exception as e:
+            answer = socket.gaierror(socket.EAI_FAIL, str(e))
+            ttl = 0.0
+
+        with self._lock:
+            del self._inflight[host]
+            if ttl > 0:
+                self._entries[host] = (time.monotonic() + ttl, answer)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        try:
+            if isinstance(answer, BaseException):
+                future.set_exception(answer)
+            else:
+                future.set_result(answer)
+        except InvalidStateError:
+            pass  # already failed by close()
+
+    def _start(self, host: str, background: bool) -> Future:
+        """
+        Future for the addresses of `host`: done already on a cache hit,
+        otherwise shared with any lookup of the same host in flight.
+        """
+        host = host.lower()
+        with self._lock:
+            answer = self._cached(host)
+            if answer is not None:
+                self.hits += 1
+                future: Future = Future()
+                if isinstance(answer, BaseException):
+                    future.set_exception(answer)
+                else:
+                    future.set_result(answer)
+                return future
+
+            future = self._inflight.get(host)
+            if future is not None:
+                self.hits += 1
+                return future
+
+            self.misses += 1
+            future = self._inflight[host] = Future()
+            if background and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="dns")
+
+        if background:
+            self._executor.submit(self._resolve_into, host, future)
+        else:
+            self._resolve_into(host, future)
+        return future
+
+    def lookup(self, host: str, port: int) -> List[Tuple[int, int, int, str, tuple]]:
+        """
+        Addresses to connect to for (host, port), like socket.getaddrinfo().
+        Raises socket.gaierror when the host cannot be resolved.
+        """
+        addresses = self._start(host, background=False).result()
+        return [with_port(address, port) for address in addresses]
+
+    def prefetch(self, host: str) -> Future:
+        """
+        Start resolving `host` in the background; the future's result is its
+        address list (or the socket.gaierror).
+        """
+        return self._start(host, background=True)
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            inflight = list(self._inflight.items())
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # Lookups cancelled with the pool must not leave their waiters hanging
+        for host, future in inflight:
+            try:
+                future.set_exception(socket.gaierror(socket.EAI_FAIL, f"lookup of {host} cancelled"))
+            except InvalidStateError:
+                pass
@@ -0,0 +1,68 @@
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+from defaults import DEFAULT_MAX_RETRIES
+from models import ScanResult
+
+
+# Most retries worth spending per error kind (see http_client.ERROR_KINDS).
+# TLS failures, invalid URLs and unexpected errors will fail the same way again.
+KIND_RETRIES: Dict[str, int] = {
+    "timeout": 3,
+    "connect": 3,
+    "http": 3,       # only for RETRYABLE_STATUS
+    "protocol": 2,
+    "dns": 1,        # NXDOMAIN is permanent; resolver hiccups usually are not
+}
+
+# First backoff delay per error kind, in seconds; doubles on every retry
+KIND_BASE_DELAY: Dict[str, float] = {
+    "timeout": 2.0,  # an overloaded server needs room to recover
+    "dns": 5.0,
+}
+DEFAULT_BASE_DELAY = 1.0
+
+RETRYABLE_STATUS = (408, 425, 429, 500, 502, 503, 504)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Decides whether a failed fetch is retried, and how long to wait first.
+
+    A result is retried while result.attempts <= min(max_retries, the
+    per-kind limit in KIND_RETRIES). HTTP errors are only retried for
+    RETRYABLE_STATUS. Delays grow exponentially from the kind's base delay,
+    capped at `max_delay`, with jitter so that retries against one host
+    do not arrive in lockstep. A server's Retry-After is honoured as the
+    minimum delay; results asking for more than `max_retry_after` seconds
+    are not retried.
+    """
+    max_retries: int = DEFAULT_MAX_RETRIES
+    max_delay: float = 30.0
+    max_retry_after: float = 120.0
+    kind_retries: Dict[str, int] = field(default_factory=lambda: dict(KIND_RETRIES))
+    retry_status: Tuple[int, ...] = RETRYABLE_STATUS
+
+    def should_retry(self, result: ScanResult) -> bool:
+        kind = result.error_kind
+        if kind is None:
+            return False
+
+        limit = min(self.max_retries, self.kind_retries.get(kind, 0))
+        if result.attempts > limit:
+            return False
+        if result.retry_after is not None and result.retry_after > self.max_retry_after:
+            return False
+
+        if kind == "http":
+            return result.status_code in self.retry_status
+        return True
+
+    def delay(self, result: ScanResult) -> float:
+        """
+        Seconds to wait before the next attempt of `result`.
+        """
+        base = KIND_BASE_DELAY.get(result.error_kind or "", DEFAULT_BASE_DELAY)
+        ceiling = min(self.max_delay, base * 2 ** (result.attempts - 1))
+        return max(random.uniform(ceiling / 2, ceiling), result.retry_after or 0.0)
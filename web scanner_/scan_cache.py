@@ -0,0 +1,188 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from defaults import DEFAULT_TTL
+from models import Finding, ResponseData
+
+
+DEFAULT_MAX_ENTRIES = 100_000
+EVICT_EVERY = 100  # stores between size checks
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    url             TEXT PRIMARY KEY,
+    final_url       TEXT,
+    status_code     INTEGER,
+    etag            TEXT,
+    last_modified   TEXT,
+    body_hash       TEXT,
+    header_findings TEXT NOT NULL,
+    body_findings   TEXT NOT NULL,
+    stored_at       REAL NOT NULL,
+    accessed_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scans_accessed_at ON scans (accessed_at);
+"""
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    final_url: str
+    status_code: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_hash: Optional[str]
+    header_findings: List[Finding]   # findings that only depend on the headers
+    body_findings: List[Finding]     # findings produced by the HTML stage
+    stored_at: float
+
+    def validators(self) -> Dict[str, str]:
+        """
+        Conditional request headers for revalidating this entry.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def finding_rows(findings: List[Finding]) -> List[list]:
+    """
+    Findings as compact JSON-serializable rows (the check text is not stored).
+    """
+    return [[f.check_id, f.status, f.subject, f.severity_override, f.detail] for f in findings]
+
+
+def findings_from_rows(rows: List[list]) -> List[Finding]:
+    return [Finding(*row) for row in rows]
+
+
+def dump_findings(findings: List[Finding]) -> str:
+    return json.dumps(finding_rows(findings))
+
+
+def load_findings(data: str) -> List[Finding]:
+    return findings_from_rows(json.loads(data))
+
+
+class ScanCache:
+    """
+    Persistent SQLite cache of scan results keyed by normalized URL.
+
+    Entries older than `ttl` seconds are ignored and purged; once more than
+    `max_entries` are stored, the least recently used ones are evicted.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._stores = 0
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """
+        Return the fresh entry for `url`, or None.
+        """
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, final_url, status_code, etag, last_modified, body_hash,"
+                " header_findings, body_findings, stored_at FROM scans WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            if now - row[8] > self.ttl:
+                self._db.execute("DELETE FROM scans WHERE url = ?", (url,))
+                self._db.commit()
+                return None
+
+            self._db.execute("UPDATE scans SET accessed_at = ? WHERE url = ?", (now, url))
+            self._db.commit()
+
+        return CacheEntry(
+            url=row[0],
+            final_url=row[1],
+            status_code=row[2],
+            etag=row[3],
+            last_modified=row[4],
+            body_hash=row[5],
+            header_findings=load_findings(row[6]),
+            body_findings=load_findings(row[7]),
+            stored_at=row[8],
+        )
+
+    def store(
+        self,
+        url: str,
+        response: ResponseData,
+        header_findings: List[Finding],
+        body_findings: List[Finding],
+    ) -> None:
+        """
+        Record the findings for `url` together with the response validators.
+        """
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.final_url,
+                    response.status_code,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    response.body_hash,
+                    dump_findings(header_findings),
+                    dump_findings(body_findings),
+                    now,
+                    now,
+                ),
+            )
+
+            self._stores += 1
+            if self._stores % EVICT_EVERY == 0:
+                self._evict(now)
+
+            self._db.commit()
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM scans WHERE stored_at < ?", (now - self.ttl,))
+
+        (count,) = self._db.execute("SELECT COUNT(*) FROM scans").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM scans WHERE url IN"
+                " (SELECT url FROM scans ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._evict(time.time())
+            self._db.commit()
+            self._db.close()
+
+    def __enter__(self) -> "ScanCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
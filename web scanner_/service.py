@@ -0,0 +1,486 @@
+import json
+import os
+import signal
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from analysis_memo import AnalysisMemo, DEFAULT_MAX_BYTES
+from batch import _log_to_stderr
+from defaults import DEFAULT_MAX_QUEUE, DEFAULT_PORT
+from http_client import HttpClient
+from metrics import record_stage, timed_call
+from models import Finding, ResponseData, ScanResult
+from pipeline import analyze_body, fetch_page
+from reporter import json_record
+from resolver import DnsCache
+from retry import RetryPolicy
+from scan_cache import ScanCache
+
+
+DEFAULT_WORKERS = 16
+DEFAULT_JOB_TTL = 600.0      # seconds a finished job's results stay available
+MAX_REQUEST_BYTES = 8 * 1024 * 1024
+MAX_WAIT = 300.0             # longest a request may block waiting for a job
+
+
+def _init_analysis_worker() -> None:
+    """
+    Process-pool initializer: diagnostics to stderr, and leave Ctrl-C to the
+    service, which shuts the pool down itself.
+    """
+    _log_to_stderr()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _stop(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+class QueueFull(Exception):
+    """
+    A submission would exceed the service's queue limit.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__("Scan queue is full")
+        self.retry_after = retry_after
+
+
+class Job:
+    """
+    URLs submitted together, and their results in completion order.
+    `headers_only` selects the headers-only profile for all of them.
+    """
+
+    def __init__(self, urls: List[str], headers_only: bool = False):
+        self.id = uuid.uuid4().hex
+        self.urls = urls
+        self.headers_only = headers_only
+        self.queue: Deque[str] = deque(urls)
+        self.results: List[Dict] = []
+        self.failed = 0
+        self.state = "queued"   # "queued", "running", "done" or "cancelled"
+        self.submitted = time.time()
+        self.finished: Optional[float] = None
+        self.changed = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("done", "cancelled")
+
+    def document(self, after: int = 0) -> Dict:
+        """
+        JSON status of the job with the results from index `after` on.
+        """
+        with self.changed:
+            results = self.results[after:]
+            return {
+                "id": self.id,
+                "state": self.state,
+                "urls": len(self.urls),
+                "headers_only": self.headers_only,
+                "completed": len(self.results),
+                "failed": self.failed,
+                "submitted": self.submitted,
+                "finished": self.finished,
+                "next": after + len(results),
+                "results": results,
+            }
+
+    def wait(self, count: int, timeout: Optional[float]) -> bool:
+        """
+        Block until more than `count` results exist or the job is done;
+        False on timeout.
+        """
+        with self.changed:
+            return self.changed.wait_for(lambda: len(self.results) > count or self.done, timeout)
+
+
+class ScanService:
+    """
+    Scans submitted jobs on long-lived resources: one pooled HttpClient with
+    a DNS cache, `workers` scan threads and a warm HTML analysis process pool
+    (`analysis_workers`, CPU count by default; 0 analyzes on the scan threads).
+    Analysis results are memoized by body digest across jobs, up to
+    `memo_bytes` (0 disables).
+
+    Admission control: at most `max_queue` URLs wait across all jobs; a job
+    that does not fit is refused with QueueFull instead of growing the
+    backlog. Scan threads take URLs round-robin across jobs, so a one-URL
+    job is not stuck behind a large list. Finished jobs are dropped
+    `job_ttl` seconds after they finish.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        per_host: int = 4,
+        analysis_workers: Optional[int] = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        job_ttl: float = DEFAULT_JOB_TTL,
+        cache: Optional[ScanCache] = None,
+        retry: Optional[RetryPolicy] = None,
+        memo_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+        self.cache = cache
+        self.retry = retry
+        self.memo = AnalysisMemo(memo_bytes) if memo_bytes else None
+
+        self.resolver = DnsCache()
+        self.client = HttpClient(max_per_host=per_host, resolver=self.resolver)
+        if analysis_workers is None:
+            analysis_workers = os.cpu_count() or 1
+        self.analysis_executor = (
+            ProcessPoolExecutor(max_workers=analysis_workers, initializer=_init_analysis_worker)
+            if analysis_workers else None
+        )
+
+        self.jobs: Dict[str, Job] = {}
+        self.queued = 0          # URLs not yet taken by a scan thread
+        self.scanning = 0
+        self.scanned = 0
+        self._active: Deque[Job] = deque()   # jobs with queued URLs, in round-robin order
+        self._lock = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"scan-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        if self.analysis_executor is not None:
+            # Start the analysis processes now rather than on the first request
+            self.analysis_executor.submit(analyze_body, "").result()
+
+    # ------------------------------
+    # Jobs
+    # ------------------------------
+    def submit(self, urls: List[str], headers_only: bool = False) -> Job:
+        """
+        Queue a job for `urls`; raises QueueFull when it does not fit.
+        """
+        job = Job(urls, headers_only)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scan service is closed")
+            self._purge()
+            if self.queued + len(urls) > self.max_queue:
+                raise QueueFull(self._drain_estimate(len(urls)))
+            self.jobs[job.id] = job
+            if urls:
+                self._active.append(job)
+                self.queued += len(urls)
+                self._lock.notify(len(urls))
+            else:
+                self._finish(job, "done")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Drop the job's queued URLs; scans already running still report.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.done:
+                return job
+            self.queued -= len(job.queue)
+            job.queue.clear()
+            if job in self._active:
+                self._active.remove(job)
+            self._finish(job, "cancelled")
+        return job
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "scanning": self.scanning,
+                "scanned": self.scanned,
+                "max_queue": self.max_queue,
+                "memo_hits": self.memo.hits if self.memo is not None else 0,
+                "jobs": sum(1 for job in self.jobs.values() if not job.done),
+            }
+
+    def _drain_estimate(self, count: int) -> float:
+        """
+        Rough seconds until `count` more URLs would fit, for Retry-After.
+        """
+        excess = self.queued + count - self.max_queue
+        return max(1.0, float(excess) / max(1, self.workers))
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def _finish(self, job: Job, state: str) -> None:
+        with job.changed:
+            job.state = state
+            job.finished = time.time()
+            job.changed.notify_all()
+
+    # ------------------------------
+    # Scanning
+    # ------------------------------
+    def _next(self) -> Optional[Tuple[Job, str]]:
+        with self._lock:
+            while not self._active:
+                if self._closed:
+                    return None
+                self._lock.wait()
+            job = self._active.popleft()
+            url = job.queue.popleft()
+            if job.queue:
+                self._active.append(job)
+            self.queued -= 1
+            self.scanning += 1
+            if job.state == "queued":
+                job.state = "running"
+            return job, url
+
+    def _work(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            job, url = item
+            try:
+                result = self.scan(url, job.headers_only)
+            except Exception as e:
+                result = ScanResult(url=url, error=f"[ERROR] Scan failed due to unexpected error: {str(e)}")
+
+            record = json_record(result)
+            with self._lock:
+                self.scanning -= 1
+                self.scanned += 1
+                with job.changed:
+                    job.results.append(record)
+                    if result.error:
+                        job.failed += 1
+                    job.changed.notify_all()
+                if len(job.results) == len(job.urls) and not job.done:
+                    self._finish(job, "done")
+
+    def scan(self, url: str, headers_only: bool = False) -> ScanResult:
+        """
+        Scan one URL on the service's warm client and analysis pool.
+        """
+        started = time.perf_counter()
+        result = ScanResult(url=url)
+        response = fetch_page(result, self.client, self.cache, headers_only=headers_only)
+        while response is None and self.retry is not None and self.retry.should_retry(result):
+            time.sleep(self.retry.delay(result))
+            attempts = result.attempts + 1
+            result = ScanResult(url=url, attempts=attempts)
+            response = fetch_page(result, self.client, self.cache, headers_only=headers_only)
+
+        if response is not None:
+            self._analyze(result, response)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _analyze(self, result: ScanResult, response: ResponseData) -> None:
+        memoized = self.memo.get(response.body_hash) if self.memo is not None else None
+        try:
+            if memoized is not None:
+                body_findings, wall, cpu = memoized[0], 0.0, 0.0
+            elif self.analysis_executor is not None:
+                body_findings, wall, cpu = self.analysis_executor.submit(
+                    timed_call, analyze_body, response.body
+                ).result()
+            else:
+                body_findings, wall, cpu = timed_call(analyze_body, response.body)
+        except Exception as e:
+            result.findings.append(
+                Finding("form.error", "error", detail=f"Form analysis could not be completed: {str(e)}")
+            )
+        else:
+            if memoized is None and self.memo is not None:
+                self.memo.put(response.body_hash, body_findings)
+            record_stage(result, "html", wall, cpu)
+            header_findings = list(result.findings)
+            result.findings.extend(body_findings)
+            if self.cache is not None:
+                self.cache.store(result.scanned_url, response, header_findings, body_findings)
+        response.release_body()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            for job in list(self._active):
+                self.queued -= len(job.queue)
+                job.queue.clear()
+                self._finish(job, "cancelled")
+            self._active.clear()
+            self._lock.notify_all()
+        for thread in self._threads:
+            thread.join()
+        if self.analysis_executor is not None:
+            self.analysis_executor.shutdown(wait=True, cancel_futures=True)
+        self.client.close()
+        self.resolver.close()
+
+    def __enter__(self) -> "ScanService":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ==============================
+# HTTP/JSON API
+# ==============================
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST   /scans               {"urls": [...]} or {"url": "..."}, optional "wait" seconds
+                                and "headers_only": true
+    GET    /scans/<id>?after=N  job status and results from index N on
+    GET    /scans/<id>/results  results as JSON lines, streamed until the job is done
+    DELETE /scans/<id>          cancel the job's queued URLs
+    GET    /health              queue and worker counts
+    """
+
+    server_version = "SmartScanner"
+
+    @property
+    def service(self) -> ScanService:
+        return self.server.service
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def _route(self) -> Tuple[List[str], Dict[str, List[str]]]:
+        parts = urlsplit(self.path)
+        return [p for p in parts.path.split("/") if p], parse_qs(parts.query)
+
+    def _job(self, job_id: str) -> Optional[Job]:
+        job = self.service.get(job_id)
+        if job is None:
+            self._send_error(404, f"Unknown job: {job_id}")
+        return job
+
+    def do_GET(self):
+        path, query = self._route()
+
+        if path == ["health"]:
+            self._send_json(200, self.service.stats())
+        elif len(path) == 2 and path[0] == "scans":
+            job = self._job(path[1])
+            if job is not None:
+                try:
+                    after = max(0, int(query.get("after", ["0"])[0]))
+                except ValueError:
+                    return self._send_error(400, "'after' must be an integer")
+                self._send_json(200, job.document(after))
+        elif len(path) == 3 and path[0] == "scans" and path[2] == "results":
+            job = self._job(path[1])
+            if job is not None:
+                self._stream(job)
+        else:
+            self._send_error(404, "Not found")
+
+    def _stream(self, job: Job) -> None:
+        """
+        Write each result as a JSON line as soon as it is available;
+        the response ends (and the connection closes) when the job is done.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        sent = 0
+        while True:
+            job.wait(sent, timeout=MAX_WAIT)
+            with job.changed:
+                records = job.results[sent:]
+                done = job.done and sent + len(records) == len(job.results)
+            for record in records:
+                self.wfile.write((json.dumps(record) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            sent += len(records)
+            if done:
+                break
+
+    def do_POST(self):
+        path, _ = self._route()
+        if path != ["scans"]:
+            return self._send_error(404, "Not found")
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            return self._send_error(413, f"Request body exceeds {MAX_REQUEST_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            urls = body["urls"] if "urls" in body else [body["url"]]
+            wait = min(float(body.get("wait", 0)), MAX_WAIT)
+            headers_only = body.get("headers_only", False)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return self._send_error(400, "Expected a JSON object with 'url' or 'urls'")
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            return self._send_error(400, "'urls' must be a list of strings")
+        if not isinstance(headers_only, bool):
+            return self._send_error(400, "'headers_only' must be true or false")
+
+        try:
+            job = self.service.submit(urls, headers_only)
+        except QueueFull as e:
+            return self._send_error(503, str(e), {"Retry-After": str(int(e.retry_after + 0.5))})
+        except RuntimeError as e:
+            return self._send_error(503, str(e))
+
+        if wait > 0:
+            job.wait(len(job.urls), wait)
+        status = 200 if job.done else 202
+        self._send_json(status, job.document(), {"Location": f"/scans/{job.id}"})
+
+    def do_DELETE(self):
+        path, _ = self._route()
+        if len(path) != 2 or path[0] != "scans":
+            return self._send_error(404, "Not found")
+        job = self.service.cancel(path[1])
+        if job is None:
+            return self._send_error(404, f"Unknown job: {path[1]}")
+        self._send_json(200, job.document(len(job.results)))
+
+
+def serve(service: ScanService, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+    """
+    Serve the JSON API for `service` until interrupted (Ctrl-C or SIGTERM).
+    """
+    signal.signal(signal.SIGTERM, _stop)
+    server = ThreadingHTTPServer((host, port), ScanRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    print(f"[INFO] Scan service listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[INFO] Shutting down scan service")
+    finally:
+        server.server_close()
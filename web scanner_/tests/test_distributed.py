@@ -0,0 +1,84 @@
+import collections
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from work_queue import open_queue  # noqa: E402
+
+MAIN = os.path.join(ROOT, "main.py")
+
+
+class _CountingHandler(BaseHTTPRequestHandler):
+    """
+    Serves a small page for every path and counts the requests per path.
+    """
+    hits = collections.Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.hits[self.path] += 1
+        time.sleep(0.02)  # long enough for both workers to get a share
+        body = b"<html><body><p>ok</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TwoWorkersTest(unittest.TestCase):
+    URLS = 40
+
+    def setUp(self):
+        _CountingHandler.hits.clear()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _CountingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "queue.db")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_two_workers_drain_queue_without_repeats(self):
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        urls = [f"{base}/page-{i}" for i in range(self.URLS)]
+        with open_queue(self.db) as queue:
+            self.assertEqual(queue.enqueue(urls), self.URLS)
+
+        command = [
+            sys.executable, MAIN, "--queue", self.db, "--worker",
+            "--concurrency", "4", "--analysis-workers", "0", "--retries", "0", "--memo-mb", "0",
+        ]
+        workers = [
+            subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for _ in range(2)
+        ]
+        for worker in workers:
+            self.assertEqual(worker.wait(timeout=60), 0)
+
+        # Every page was fetched exactly once across both workers
+        self.assertEqual(set(_CountingHandler.hits), {f"/page-{i}" for i in range(self.URLS)})
+        self.assertEqual(set(_CountingHandler.hits.values()), {1})
+
+        with open_queue(self.db) as queue:
+            self.assertTrue(queue.drained())
+            stored = [result.url for _, result in queue.results()]
+        self.assertEqual(sorted(stored), sorted(urls))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from public_suffix import PublicSuffixList  # noqa: E402
+
+
+class PublicSuffixListTest(unittest.TestCase):
+    def setUp(self):
+        # Upstream layout: a plain rule and a wildcard for the same name
+        self.psl = PublicSuffixList(["jp", "kawasaki.jp", "*.kawasaki.jp", "!city.kawasaki.jp", "co.uk"])
+
+    def test_wildcard_beats_plain_rule_for_same_name(self):
+        self.assertEqual(self.psl.public_suffix("a.b.kawasaki.jp"), "b.kawasaki.jp")
+        self.assertEqual(self.psl.registrable_domain("a.b.kawasaki.jp"), "a.b.kawasaki.jp")
+        self.assertIsNone(self.psl.registrable_domain("b.kawasaki.jp"))
+
+    def test_plain_rule_without_wildcard_match(self):
+        self.assertEqual(self.psl.registrable_domain("kawasaki.jp"), None)
+        self.assertEqual(self.psl.registrable_domain("www.example.co.uk"), "example.co.uk")
+
+    def test_exception_takes_priority(self):
+        self.assertEqual(self.psl.registrable_domain("www.city.kawasaki.jp"), "city.kawasaki.jp")
+
+    def test_unlisted_tld_uses_implicit_rule(self):
+        self.assertEqual(self.psl.registrable_domain("a.example.test"), "example.test")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import socket
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resolver import DnsCache  # noqa: E402
+
+ADDRESS = (socket.AF_INET, socket.SOCK_STREAM, 6, ("192.0.2.1", 0))
+
+
+class StubResolver:
+    """
+    Stands in for the system resolver: answers from `answers` (an address
+    list or an exception per host) and counts the calls.
+    """
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def __call__(self, host):
+        self.calls.append(host)
+        answer = self.answers[host]
+        if isinstance(answer, BaseException):
+            raise answer
+        return answer
+
+
+class DnsCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("resolver.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.stub = StubResolver({
+            "example.test": [ADDRESS],
+            "missing.test": socket.gaierror(socket.EAI_NONAME, "no such host"),
+            "flaky.test": socket.gaierror(socket.EAI_AGAIN, "try again"),
+        })
+        self.cache = DnsCache(ttl=300, negative_ttl=60, resolve=self.stub)
+        self.addCleanup(self.cache.close)
+
+    def test_answer_is_cached_until_ttl(self):
+        self.assertEqual(self.cache.lookup("example.test", 443)[0][4], ("192.0.2.1", 443))
+        self.now += 299
+        self.cache.lookup("Example.TEST", 80)
+        self.assertEqual(self.stub.calls, ["example.test"])
+
+        self.now += 2
+        self.cache.lookup("example.test", 80)
+        self.assertEqual(self.stub.calls, ["example.test", "example.test"])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_missing_host_is_cached_for_negative_ttl(self):
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                self.cache.lookup("missing.test", 80)
+        self.assertEqual(self.stub.calls, ["missing.test"])
+
+        self.now += 61
+        with self.assertRaises(socket.gaierror):
+            self.cache.lookup("missing.test", 80)
+        self.assertEqual(self.stub.calls, ["missing.test", "missing.test"])
+
+    def test_transient_failure_is_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                self.cache.lookup("flaky.test", 80)
+        self.assertEqual(self.stub.calls, ["flaky.test", "flaky.test"])
+
+    def test_prefetch_fills_the_cache(self):
+        self.assertEqual(self.cache.prefetch("example.test").result(timeout=5), [ADDRESS])
+        self.cache.lookup("example.test", 80)
+        self.assertEqual(self.stub.calls, ["example.test"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+from models import ScanResult
+
+
+# Responses that ask the client to slow down
+BACKOFF_STATUS = (429, 503)
+MAX_PAUSE = 300.0        # longest Retry-After pause honoured, in seconds
+SLOW_FACTOR = 4.0        # latency above this multiple of the host's best is "slow"
+MIN_SLOW_LATENCY = 0.05  # ... but never count responses faster than this as slow
+
+
+class RateLimiter:
+    """
+    Token bucket: at most `rate` acquisitions per second,
+    with bursts of up to `burst` back-to-back acquisitions.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostThrottle:
+    """
+    Polite load control for one host: an AIMD concurrency limit, an
+    optional token bucket, and Retry-After pauses.
+
+    - The limit starts at `initial` and grows by one request per round
+      trip (1/limit per fast response) up to `max_limit`.
+    - 429, 503 and timeouts halve it (at most once per round trip: only
+      requests started after the previous decrease count), down to 1.
+    - A Retry-After on those responses pauses the host until it expires,
+      capped at MAX_PAUSE.
+    - A response is fast unless its time to first byte exceeds SLOW_FACTOR
+      times the best seen on this host; slow responses hold the limit.
+    - `rate` additionally caps request starts per second.
+    """
+
+    def __init__(self, max_limit: int, rate: Optional[float] = None, initial: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.limit = float(min(max(1, initial), self.max_limit))
+        self.bucket = RateLimiter(rate) if rate else None
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.best_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> float:
+        """
+        Wait for a request slot on this host; returns the start time to pass to release().
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.in_flight < int(self.limit):
+                break
+
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        self.in_flight += 1
+        try:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+        except BaseException:
+            self.in_flight -= 1
+            self._wake()
+            raise
+        return time.monotonic()
+
+    def release(self, started: float, result: ScanResult) -> None:
+        """
+        Return the slot taken at `started` and adapt the limit to how the request went.
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+
+        if result.status_code in BACKOFF_STATUS or result.error_kind == "timeout":
+            if started >= self._last_decrease:
+                self.limit = max(1.0, self.limit / 2)
+                self._last_decrease = now
+            if result.retry_after:
+                self.paused_until = max(self.paused_until, now + min(result.retry_after, MAX_PAUSE))
+        elif result.error is None:
+            latency = result.timings.get("http.ttfb", now - started)
+            if self.best_latency is None or latency < self.best_latency:
+                self.best_latency = latency
+            if latency <= max(self.best_latency * SLOW_FACTOR, MIN_SLOW_LATENCY):
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        for waiter in list(self._waiters):
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    @property
+    def idle(self) -> bool:
+        return not self.in_flight and not self._waiters and self.paused_until <= time.monotonic()
@@ -0,0 +1,261 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from defaults import DEFAULT_LEASE
+from journal import result_from_record, result_record
+from models import ScanResult
+
+
+DEFAULT_MAX_LEASES = 3     # leases that may expire before a task is given up
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+
+
+@dataclass
+class Task:
+    task_id: int
+    url: str
+    leases: int  # times this task has been claimed, including this lease
+
+
+class WorkQueue(ABC):
+    """
+    Shared queue of scan tasks between one coordinator and many workers.
+
+    Workers claim tasks under a lease that they renew while scanning; a
+    task whose lease runs out (its worker died or lost the queue) is handed
+    out again, and given up with an error after `max_leases` expired leases.
+    Completed results are numbered in completion order so the coordinator
+    can stream them with a cursor.
+
+    Subclasses implement the storage; SQLiteWorkQueue is the built-in backend.
+    """
+
+    @abstractmethod
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """
+        Add URLs to the queue; URLs already queued or done are skipped.
+        Returns the number added.
+        """
+
+    @abstractmethod
+    def claim(self, worker_id: str, count: int, lease: float = DEFAULT_LEASE) -> List[Task]:
+        """
+        Lease up to `count` tasks to `worker_id`, reclaiming expired leases first.
+        """
+
+    @abstractmethod
+    def renew(self, worker_id: str, task_ids: Iterable[int], lease: float = DEFAULT_LEASE) -> int:
+        """
+        Extend the leases `worker_id` still holds; returns how many it held.
+        """
+
+    @abstractmethod
+    def complete(self, task_id: int, worker_id: str, result: ScanResult) -> bool:
+        """
+        Store the result of a task. The first result wins: False when the
+        task was already completed (e.g. by a worker that took over its lease).
+        """
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """
+        Return tasks with expired leases to the queue; returns how many.
+        """
+
+    @abstractmethod
+    def results(self, after: int = 0) -> Iterator[Tuple[int, ScanResult]]:
+        """
+        Yield (sequence, result) for tasks completed after sequence `after`.
+        """
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of tasks per state.
+        """
+
+    def drained(self) -> bool:
+        """
+        True when every task is done.
+        """
+        counts = self.counts()
+        return not counts[QUEUED] and not counts[LEASED]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id            INTEGER PRIMARY KEY,
+    url           TEXT NOT NULL UNIQUE,
+    state         TEXT NOT NULL,
+    worker        TEXT,
+    lease_expires REAL,
+    leases        INTEGER NOT NULL DEFAULT 0,
+    seq           INTEGER UNIQUE,
+    result        TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_expires);
+"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    WorkQueue in a SQLite file, shared by processes on one machine (or any
+    filesystem with working POSIX locks; not NFS). Every claim and completion
+    is a short IMMEDIATE transaction, so concurrent workers never lease the
+    same task twice. Safe to share between threads.
+    """
+
+    def __init__(self, path: str, max_leases: int = DEFAULT_MAX_LEASES, timeout: float = 30.0):
+        self.path = path
+        self.max_leases = max_leases
+
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _transaction(self, work, *args):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                value = work(*args)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return value
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        def insert(rows: List[Tuple[str]]) -> int:
+            cursor = self._db.executemany(
+                "INSERT OR IGNORE INTO tasks (url, state) VALUES (?, ?)",
+                ((url, QUEUED) for (url,) in rows),
+            )
+            return cursor.rowcount
+
+        added = 0
+        chunk: List[Tuple[str]] = []
+        for url in urls:
+            chunk.append((url,))
+            if len(chunk) >= 1000:
+                added += self._transaction(insert, chunk)
+                chunk = []
+        if chunk:
+            added += self._transaction(insert, chunk)
+        return added
+
+    def _requeue_expired(self, now: float) -> int:
+        expired = self._db.execute(
+            "SELECT id, url, leases FROM tasks WHERE state = ? AND lease_expires < ?",
+            (LEASED, now),
+        ).fetchall()
+
+        for task_id, url, leases in expired:
+            if leases >= self.max_leases:
+                result = ScanResult(
+                    url=url,
+                    error=f"[ERROR] Scan abandoned: its lease expired {leases} times",
+                    error_kind="other",
+                    attempts=leases,
+                )
+                self._finish(task_id, None, result)
+            else:
+                self._db.execute(
+                    "UPDATE tasks SET state = ?, worker = NULL, lease_expires = NULL WHERE id = ?",
+                    (QUEUED, task_id),
+                )
+        return len(expired)
+
+    def _finish(self, task_id: int, worker_id: Optional[str], result: ScanResult) -> bool:
+        cursor = self._db.execute(
+            "UPDATE tasks SET state = ?, worker = ?, lease_expires = NULL, result = ?,"
+            " seq = (SELECT IFNULL(MAX(seq), 0) + 1 FROM tasks)"
+            " WHERE id = ? AND state != ?",
+            (DONE, worker_id, json.dumps(result_record(result)), task_id, DONE),
+        )
+        return cursor.rowcount == 1
+
+    def claim(self, worker_id: str, count: int, lease: float = DEFAULT_LEASE) -> List[Task]:
+        def take() -> List[Task]:
+            now = time.time()
+            self._requeue_expired(now)
+
+            rows = self._db.execute(
+                "SELECT id, url, leases FROM tasks WHERE state = ? ORDER BY id LIMIT ?",
+                (QUEUED, count),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE tasks SET state = ?, worker = ?, lease_expires = ?, leases = leases + 1 WHERE id = ?",
+                ((LEASED, worker_id, now + lease, task_id) for task_id, _, _ in rows),
+            )
+            return [Task(task_id, url, leases + 1) for task_id, url, leases in rows]
+
+        return self._transaction(take)
+
+    def renew(self, worker_id: str, task_ids: Iterable[int], lease: float = DEFAULT_LEASE) -> int:
+        def extend(ids: List[int]) -> int:
+            expires = time.time() + lease
+            held = 0
+            for task_id in ids:
+                held += self._db.execute(
+                    "UPDATE tasks SET lease_expires = ? WHERE id = ? AND state = ? AND worker = ?",
+                    (expires, task_id, LEASED, worker_id),
+                ).rowcount
+            return held
+
+        ids = list(task_ids)
+        return self._transaction(extend, ids) if ids else 0
+
+    def complete(self, task_id: int, worker_id: str, result: ScanResult) -> bool:
+        return self._transaction(self._finish, task_id, worker_id, result)
+
+    def requeue_expired(self) -> int:
+        return self._transaction(self._requeue_expired, time.time())
+
+    def results(self, after: int = 0) -> Iterator[Tuple[int, ScanResult]]:
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT seq, result FROM tasks WHERE seq > ? ORDER BY seq LIMIT 500",
+                    (after,),
+                ).fetchall()
+            if not rows:
+                return
+            for after, data in rows:
+                yield after, result_from_record(json.loads(data))
+
+    def counts(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0}
+        with self._lock:
+            for state, count in self._db.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"):
+                counts[state] = count
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def open_queue(path: str, max_leases: int = DEFAULT_MAX_LEASES) -> WorkQueue:
+    """
+    Open the work queue stored at `path`.
+    """
+    return SQLiteWorkQueue(path, max_leases=max_leases)